@@ -4,6 +4,14 @@ import os
 import pandas as pd
 import numpy as np
 
+# Validation and ranking come from the package in part-II, loaded by the
+# web service's shared module (from this checkout, or an installed
+# topsis_pkg)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir, "Part-III"))
+from shared import (MatrixError, check_divisors, criteria_matrix, ranks,
+                    written_ranks)
+
 
 def read_input_file(file_path):
     
@@ -25,7 +33,10 @@ def read_input_file(file_path):
 
 
 def validate_data(data, weights, impacts):
-    """Validates input data, weights and impacts."""
+    """
+    Validates input data, weights and impacts; returns the weights, the
+    impacts and the criteria as one float matrix.
+    """
 
     
     if data.shape[1] < 3:
@@ -33,10 +44,15 @@ def validate_data(data, weights, impacts):
         sys.exit(1)
 
     
-    for column in data.columns[1:]:
-        if not pd.api.types.is_numeric_dtype(data[column]):
-            print(" Error: All columns except the first must contain numeric values.")
-            sys.exit(1)
+    # Names the cells that are text, missing or infinite, and the all-zero
+    # columns, which would make every score NaN
+    try:
+        matrix = criteria_matrix(data)
+        check_divisors(np.sqrt((matrix ** 2).sum(axis=0)),
+                       list(data.columns[1:]))
+    except MatrixError as e:
+        print(f" Error: {e}")
+        sys.exit(1)
 
     
     weights_list = weights.split(',')
@@ -60,13 +76,12 @@ def validate_data(data, weights, impacts):
             print(" Error: Impacts must be '+' (benefit) or '-' (cost).")
             sys.exit(1)
 
-    return weights_list, impacts_list
+    return weights_list, impacts_list, matrix
 
 
-def calculate_topsis(data, weights, impacts):
-    """Performs TOPSIS calculation and returns scores."""
+def calculate_topsis(numeric_matrix, weights, impacts):
+    """Performs TOPSIS calculation on the validated matrix and returns scores."""
 
-    numeric_matrix = data.iloc[:, 1:].values.astype(float)
     norm_factor = np.sqrt((numeric_matrix ** 2).sum(axis=0))
     normalized_matrix = numeric_matrix / norm_factor
 
@@ -98,7 +113,9 @@ def save_output(data, scores, output_file):
     """Adds score & rank and saves output file."""
 
     data['Topsis Score'] = scores
-    data['Rank'] = scores.rank(method='max', ascending=False).astype(int)
+    # Tied scores share their average rank (1, 2.5, 2.5, 4), as in the
+    # package and the web service; whole ranks stay integers
+    data['Rank'] = written_ranks(ranks(scores))
 
     if output_file.endswith(".xlsx"):
         data.to_excel(output_file, index=False)
@@ -121,6 +138,6 @@ if __name__ == "__main__":
     impacts = sys.argv[3]
     output_file = sys.argv[4]
     dataset = read_input_file(input_file)
-    weights_list, impacts_list = validate_data(dataset, weights, impacts)
-    scores = calculate_topsis(dataset, weights_list, impacts_list)
+    weights_list, impacts_list, matrix = validate_data(dataset, weights, impacts)
+    scores = calculate_topsis(matrix, weights_list, impacts_list)
     save_output(dataset, scores, output_file)
@@ -1,74 +1,113 @@
+import functools
+import logging
 import os
-import smtplib
-import pandas as pd
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+
 import numpy as np
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
-from flask import Flask, request, jsonify, render_template, send_file
-from werkzeug.utils import secure_filename
+from flask import Flask, Response, request, jsonify, render_template
+from werkzeug.http import parse_options_header
 import re
 import uuid
 
+from jobs import JobQueue, JobError, QueueFull
+from mailer import SMTPPool, build_message
+from results_store import (ResultsStore, analysis_id_from_filename,
+                           input_key)
+from scoring import NoReference, ScoringError, ScoringService
+from shared import (NULL_PROFILER, JSONLinesSink, LoggingSink, MatrixError,
+                    Profiler, PrometheusSink, TopsisModel, check_divisors,
+                    ranks as rank_scores, written_ranks)
+from upload import ChunkSpool, UploadError, parse_upload
+
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['RESULTS_FOLDER'] = 'results'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max
+# Uploads are parsed while they stream in, so memory does not grow with
+# their size (see upload.py)
+app.config['MAX_UPLOAD_MB'] = int(os.environ.get('MAX_UPLOAD_MB', 4096))
+app.config['MAX_CONTENT_LENGTH'] = app.config['MAX_UPLOAD_MB'] * 1024 * 1024
+# Parsed rows kept in memory per upload before spilling to UPLOAD_FOLDER
+app.config['UPLOAD_SPOOL_MB'] = int(os.environ.get('UPLOAD_SPOOL_MB', 32))
+# Best-ranked rows returned in the job result; the full result is downloaded
+app.config['PREVIEW_ROWS'] = int(os.environ.get('PREVIEW_ROWS', 100))
+# Larger results are not attached to the email
+app.config['EMAIL_MAX_ATTACHMENT_MB'] = int(os.environ.get('EMAIL_MAX_ATTACHMENT_MB', 20))
+
+# SMTP server used for result emails (point at a local stub for testing)
+app.config['SMTP_HOST'] = os.environ.get('SMTP_HOST', 'smtp.gmail.com')
+app.config['SMTP_PORT'] = int(os.environ.get('SMTP_PORT', 587))
+app.config['SMTP_USE_TLS'] = os.environ.get('SMTP_USE_TLS', '1') == '1'
+app.config['SMTP_IDLE_TIMEOUT'] = int(os.environ.get('SMTP_IDLE_TIMEOUT', 60))
+app.config['SMTP_MAX_IDLE'] = int(os.environ.get('SMTP_MAX_IDLE', 2))
+
+# Background workers for /analyze
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 4))
+app.config['JOB_QUEUE_SIZE'] = int(os.environ.get('JOB_QUEUE_SIZE', 32))
 
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['RESULTS_FOLDER'], exist_ok=True)
 
-
-# ─── TOPSIS Core Algorithm ────────────────────────────────────────────────────
-
-def topsis(df, weights, impacts):
-    """
-    Implements the complete TOPSIS algorithm.
-    df: DataFrame with alternatives in first column, numeric criteria in rest.
-    weights: list of floats
-    impacts: list of '+' or '-'
-    Returns DataFrame with Topsis Score and Rank columns added.
-    """
-    alternatives = df.iloc[:, 0].values
-    matrix = df.iloc[:, 1:].values.astype(float)
-
-    # Step 1: Normalize the decision matrix
-    norm = np.sqrt((matrix ** 2).sum(axis=0))
-    normalized = matrix / norm
-
-    # Step 2: Multiply by weights
-    weights_arr = np.array(weights, dtype=float)
-    weights_arr = weights_arr / weights_arr.sum()  # Normalize weights
-    weighted = normalized * weights_arr
-
-    # Step 3: Determine ideal best and ideal worst
-    ideal_best = np.zeros(weighted.shape[1])
-    ideal_worst = np.zeros(weighted.shape[1])
-
-    for j, impact in enumerate(impacts):
-        if impact == '+':
-            ideal_best[j] = weighted[:, j].max()
-            ideal_worst[j] = weighted[:, j].min()
-        else:
-            ideal_best[j] = weighted[:, j].min()
-            ideal_worst[j] = weighted[:, j].max()
-
-    # Step 4: Calculate separation measures (Euclidean distance)
-    d_best = np.sqrt(((weighted - ideal_best) ** 2).sum(axis=1))
-    d_worst = np.sqrt(((weighted - ideal_worst) ** 2).sum(axis=1))
-
-    # Step 5: Compute performance score (TOPSIS Score)
-    scores = d_worst / (d_best + d_worst)
-
-    # Step 6: Rank alternatives (higher score = better rank)
-    ranks = pd.Series(scores).rank(ascending=False).astype(int).values
-
-    result_df = df.copy()
-    result_df['Topsis Score'] = np.round(scores, 4)
-    result_df['Rank'] = ranks
-
-    return result_df
+# Results store (SQLite in RESULTS_FOLDER); also serves repeat analyses
+app.config['RESULTS_DB'] = os.environ.get(
+    'RESULTS_DB', os.path.join(app.config['RESULTS_FOLDER'], 'results.db'))
+app.config['RESULTS_RETENTION'] = int(os.environ.get('RESULTS_RETENTION', 24 * 3600))
+app.config['RESULTS_SWEEP_INTERVAL'] = int(os.environ.get('RESULTS_SWEEP_INTERVAL', 600))
+# Oldest results are evicted beyond this many MB of stored CSV
+app.config['RESULTS_MAX_MB'] = int(os.environ.get('RESULTS_MAX_MB', 1024))
+# Summaries (preview rows and email attachment) of recent results kept in
+# memory, so a repeat analysis does not read them from SQLite again
+app.config['RESULTS_MEMORY_MB'] = int(os.environ.get('RESULTS_MEMORY_MB', 64))
+
+results_store = ResultsStore(app.config['RESULTS_DB'],
+                             retention=app.config['RESULTS_RETENTION'],
+                             max_bytes=app.config['RESULTS_MAX_MB'] * 1024 * 1024,
+                             memory_bytes=app.config['RESULTS_MEMORY_MB'] * 1024 * 1024)
+results_store.start_sweeper(app.config['RESULTS_SWEEP_INTERVAL'])
+
+smtp_pool = SMTPPool(app.config['SMTP_HOST'], app.config['SMTP_PORT'],
+                     use_tls=app.config['SMTP_USE_TLS'],
+                     idle_timeout=app.config['SMTP_IDLE_TIMEOUT'],
+                     max_idle=app.config['SMTP_MAX_IDLE'],
+                     logger=app.logger)
+
+# Per-stage instrumentation of analysis jobs (served at /metrics): each
+# analysis runs read (parsing and validating the upload while it streams
+# in), ideal_points, distances, rank, write and email under
+# profiler.stage(name)
+app.config['PROFILING'] = os.environ.get('PROFILING', '1') == '1'
+app.config['PROFILE_MEMORY'] = os.environ.get('PROFILE_MEMORY', '0') == '1'
+app.config['PROFILE_JSONL'] = os.environ.get('PROFILE_JSONL', '')
+
+metrics_sink = PrometheusSink()
+profile_sinks = [metrics_sink, LoggingSink(app.logger, logging.DEBUG)]
+if app.config['PROFILE_JSONL']:
+    profile_sinks.append(JSONLinesSink(app.config['PROFILE_JSONL']))
+
+job_queue = JobQueue(max_workers=app.config['JOB_WORKERS'],
+                     max_pending=app.config['JOB_QUEUE_SIZE'])
+
+# Scoring against a preloaded reference matrix (see scoring.py)
+app.config['REFERENCE_MATRIX'] = os.environ.get('REFERENCE_MATRIX', '')
+app.config['REFERENCE_WEIGHTS'] = os.environ.get('REFERENCE_WEIGHTS') or None
+app.config['REFERENCE_IMPACTS'] = os.environ.get('REFERENCE_IMPACTS') or None
+app.config['REFERENCE_WATCH_INTERVAL'] = int(os.environ.get('REFERENCE_WATCH_INTERVAL', 0))
+app.config['SCORING_MAX_ROWS'] = int(os.environ.get('SCORING_MAX_ROWS', 10_000))
+app.config['SCORING_MAX_BATCH'] = int(os.environ.get('SCORING_MAX_BATCH', 1024))
+app.config['SCORING_BATCH_WAIT_US'] = int(os.environ.get('SCORING_BATCH_WAIT_US', 0))
+
+scoring_service = ScoringService(app.config['REFERENCE_MATRIX'] or None,
+                                 max_batch=app.config['SCORING_MAX_BATCH'],
+                                 max_wait=app.config['SCORING_BATCH_WAIT_US'] / 1e6)
+if app.config['REFERENCE_MATRIX']:
+    try:
+        scoring_service.reload(app.config['REFERENCE_WEIGHTS'],
+                               app.config['REFERENCE_IMPACTS'])
+    except ValueError as e:
+        # Serve everything else; /reference/reload can retry once fixed
+        app.logger.error("Reference matrix not loaded: %s", e)
+    if app.config['REFERENCE_WATCH_INTERVAL']:
+        scoring_service.start_watcher(app.config['REFERENCE_WATCH_INTERVAL'])
 
 
 # ─── Validation Helpers ───────────────────────────────────────────────────────
@@ -78,67 +117,18 @@ def validate_email(email):
     return re.match(pattern, email) is not None
 
 
-def validate_csv(filepath):
-    try:
-        df = pd.read_csv(filepath)
-        if df.shape[1] < 2:
-            return None, "CSV must have at least 2 columns (1 alternatives + 1 criterion)."
-        # Check that all columns except first are numeric
-        for col in df.columns[1:]:
-            try:
-                pd.to_numeric(df[col])
-            except ValueError:
-                return None, f"Column '{col}' must contain only numeric values."
-        return df, None
-    except Exception as e:
-        return None, f"Failed to parse CSV: {str(e)}"
-
-
 # ─── Email Sending ────────────────────────────────────────────────────────────
 
 def send_email(to_email, result_path, sender_email, sender_password):
-    """Send result CSV as email attachment."""
-    msg = MIMEMultipart()
-    msg['From'] = sender_email
-    msg['To'] = to_email
-    msg['Subject'] = '🎯 TOPSIS Analysis Result'
-
-    body = """Hello,
-
-Your TOPSIS analysis has been completed successfully!
-
-Please find the results attached as a CSV file. The file contains:
-  • All original data
-  • Topsis Score for each alternative
-  • Final Rankings
-
-Thank you for using the TOPSIS Analysis Tool.
-
-Best regards,
-TOPSIS Analyzer
-"""
-    msg.attach(MIMEText(body, 'plain'))
-
-    with open(result_path, 'rb') as f:
-        part = MIMEBase('application', 'octet-stream')
-        part.set_payload(f.read())
-    encoders.encode_base64(part)
-    part.add_header('Content-Disposition', f'attachment; filename="{os.path.basename(result_path)}"')
-    msg.attach(part)
+    """
+    Send result CSV(s) as email attachment over a pooled SMTP session.
 
-    try:
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        server.sendmail(sender_email, to_email, msg.as_string())
-        server.quit()
-        return True, None
-    except smtplib.SMTPAuthenticationError:
-        return False, "Email authentication failed. Please check SMTP credentials."
-    except smtplib.SMTPException as e:
-        return False, f"SMTP error: {str(e)}"
-    except Exception as e:
-        return False, f"Failed to send email: {str(e)}"
+    `result_path` is a file path or a `(filename, bytes)` pair.  Both
+    `to_email` and `result_path` may also be lists, to mail several
+    recipients or attach several results in one message.
+    """
+    msg = build_message(sender_email, to_email, result_path)
+    return smtp_pool.send(sender_email, sender_password, to_email, msg)
 
 
 # ─── Routes ───────────────────────────────────────────────────────────────────
@@ -148,20 +138,43 @@ def index():
     return render_template('index.html')
 
 
+def new_profiler():
+    if app.config['PROFILING']:
+        # Requests share the process, so CPU time is counted per thread
+        return Profiler(profile_sinks, track_memory=app.config['PROFILE_MEMORY'],
+                        run='web', cpu_clock=time.thread_time)
+    return NULL_PROFILER
+
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
     errors = []
 
-    # ── 1. Validate file ──
-    if 'file' not in request.files or request.files['file'].filename == '':
+    mimetype, options = parse_options_header(request.content_type or '')
+    if mimetype != 'multipart/form-data' or 'boundary' not in options:
+        return jsonify({'success': False, 'errors': ["Please upload a CSV file."]}), 400
+
+    # ── 1. Parse and validate the CSV while it streams in ──
+    profiler = new_profiler()
+    spool_path = os.path.join(app.config['UPLOAD_FOLDER'],
+                              f"{uuid.uuid4().hex}.spool")
+    spool = ChunkSpool(spool_path,
+                       memory_bytes=app.config['UPLOAD_SPOOL_MB'] * 1024 * 1024)
+    try:
+        with profiler.stage('read'):
+            upload = parse_upload(request.stream,
+                                  options['boundary'].encode('latin-1'), spool)
+    except UploadError as e:
+        spool.close()
+        return jsonify({'success': False, 'errors': [str(e)]}), 400
+    form = upload.fields
+
+    if not upload.filename:
         errors.append("Please upload a CSV file.")
-    else:
-        file = request.files['file']
-        if not file.filename.lower().endswith('.csv'):
-            errors.append("Input file must be in CSV format (.csv extension required).")
 
     # ── 2. Validate weights ──
-    weights_raw = request.form.get('weights', '').strip()
+    weights_raw = form.get('weights', '').strip()
+    weights = []
     if not weights_raw:
         errors.append("Weights field is required.")
     else:
@@ -174,7 +187,8 @@ def analyze():
             weights = []
 
     # ── 3. Validate impacts ──
-    impacts_raw = request.form.get('impacts', '').strip()
+    impacts_raw = form.get('impacts', '').strip()
+    impacts = []
     if not impacts_raw:
         errors.append("Impacts field is required.")
     else:
@@ -183,95 +197,348 @@ def analyze():
         if invalid_impacts:
             errors.append(f"Impacts must only contain '+' or '-'. Invalid values: {invalid_impacts}")
 
-    # ── 4. Validate email ──
-    email = request.form.get('email', '').strip()
+    # ── 4. Check counts against the parsed header ──
+    if upload.stats.columns is not None:
+        n_criteria = len(upload.stats.columns) - 1  # Exclude alternatives column
+        if weights and len(weights) != n_criteria:
+            errors.append(f"Number of weights ({len(weights)}) must equal number of criteria columns ({n_criteria}).")
+        if impacts_raw and len(impacts) != n_criteria:
+            errors.append(f"Number of impacts ({len(impacts)}) must equal number of criteria columns ({n_criteria}).")
+        try:
+            check_divisors(np.sqrt(upload.stats.sumsq), upload.stats.columns[1:])
+        except MatrixError as e:
+            errors.append(str(e))
+
+    # ── 5. Validate email ──
+    email = form.get('email', '').strip()
     if not email:
         errors.append("Email address is required.")
     elif not validate_email(email):
         errors.append("Please enter a valid email address.")
 
-    # ── 5. Validate SMTP settings ──
-    sender_email = request.form.get('sender_email', '').strip()
-    sender_password = request.form.get('sender_password', '').strip()
+    # ── 6. Validate SMTP settings ──
+    sender_email = form.get('sender_email', '').strip()
+    sender_password = form.get('sender_password', '').strip()
     if not sender_email or not sender_password:
         errors.append("Sender email and app password are required to send results.")
 
     if errors:
+        spool.close()
         return jsonify({'success': False, 'errors': errors}), 400
 
-    # ── 6. Save uploaded file ──
-    file_uid = str(uuid.uuid4())[:8]
-    filename = secure_filename(f"{file_uid}_{file.filename}")
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    file.save(filepath)
-
-    # ── 7. Parse & validate CSV ──
-    df, csv_error = validate_csv(filepath)
-    if csv_error:
-        os.remove(filepath)
-        return jsonify({'success': False, 'errors': [csv_error]}), 400
-
-    n_criteria = df.shape[1] - 1  # Exclude alternatives column
-
-    if len(weights) != n_criteria:
-        os.remove(filepath)
-        return jsonify({'success': False, 'errors': [
-            f"Number of weights ({len(weights)}) must equal number of criteria columns ({n_criteria})."
-        ]}), 400
-
-    if len(impacts) != n_criteria:
-        os.remove(filepath)
-        return jsonify({'success': False, 'errors': [
-            f"Number of impacts ({len(impacts)}) must equal number of criteria columns ({n_criteria})."
-        ]}), 400
-
-    # ── 8. Run TOPSIS ──
-    try:
-        result_df = topsis(df, weights, impacts)
-    except Exception as e:
-        os.remove(filepath)
-        return jsonify({'success': False, 'errors': [f"TOPSIS computation failed: {str(e)}"]}), 500
-
-    # ── 9. Save result ──
-    result_filename = f"topsis_result_{file_uid}.csv"
-    result_path = os.path.join(app.config['RESULTS_FOLDER'], result_filename)
-    result_df.to_csv(result_path, index=False)
+    # ── 7. Look up earlier results of the same analysis ──
+    input_hash = input_key(upload.digest, weights, impacts)
+    # (the upload is kept until the job runs, in case the result is gone
+    # by then and has to be computed after all)
+    cached = results_store.find(input_hash)
 
-    # ── 10. Send email ──
-    email_sent, email_error = send_email(email, result_path, sender_email, sender_password)
+    # ── 8. Hand off to the worker pool ──
+    try:
+        job = job_queue.submit(run_analysis, upload, input_hash, weights,
+                               impacts, email, sender_email, sender_password,
+                               cached=cached, profiler=profiler)
+    except QueueFull:
+        spool.close()
+        response = jsonify({'success': False, 'errors': [
+            "The server is busy. Please try again in a moment."
+        ]})
+        response.headers['Retry-After'] = '5'
+        return response, 429
 
-    # Clean up upload
-    os.remove(filepath)
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status_url': f"/jobs/{job.id}",
+        'result_url': f"/jobs/{job.id}/result",
+    }), 202
+
+
+def _result_chunks(spool, scores, ranks):
+    """Yield each parsed chunk with its scores and ranks appended."""
+    start = 0
+    for chunk in spool:
+        stop = start + len(chunk)
+        chunk['Topsis Score'] = np.round(scores[start:stop], 4)
+        chunk['Rank'] = written_ranks(ranks[start:stop])
+        yield chunk
+        start = stop
+
+
+def score_upload(upload, weights, impacts, profiler=NULL_PROFILER):
+    """Scores and ranks of the parsed upload, one spooled chunk at a time."""
+    stats = upload.stats
+    with profiler.stage('ideal_points'):
+        model = TopsisModel(weights, impacts).fit_stats(
+            stats.sumsq, stats.col_min, stats.col_max,
+            criteria=stats.columns[1:])
+    with profiler.stage('distances'):
+        scores = np.concatenate([model.score(chunk.iloc[:, 1:].to_numpy(dtype=float))
+                                 for chunk in upload.spool])
+    with profiler.stage('rank'):
+        ranks = rank_scores(scores)
+    return scores, ranks
+
+
+def run_analysis(job, upload, input_hash, weights, impacts, email,
+                 sender_email, sender_password, cached=None,
+                 profiler=NULL_PROFILER):
+    """Worker body: score the parsed upload, store the result and email it."""
+    summarize = functools.partial(
+        results_store.summary, preview_rows=app.config['PREVIEW_ROWS'],
+        csv_max_bytes=app.config['EMAIL_MAX_ATTACHMENT_MB'] * 1024 * 1024)
+    spool = upload.spool
+    try:
+        # Same file, weights and impacts as an earlier analysis, unless the
+        # sweeper or eviction removed it since the lookup
+        summary = summarize(cached['id']) if cached is not None else None
+        if summary is None:
+            # ── Run TOPSIS, one parsed chunk at a time ──
+            job.set_progress('computing')
+            try:
+                scores, ranks = score_upload(upload, weights, impacts, profiler)
+            except Exception as e:
+                raise JobError([f"TOPSIS computation failed: {str(e)}"])
+
+            # ── Save result ──
+            job.set_progress('saving')
+            with profiler.stage('write'):
+                results_store.save(
+                    job.id, input_hash, _result_chunks(spool, scores, ranks),
+                    ordinals=rank_scores(scores, 'ordinal'))
+            # Best-ranked rows straight off the rank index, and the CSV
+            summary = summarize(job.id)
+            if summary is None:
+                raise JobError(["The result was removed before it could be "
+                                "sent. Please submit the analysis again."])
+    finally:
+        spool.close()
+    analysis, preview_df, csv = summary
+
+    # ── Send email ──
+    job.set_progress('emailing')
+    if csv is None:
+        size_mb = analysis['size'] / (1024 * 1024)
+        email_sent, email_error = False, (
+            f"The result ({size_mb:.0f} MB) is too large to email; download it instead.")
+    else:
+        attachment = (analysis['result_file'], csv)
+        with profiler.stage('email'):
+            email_sent, email_error = send_email(email, attachment, sender_email, sender_password)
 
+    result = {
+        'success': True,
+        'email_sent': email_sent,
+        'result_id': analysis['id'],
+        'result_file': analysis['result_file'],
+        'preview': preview_df.to_dict(orient='records'),
+        'columns': list(preview_df.columns),
+        'total_rows': analysis['total_rows'],
+    }
     if not email_sent:
         # Still return result data but warn about email
-        preview = result_df.to_dict(orient='records')
-        return jsonify({
-            'success': True,
-            'email_sent': False,
-            'email_error': email_error,
-            'result_file': result_filename,
-            'preview': preview,
-            'columns': list(result_df.columns)
-        })
-
-    preview = result_df.to_dict(orient='records')
-    return jsonify({
-        'success': True,
-        'email_sent': True,
-        'result_file': result_filename,
-        'preview': preview,
-        'columns': list(result_df.columns)
+        result['email_error'] = email_error
+    return result
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status == 'failed':
+        return jsonify({'success': False, 'errors': job.errors}), 400
+    if job.status != 'done':
+        return jsonify(job.to_dict()), 202
+    return jsonify(job.result)
+
+
+@app.route('/cache/stats')
+def cache_stats():
+    return jsonify(results_store.stats())
+
+
+@app.route('/mail/stats')
+def mail_stats():
+    return jsonify(smtp_pool.stats())
+
+
+@app.route('/metrics')
+def metrics():
+    return Response(metrics_sink.render(), mimetype='text/plain; version=0.0.4')
+
+
+# ─── Stored Results ───────────────────────────────────────────────────────────
+
+def _int_arg(name, default, minimum=0):
+    value = request.args.get(name, type=int)
+    return default if value is None else max(value, minimum)
+
+
+@app.route('/results')
+def list_results():
+    """Stored results, newest first: ?page=1&per_page=20[&input_hash=...]"""
+    per_page = min(_int_arg('per_page', 20, 1), 1000)
+    page = _int_arg('page', 1, 1)
+    items, total = results_store.list((page - 1) * per_page, per_page,
+                                      request.args.get('input_hash'))
+    return jsonify({'results': items, 'total': total,
+                    'page': page, 'per_page': per_page})
+
+
+@app.route('/results/<analysis_id>')
+def get_result(analysis_id):
+    analysis = results_store.get(analysis_id)
+    if analysis is None:
+        return jsonify({'error': 'Result not found'}), 404
+    return jsonify(analysis)
+
+
+@app.route('/results/<analysis_id>/rows')
+def result_rows(analysis_id):
+    """Ranked rows: ?rank_from=1&rank_to=100&page=1&per_page=100"""
+    per_page = min(_int_arg('per_page', 100, 1), 10_000)
+    page = _int_arg('page', 1, 1)
+    rank_from = _int_arg('rank_from', 1, 1)
+    rank_to = request.args.get('rank_to', type=int)
+    rows = results_store.rows(analysis_id, rank_from, rank_to,
+                              offset=(page - 1) * per_page, limit=per_page)
+    if rows is None:
+        return jsonify({'error': 'Result not found'}), 404
+    return jsonify({'columns': list(rows.columns),
+                    'rows': rows.to_dict(orient='records'),
+                    'page': page, 'per_page': per_page})
+
+
+@app.route('/results/<analysis_id>/download')
+def download_result(analysis_id):
+    snapshot = results_store.open_csv(analysis_id)
+    if snapshot is None:
+        return jsonify({'error': 'File not found'}), 404
+    # Streamed from the store in upload order, never read whole, from the
+    # snapshot the size was read in
+    analysis, chunks = snapshot
+    return Response(chunks, mimetype='text/csv', headers={
+        'Content-Disposition': f'attachment; filename={analysis["result_file"]}',
+        'Content-Length': str(analysis['size']),
     })
 
 
 @app.route('/download/<filename>')
 def download(filename):
-    safe_name = secure_filename(filename)
-    path = os.path.join(app.config['RESULTS_FOLDER'], safe_name)
-    if os.path.exists(path):
-        return send_file(path, as_attachment=True)
-    return jsonify({'error': 'File not found'}), 404
+    analysis_id = analysis_id_from_filename(filename)
+    if analysis_id is None:
+        return jsonify({'error': 'File not found'}), 404
+    return download_result(analysis_id)
+
+
+# ─── Scoring Against the Reference Matrix ─────────────────────────────────────
+
+def scoring_endpoint(name):
+    """
+    JSON errors for the scoring routes, and the request's wall time in the
+    `name` latency series.
+    """
+    def decorate(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return view(*args, **kwargs)
+            except NoReference as e:
+                return jsonify({'error': str(e)}), 503
+            except ValueError as e:   # ScoringError, MatrixError
+                return jsonify({'error': str(e)}), 400
+            except FutureTimeout:
+                return jsonify({'error': 'Scoring timed out.'}), 503
+            finally:
+                scoring_service.latency.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def _json_body():
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        raise ScoringError("Request body must be a JSON object.")
+    return body
+
+
+@app.route('/score', methods=['POST'])
+@scoring_endpoint('score')
+def score_one():
+    """One candidate: {"row": [..] or {column: value}, "weights"?, "impacts"?}"""
+    body = _json_body()
+    if 'row' not in body:
+        raise ScoringError("Field 'row' is required.")
+    model, score, rank = scoring_service.score_one(
+        body['row'], body.get('weights'), body.get('impacts'))
+    return jsonify({'score': score, 'rank': rank, 'out_of': model.n_rows,
+                    'reference_version': model.version})
+
+
+@app.route('/score/batch', methods=['POST'])
+@scoring_endpoint('score_batch')
+def score_batch():
+    """Many candidates: {"rows": [...], "weights"?, "impacts"?}"""
+    body = _json_body()
+    rows = body.get('rows')
+    if not isinstance(rows, list) or not rows:
+        raise ScoringError("Field 'rows' must be a non-empty list.")
+    if len(rows) > app.config['SCORING_MAX_ROWS']:
+        raise ScoringError(f"At most {app.config['SCORING_MAX_ROWS']} rows per request.")
+    model, scores, ranks = scoring_service.score(
+        rows, body.get('weights'), body.get('impacts'))
+    return jsonify({'scores': scores.tolist(), 'ranks': ranks.tolist(),
+                    'out_of': model.n_rows, 'reference_version': model.version})
+
+
+@app.route('/rerank', methods=['POST'])
+@scoring_endpoint('rerank')
+def rerank():
+    """Best reference alternatives under new weights: {"weights", "impacts"?, "top"?}"""
+    body = _json_body()
+    top = body.get('top', 10)
+    if not isinstance(top, int) or top < 1:
+        raise ScoringError("Field 'top' must be a positive integer.")
+    model, positions, scores, ranks = scoring_service.rerank(
+        body.get('weights'), body.get('impacts'), top)
+    alternatives = model.alternatives[positions].tolist()
+    return jsonify({
+        'results': [{'alternative': a, 'score': s, 'rank': r}
+                    for a, s, r in zip(alternatives, scores.tolist(), ranks.tolist())],
+        'out_of': model.n_rows,
+        'reference_version': model.version,
+    })
+
+
+@app.route('/reference')
+@scoring_endpoint('reference')
+def reference_info():
+    return jsonify(scoring_service.current().info())
+
+
+@app.route('/reference/reload', methods=['POST'])
+@scoring_endpoint('reference_reload')
+def reload_reference():
+    """Reload REFERENCE_MATRIX; optional new default {"weights", "impacts"}."""
+    body = request.get_json(silent=True) or {}
+    model = scoring_service.reload(body.get('weights'), body.get('impacts'))
+    return jsonify(model.info())
+
+
+@app.route('/score/latency')
+def score_latency():
+    """Latency histograms of the scoring routes and their compute."""
+    return jsonify({'latency': scoring_service.latency.snapshot(),
+                    'batching': scoring_service.batcher.stats()})
 
 
 if __name__ == '__main__':
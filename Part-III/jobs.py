@@ -0,0 +1,121 @@
+"""
+Background job queue for the TOPSIS web service.
+
+`/analyze` used to parse, compute and send the result email inside the
+request thread, so a slow SMTP server held a worker for seconds.  Requests
+now enqueue a job here and return its id straight away; a bounded thread
+pool runs the analysis and email delivery, and `/jobs/<id>` reports
+progress.  Threads are used rather than processes because the slow part is
+network I/O (SMTP) and pandas / NumPy release the GIL for the heavy lifting.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFull(Exception):
+    """Raised when the queue already holds the maximum number of jobs."""
+
+
+class JobError(Exception):
+    """Expected job failure carrying user-facing error messages."""
+
+    def __init__(self, errors):
+        super().__init__('; '.join(errors))
+        self.errors = list(errors)
+
+
+class Job:
+    """State of one queued analysis."""
+
+    def __init__(self, job_id):
+        self.id = job_id
+        self.status = 'queued'      # queued → running → done | failed
+        self.progress = 'queued'    # current stage, for the status endpoint
+        self.result = None
+        self.errors = []
+        self.created = time.time()
+        self.finished = None
+
+    def set_progress(self, stage):
+        self.progress = stage
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': self.progress,
+            'errors': self.errors,
+        }
+
+
+class JobQueue:
+    """
+    Bounded worker pool.
+
+    max_workers: jobs executed concurrently
+    max_pending: queued + running jobs accepted before `submit` raises
+                 QueueFull (the web layer turns that into HTTP 429)
+    retention:   seconds a finished job stays queryable
+    """
+
+    def __init__(self, max_workers=4, max_pending=32, retention=3600):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='topsis-job')
+        self._max_pending = max_pending
+        self._retention = retention
+        self._jobs = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queue `fn(job, *args, **kwargs)` and return the new Job.
+
+        `fn` reports progress through `job.set_progress` and returns the
+        result payload; an exception marks the job as failed.
+        """
+        with self._lock:
+            self._prune()
+            if self._pending >= self._max_pending:
+                raise QueueFull()
+            job = Job(uuid.uuid4().hex[:12])
+            self._jobs[job.id] = job
+            self._pending += 1
+
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = 'running'
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = 'done'
+            job.progress = 'done'
+        except JobError as e:
+            job.errors = e.errors
+            job.status = 'failed'
+        except Exception as e:
+            job.errors = [f"Job failed: {str(e)}"]
+            job.status = 'failed'
+        finally:
+            job.finished = time.time()
+            with self._lock:
+                self._pending -= 1
+
+    def _prune(self):
+        cutoff = time.time() - self._retention
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished is not None and job.finished < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
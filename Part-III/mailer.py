@@ -0,0 +1,273 @@
+"""
+Pooled SMTP delivery for result emails.
+
+Each result email used to open a fresh connection to the SMTP server, run
+EHLO / STARTTLS / AUTH, send one message and QUIT -- several round trips and
+often seconds of latency per email.  `SMTPPool` keeps authenticated
+connections per (host, port, sender account) and hands them back out to the
+job workers:
+
+  idle_timeout  connections unused for longer than this are closed rather
+                than reused (servers drop idle sessions anyway)
+  max_idle      idle connections kept per account
+  reconnect     a connection the server has dropped is replaced and the
+                send retried once
+
+`stats` reports delivery latency and failure counters.  Pointing
+SMTP_HOST / SMTP_PORT at a local stub such as aiosmtpd (with TLS off)
+exercises the same code path; such stubs usually do not offer AUTH, and the
+pool then sends without logging in and logs a warning.
+"""
+
+import hashlib
+import logging
+import os
+import smtplib
+import threading
+import time
+from collections import deque
+from email import encoders
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+
+SUBJECT = '🎯 TOPSIS Analysis Result'
+
+BODY = """Hello,
+
+Your TOPSIS analysis has been completed successfully!
+
+Please find the results attached as a CSV file. The file contains:
+  • All original data
+  • Topsis Score for each alternative
+  • Final Rankings
+
+Thank you for using the TOPSIS Analysis Tool.
+
+Best regards,
+TOPSIS Analyzer
+"""
+
+# Errors meaning the session is gone, not that the message was rejected
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError,
+                      TimeoutError)
+
+
+def build_message(sender_email, to_emails, result_paths):
+    """
+    Result email to one or more recipients with one or more CSVs attached.
+
+    Each attachment is a file path or a `(filename, bytes)` pair.
+    """
+    if isinstance(to_emails, str):
+        to_emails = [to_emails]
+    if isinstance(result_paths, (str, tuple)):
+        result_paths = [result_paths]
+
+    msg = MIMEMultipart()
+    msg['From'] = sender_email
+    msg['To'] = ', '.join(to_emails)
+    msg['Subject'] = SUBJECT
+    msg.attach(MIMEText(BODY, 'plain'))
+
+    for result_path in result_paths:
+        if isinstance(result_path, tuple):
+            name, payload = result_path
+        else:
+            name = os.path.basename(result_path)
+            with open(result_path, 'rb') as f:
+                payload = f.read()
+        part = MIMEBase('application', 'octet-stream')
+        part.set_payload(payload)
+        encoders.encode_base64(part)
+        part.add_header('Content-Disposition', f'attachment; filename="{name}"')
+        msg.attach(part)
+    return msg
+
+
+class _Connection:
+    """One open SMTP session and when it was last used."""
+
+    def __init__(self, server):
+        self.server = server
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+
+
+class SMTPPool:
+    """
+    Authenticated SMTP sessions to one server, reused across sends.
+
+    `send` takes an idle session of the sender's account or opens one,
+    delivers the message and returns the session to the pool.  Safe to
+    share between threads; a session is only used by one send at a time.
+    """
+
+    def __init__(self, host, port, use_tls=True, idle_timeout=60,
+                 max_idle=2, timeout=30, latency_window=256, logger=None):
+        self.host = host
+        self.port = port
+        self.use_tls = use_tls
+        self.idle_timeout = idle_timeout
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.logger = logger or logging.getLogger(__name__)
+
+        self._idle = {}                # account -> [_Connection]
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._stats = {'sent': 0, 'failed': 0, 'connections_opened': 0,
+                       'connections_reused': 0, 'reconnects': 0,
+                       'idle_closed': 0}
+
+    # ── Delivery ──
+
+    def send(self, sender_email, sender_password, to_emails, msg):
+        """
+        Deliver `msg` to `to_emails` (an address or a list).
+
+        Returns (ok, error), with error a message for the user.  A session
+        the server has dropped is replaced and the send retried once.
+        """
+        if isinstance(to_emails, str):
+            to_emails = [to_emails]
+        try:
+            conn = self._acquire(sender_email, sender_password)
+        except Exception as e:
+            with self._lock:
+                self._stats['failed'] += 1
+            return False, self._describe(e)
+
+        start = time.monotonic()
+        try:
+            try:
+                conn.server.sendmail(sender_email, to_emails, msg.as_string())
+            except _CONNECTION_ERRORS:
+                # Server dropped the session (idle timeout, restart): retry once
+                conn.close()
+                # Whatever the reconnect raises (e.g. socket.gaierror), the
+                # closed session must not go back to the pool
+                conn = None
+                conn = self._connect(sender_email, sender_password)
+                with self._lock:
+                    self._stats['reconnects'] += 1
+                conn.server.sendmail(sender_email, to_emails, msg.as_string())
+        except Exception as e:
+            with self._lock:
+                self._stats['failed'] += 1
+            if conn is None:
+                pass  # the reconnect failed; there is no session left
+            elif isinstance(e, _CONNECTION_ERRORS + (smtplib.SMTPAuthenticationError,)):
+                # The session is unusable
+                conn.close()
+            else:
+                # The message was rejected; the session can still be used
+                self._release(sender_email, sender_password, conn)
+            return False, self._describe(e)
+
+        with self._lock:
+            self._latencies.append(time.monotonic() - start)
+            self._stats['sent'] += 1
+        self._release(sender_email, sender_password, conn)
+        return True, None
+
+    @staticmethod
+    def _describe(error):
+        if isinstance(error, smtplib.SMTPAuthenticationError):
+            return "Email authentication failed. Please check SMTP credentials."
+        if isinstance(error, smtplib.SMTPException):
+            return f"SMTP error: {str(error)}"
+        return f"Failed to send email: {str(error)}"
+
+    # ── Connections ──
+
+    @staticmethod
+    def _account(sender_email, sender_password):
+        # A session is only reused by callers holding the same credentials
+        digest = hashlib.sha256(sender_password.encode()).hexdigest()
+        return (sender_email, digest)
+
+    def _connect(self, sender_email, sender_password):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            if self.use_tls:
+                server.starttls()
+                server.ehlo()
+            if server.has_extn('auth'):
+                server.login(sender_email, sender_password)
+            elif sender_password:
+                # Local stand-ins (e.g. aiosmtpd) usually do not offer AUTH
+                self.logger.warning(
+                    "SMTP server %s:%s does not offer AUTH; sending as %s "
+                    "without logging in", self.host, self.port, sender_email)
+        except Exception:
+            server.close()
+            raise
+        with self._lock:
+            self._stats['connections_opened'] += 1
+        return _Connection(server)
+
+    def _acquire(self, sender_email, sender_password):
+        stale = []
+        conn = None
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(self._account(sender_email, sender_password), [])
+            while idle:
+                candidate = idle.pop()
+                if now - candidate.last_used <= self.idle_timeout:
+                    conn = candidate
+                    self._stats['connections_reused'] += 1
+                    break
+                stale.append(candidate)
+            self._stats['idle_closed'] += len(stale)
+
+        for old in stale:
+            old.close()
+        if conn is None:
+            conn = self._connect(sender_email, sender_password)
+        return conn
+
+    def _release(self, sender_email, sender_password, conn):
+        conn.last_used = time.monotonic()
+        with self._lock:
+            idle = self._idle.setdefault(self._account(sender_email, sender_password), [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self):
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+    # ── Metrics ──
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            latencies = sorted(self._latencies)
+            stats['idle_connections'] = sum(len(v) for v in self._idle.values())
+        attempts = stats['sent'] + stats['failed']
+        stats['failure_rate'] = round(stats['failed'] / attempts, 4) if attempts else 0.0
+        if latencies:
+            stats['latency_ms'] = {
+                'mean': round(1000 * sum(latencies) / len(latencies), 2),
+                'p50': round(1000 * latencies[len(latencies) // 2], 2),
+                'p95': round(1000 * latencies[min(len(latencies) - 1,
+                                                  int(len(latencies) * 0.95))], 2),
+                'max': round(1000 * latencies[-1], 2),
+            }
+        else:
+            stats['latency_ms'] = None
+        return stats
@@ -0,0 +1,503 @@
+"""
+Embedded store of TOPSIS results (SQLite).
+
+Results used to be loose CSV files in RESULTS_FOLDER, served by file name,
+found again by scanning the folder and only removed by the result cache's
+size bound.  They now live in one SQLite database:
+
+  analyses     one row per result: id (the job that computed it),
+               input_hash (upload + weights + impacts), created, row count,
+               columns and CSV size; indexed on input_hash and created
+  result_rows  one row per alternative: its position in the upload, its
+               ordinal (place in the ranking, ties in upload order), its
+               rank as displayed (2.5 for a tie) and the result row as a
+               CSV line; keyed by (analysis, position) and indexed on
+               (analysis, ordinal)
+
+A repeat analysis is found by its input hash, the best N alternatives or a
+rank range ("ranks 1-100", by ordinal, so every row of a tie lands in
+exactly one range) are an index range scan, and a download streams
+the rows in file order off the primary key, so nothing reads a whole
+result.  Rows are stored as the CSV text pandas writes, which keeps
+downloads byte-identical to the old result files.
+
+A background sweeper deletes analyses older than `retention` seconds, and
+once the stored CSV bytes exceed `max_bytes`, each save evicts the oldest
+analyses until they fit again, so heavy traffic cannot grow the database
+without bound within the retention period.
+
+Reads that span several queries (a page of rows, a download, a summary)
+run in one read transaction, so an analysis that the sweeper or eviction
+deletes meanwhile is either read whole or reported as missing, never half
+read.  `summary` (what a finished job returns and emails) is also kept in
+an LRU of up to `memory_bytes`, so a repeat analysis is answered from
+memory.
+
+Usage:
+    store = ResultsStore('results/results.db', retention=24 * 3600,
+                         max_bytes=1024 ** 3, memory_bytes=64 * 1024 ** 2)
+    store.save(job.id, input_hash, result_chunks)
+    store.rows(analysis_id, rank_from=1, rank_to=100)   # DataFrame
+    meta, chunks = store.open_csv(analysis_id)
+    Response(chunks, mimetype='text/csv')
+"""
+
+import contextlib
+import io
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+# Bumped when the tables change; older databases are dropped on open, as
+# results are only kept for the retention period anyway
+SCHEMA_VERSION = 2
+
+DROP_SCHEMA = """
+DROP TABLE IF EXISTS result_rows;
+DROP TABLE IF EXISTS analyses;
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id          TEXT PRIMARY KEY,
+    input_hash  TEXT NOT NULL,
+    created     REAL NOT NULL,
+    complete    INTEGER NOT NULL DEFAULT 0,
+    n_rows      INTEGER NOT NULL DEFAULT 0,
+    size        INTEGER NOT NULL DEFAULT 0,
+    columns     TEXT NOT NULL,
+    header      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_input_hash ON analyses (input_hash, created);
+CREATE INDEX IF NOT EXISTS analyses_created ON analyses (created);
+
+CREATE TABLE IF NOT EXISTS result_rows (
+    analysis_id TEXT NOT NULL,
+    position    INTEGER NOT NULL,
+    ordinal     INTEGER NOT NULL,
+    rank        REAL NOT NULL,
+    line        TEXT NOT NULL,
+    PRIMARY KEY (analysis_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS result_rows_ordinal ON result_rows (analysis_id, ordinal);
+"""
+
+# Rows per query when streaming a download, and per delete when sweeping
+FETCH_ROWS = 10_000
+DELETE_ROWS = 100_000
+
+FILE_PREFIX = 'topsis_result_'
+
+
+def input_key(file_digest, weights, impacts):
+    """
+    Hash of an upload (hashed incrementally into `file_digest`) plus the
+    weights, normalised to sum 1, and the impacts.
+    """
+    total = sum(weights)
+    normalized = ','.join(repr(round(w / total, 12)) for w in weights)
+    digest = file_digest.copy()
+    digest.update(b'\0' + normalized.encode())
+    digest.update(b'\0' + ','.join(impacts).encode())
+    return digest.hexdigest()
+
+
+def filename(analysis_id):
+    """Download name of a result, e.g. topsis_result_<id>.csv."""
+    return f"{FILE_PREFIX}{analysis_id}.csv"
+
+
+def analysis_id_from_filename(name):
+    """Inverse of `filename`; None if `name` is not a result file name."""
+    if name.startswith(FILE_PREFIX) and name.endswith('.csv'):
+        return name[len(FILE_PREFIX):-len('.csv')]
+    return None
+
+
+def _csv_lines(chunk):
+    """The rows of `chunk` as pandas writes them to CSV, one string each."""
+    text = chunk.to_csv(header=False, index=False, lineterminator='\n')
+    lines = text.split('\n')[:-1]
+    if len(lines) != len(chunk):
+        # A quoted cell holds a line break; format row by row instead
+        lines = [chunk.iloc[i:i + 1].to_csv(header=False, index=False,
+                                            lineterminator='\n')[:-1]
+                 for i in range(len(chunk))]
+    return lines
+
+
+class ResultsStore:
+
+    def __init__(self, path, retention=24 * 3600, max_bytes=None,
+                 memory_bytes=0):
+        self.path = path
+        self.retention = retention
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # (id, preview rows) -> (summary, bytes)
+        self._memory_used = 0
+        self._stats = {'hits': 0, 'misses': 0, 'memory_hits': 0, 'swept': 0,
+                       'evicted': 0}
+        self._stop = threading.Event()
+        self._sweeper = None
+        db = self._db()
+        if db.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+            db.executescript(DROP_SCHEMA)
+        db.executescript(SCHEMA)
+        db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        db.row_factory = sqlite3.Row
+        # Readers do not block the writer, and vice versa
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        return db
+
+    def _db(self):
+        """This thread's connection; sqlite3 connections are per thread."""
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = self._connect()
+        return db
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _snapshot(db):
+        """Read transaction: every query inside sees the same database state."""
+        db.execute('BEGIN')
+        try:
+            yield db
+        finally:
+            db.rollback()
+
+    def _cutoff(self):
+        return time.time() - self.retention
+
+    @staticmethod
+    def _meta(row):
+        return {
+            'id': row['id'],
+            'input_hash': row['input_hash'],
+            'created': row['created'],
+            'total_rows': row['n_rows'],
+            'size': row['size'],
+            'columns': json.loads(row['columns']),
+            'result_file': filename(row['id']),
+        }
+
+    # ── Writing ──
+
+    def save(self, analysis_id, input_hash, chunks, ordinals):
+        """
+        Store result DataFrames (with 'Topsis Score' and 'Rank' columns)
+        one after another as the result `analysis_id`; returns its metadata.
+        `ordinals` holds the place of every row in the ranking (1 = best,
+        ties in upload order), in upload order.
+
+        Each chunk is committed on its own so readers are not held up; the
+        analysis only becomes visible once every chunk is in.
+        """
+        db = self._db()
+        position = size = 0
+        created = False
+        try:
+            for chunk in chunks:
+                if not created:
+                    header = chunk.iloc[:0].to_csv(index=False,
+                                                   lineterminator='\n')[:-1]
+                    with db:
+                        db.execute(
+                            'INSERT INTO analyses (id, input_hash, created, '
+                            'columns, header) VALUES (?, ?, ?, ?, ?)',
+                            (analysis_id, input_hash, time.time(),
+                             json.dumps(list(map(str, chunk.columns))), header))
+                    created = True
+                    size = len(header.encode()) + 1
+                lines = _csv_lines(chunk)
+                with db:
+                    db.executemany(
+                        'INSERT INTO result_rows (analysis_id, position, ordinal, '
+                        'rank, line) VALUES (?, ?, ?, ?, ?)',
+                        zip([analysis_id] * len(lines),
+                            range(position, position + len(lines)),
+                            ordinals[position:position + len(lines)].tolist(),
+                            chunk['Rank'].tolist(), lines))
+                position += len(lines)
+                size += sum(len(line.encode()) for line in lines) + len(lines)
+            if not created:
+                raise ValueError("No result rows to store.")
+            with db:
+                db.execute('UPDATE analyses SET complete = 1, n_rows = ?, size = ? '
+                           'WHERE id = ?', (position, size, analysis_id))
+        except BaseException:
+            if created:
+                self.delete(analysis_id)
+            raise
+        self.evict(keep=analysis_id)
+        return self.get(analysis_id)
+
+    # ── Lookup ──
+
+    def get(self, analysis_id):
+        """Metadata of a stored result, or None if unknown or expired."""
+        row = self._db().execute(
+            'SELECT * FROM analyses WHERE id = ? AND complete = 1 AND created >= ?',
+            (analysis_id, self._cutoff())).fetchone()
+        return None if row is None else self._meta(row)
+
+    def find(self, input_hash):
+        """Newest stored result for `input_hash`, or None; counts hits."""
+        row = self._db().execute(
+            'SELECT * FROM analyses WHERE input_hash = ? AND complete = 1 '
+            'AND created >= ? ORDER BY created DESC LIMIT 1',
+            (input_hash, self._cutoff())).fetchone()
+        with self._lock:
+            self._stats['misses' if row is None else 'hits'] += 1
+        return None if row is None else self._meta(row)
+
+    def list(self, offset=0, limit=20, input_hash=None):
+        """Page of stored results, newest first, and the total count."""
+        where = 'complete = 1 AND created >= ?'
+        params = [self._cutoff()]
+        if input_hash:
+            where += ' AND input_hash = ?'
+            params.append(input_hash)
+        db = self._db()
+        total = db.execute(f'SELECT COUNT(*) FROM analyses WHERE {where}',
+                           params).fetchone()[0]
+        rows = db.execute(f'SELECT * FROM analyses WHERE {where} '
+                          f'ORDER BY created DESC LIMIT ? OFFSET ?',
+                          params + [limit, offset]).fetchall()
+        return [self._meta(row) for row in rows], total
+
+    def rows(self, analysis_id, rank_from=1, rank_to=None, offset=0, limit=100):
+        """
+        Result rows by rank, best first, as a DataFrame typed like the CSV.
+
+        `rank_from` / `rank_to` bound the places in the ranking (inclusive,
+        1 = best); tied rows take consecutive places in upload order, so
+        adjacent ranges never drop or repeat a row of a tie.  `offset` and
+        `limit` page through the rows in that range.  Returns None for an
+        unknown or expired result.
+        """
+        with self._snapshot(self._db()) as db:
+            return self._rows(db, analysis_id, rank_from, rank_to, offset, limit)
+
+    def _complete(self, db, analysis_id):
+        return db.execute(
+            'SELECT * FROM analyses WHERE id = ? AND complete = 1 AND created >= ?',
+            (analysis_id, self._cutoff())).fetchone()
+
+    def _rows(self, db, analysis_id, rank_from=1, rank_to=None, offset=0,
+              limit=100):
+        meta = self._complete(db, analysis_id)
+        if meta is None:
+            return None
+        lines = [row[0] for row in db.execute(
+            'SELECT line FROM result_rows WHERE analysis_id = ? AND ordinal >= ? '
+            'AND ordinal <= ? ORDER BY ordinal LIMIT ? OFFSET ?',
+            (analysis_id, rank_from, rank_to if rank_to is not None else 2 ** 62,
+             limit, offset))]
+        return pd.read_csv(io.StringIO('\n'.join([meta['header']] + lines)))
+
+    def _csv_chunks(self, db, meta):
+        yield meta['header'] + '\n'
+        for start in range(0, meta['n_rows'], FETCH_ROWS):
+            lines = [row[0] for row in db.execute(
+                'SELECT line FROM result_rows WHERE analysis_id = ? '
+                'AND position >= ? AND position < ? ORDER BY position',
+                (meta['id'], start, start + FETCH_ROWS))]
+            yield '\n'.join(lines) + '\n'
+
+    def open_csv(self, analysis_id):
+        """
+        Metadata of a stored result and an iterator over its CSV in upload
+        order, `FETCH_ROWS` rows at a time, or None for an unknown, expired
+        or partly written result.
+
+        Both come from one read transaction on a connection of their own,
+        held until the iterator finishes or is closed, so the CSV is exactly
+        `size` bytes even if the result is deleted while it streams.
+        """
+        db = self._connect()
+        try:
+            db.execute('BEGIN')
+            meta = self._complete(db, analysis_id)
+        except BaseException:
+            db.close()
+            raise
+        if meta is None:
+            db.close()
+            return None
+
+        def chunks():
+            try:
+                yield from self._csv_chunks(db, meta)
+            finally:
+                db.close()
+
+        return self._meta(meta), chunks()
+
+    def iter_csv(self, analysis_id):
+        """
+        Yield the result CSV in upload order; nothing for an unknown,
+        expired or partly written result.
+        """
+        snapshot = self.open_csv(analysis_id)
+        if snapshot is not None:
+            yield from snapshot[1]
+
+    def export(self, analysis_id):
+        """
+        The whole result CSV as bytes, e.g. for an email attachment, or
+        None for an unknown or expired result.
+        """
+        snapshot = self.open_csv(analysis_id)
+        if snapshot is None:
+            return None
+        return ''.join(snapshot[1]).encode()
+
+    def summary(self, analysis_id, preview_rows=100, csv_max_bytes=None):
+        """
+        (metadata, best `preview_rows` rows as a DataFrame, CSV bytes) of a
+        stored result, read in one transaction, or None for an unknown or
+        expired result.  The CSV is None when it is larger than
+        `csv_max_bytes`.  Summaries are kept in memory, most recently used
+        first, up to `memory_bytes` in total.
+        """
+        key = (analysis_id, preview_rows)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is not None:
+            summary, _ = entry
+            meta, _, csv = summary
+            if meta['created'] >= self._cutoff() and (
+                    csv is not None or csv_max_bytes is not None
+                    and meta['size'] > csv_max_bytes):
+                with self._lock:
+                    self._stats['memory_hits'] += 1
+                return summary
+
+        with self._snapshot(self._db()) as db:
+            meta = self._complete(db, analysis_id)
+            if meta is None:
+                return None
+            preview = self._rows(db, analysis_id, limit=preview_rows)
+            csv = None
+            if csv_max_bytes is None or meta['size'] <= csv_max_bytes:
+                csv = ''.join(self._csv_chunks(db, meta)).encode()
+        summary = (self._meta(meta), preview, csv)
+        self._remember(key, summary)
+        return summary
+
+    def _remember(self, key, summary):
+        _, preview, csv = summary
+        nbytes = int(preview.memory_usage(deep=True).sum()) + len(csv or b'')
+        if nbytes > self.memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_used -= old[1]
+            self._memory[key] = (summary, nbytes)
+            self._memory_used += nbytes
+            while self._memory_used > self.memory_bytes:
+                _, (_, dropped) = self._memory.popitem(last=False)
+                self._memory_used -= dropped
+
+    def _forget(self, analysis_id):
+        with self._lock:
+            for key in [k for k in self._memory if k[0] == analysis_id]:
+                self._memory_used -= self._memory.pop(key)[1]
+
+    # ── Retention ──
+
+    def delete(self, analysis_id):
+        """Remove a result, its rows in batches so writers are not blocked."""
+        self._forget(analysis_id)
+        db = self._db()
+        while True:
+            with db:
+                deleted = db.execute(
+                    'DELETE FROM result_rows WHERE analysis_id = ? AND position IN '
+                    '(SELECT position FROM result_rows WHERE analysis_id = ? LIMIT ?)',
+                    (analysis_id, analysis_id, DELETE_ROWS)).rowcount
+            if deleted < DELETE_ROWS:
+                break
+        with db:
+            db.execute('DELETE FROM analyses WHERE id = ?', (analysis_id,))
+
+    def sweep(self):
+        """Delete results older than `retention`; returns how many."""
+        expired = [row[0] for row in self._db().execute(
+            'SELECT id FROM analyses WHERE created < ?', (self._cutoff(),))]
+        for analysis_id in expired:
+            self.delete(analysis_id)
+        with self._lock:
+            self._stats['swept'] += len(expired)
+        return len(expired)
+
+    def evict(self, keep=None):
+        """
+        Delete the oldest results until the stored CSV bytes are within
+        `max_bytes`; `keep` (the result just saved) is never evicted.
+        Returns how many were deleted.
+        """
+        if self.max_bytes is None:
+            return 0
+        db = self._db()
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM analyses '
+                           'WHERE complete = 1').fetchone()[0]
+        evicted = 0
+        for row in db.execute('SELECT id, size FROM analyses WHERE complete = 1 '
+                              'AND id != ? ORDER BY created',
+                              (keep,)).fetchall():
+            if total <= self.max_bytes:
+                break
+            self.delete(row['id'])
+            total -= row['size']
+            evicted += 1
+        with self._lock:
+            self._stats['evicted'] += evicted
+        return evicted
+
+    def start_sweeper(self, interval=600):
+        """Run `sweep` every `interval` seconds on a daemon thread."""
+        if self._sweeper is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.sweep()
+                except sqlite3.Error:
+                    pass  # e.g. database locked; try again next round
+
+        self._sweeper = threading.Thread(target=run, name='results-sweeper',
+                                         daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop.set()
+
+    def stats(self):
+        db = self._db()
+        analyses, rows, size = db.execute(
+            'SELECT COUNT(*), COALESCE(SUM(n_rows), 0), COALESCE(SUM(size), 0) '
+            'FROM analyses WHERE complete = 1').fetchone()
+        with self._lock:
+            stats = dict(self._stats, memory_entries=len(self._memory),
+                         memory_bytes=self._memory_used)
+        stats.update(analyses=analyses, rows=rows, csv_bytes=size,
+                     max_bytes=self.max_bytes, retention=self.retention)
+        return stats
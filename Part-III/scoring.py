@@ -0,0 +1,410 @@
+"""
+Low-latency scoring against a preloaded reference matrix.
+
+`/analyze` is built for one-off uploads: every request parses a file,
+fits the norms and ideal points, and scores it in a background job.  The
+scoring endpoints instead load a reference decision matrix (REFERENCE_MATRIX)
+once and keep everything that does not depend on the request in memory:
+
+  - the validated matrix and its column statistics
+  - per weights/impacts: a `TopsisModel` fitted on those statistics and the
+    sorted reference scores, in a small LRU cache, so a candidate's rank
+    among the reference alternatives is a binary search
+    (`topsis_pkg.ranking.insertion_ranks`)
+
+Scoring a candidate is then a handful of m-long vector operations, and
+re-ranking the reference under new weights one pass over the matrix and a
+`topsis_pkg.ranking.top_k` selection.  Candidates are scored against the
+reference's norms and ideal points; they do not change them.
+
+Single-row requests go through a `MicroBatcher`: a worker thread takes every
+request that is waiting (optionally waiting up to SCORING_BATCH_WAIT_US for
+more) and scores them as one matrix, so concurrent callers share one NumPy
+call instead of each paying its overhead.
+
+`ScoringService.reload` builds a new `ReferenceModel` while requests keep
+being served from the old one and then swaps it in with one assignment;
+every request works on the snapshot it started with, so none are dropped
+or see a half-loaded matrix.  An optional watcher reloads when the file
+changes.
+
+`LatencyHistogram` counts request and compute times in fixed buckets for
+`GET /score/latency`.
+
+Usage:
+    service = ScoringService('reference.csv')
+    service.reload(weights=[1, 1, 2], impacts='+,-,+')
+    service.score([[250, 16, 12]])            # scores and reference ranks
+    service.rerank(weights=[2, 1, 1], top=10)
+"""
+
+import bisect
+import functools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+from shared import (MatrixError, TopsisModel, as_impacts, as_weights,
+                    criteria_matrix, insertion_ranks, top_k)
+
+
+# Fitted weights/impacts kept per reference
+FIT_CACHE_SIZE = 64
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 1.0, float('inf'))
+
+
+class ScoringError(ValueError):
+    """The scoring request is invalid; the message is shown to the user."""
+
+
+class NoReference(Exception):
+    """No reference matrix is loaded."""
+
+
+# ── Reference model ──
+
+class ReferenceModel:
+    """
+    Immutable snapshot of a loaded reference matrix.
+
+    Everything that depends only on the matrix is computed here once;
+    `fitted(weights, impacts)` adds what depends on the weights, cached.
+    Weights and impacts are checked here, with messages for the user;
+    the model's own checks raise ValueError, reported as ScoringError.
+    """
+
+    def __init__(self, df, weights, impacts, source=None, mtime=None,
+                 version=1):
+        self.matrix = criteria_matrix(df)
+        self.columns = [str(c) for c in df.columns[1:]]
+        self.alternatives = df.iloc[:, 0].to_numpy()
+        self.n_rows, self.n_criteria = self.matrix.shape
+        if self.n_rows == 0:
+            raise MatrixError("The reference matrix contains no alternatives.")
+        self.sumsq = (self.matrix ** 2).sum(axis=0)
+        self.col_min = self.matrix.min(axis=0)
+        self.col_max = self.matrix.max(axis=0)
+        self.weights = self._weights(weights)
+        self.impacts = self._impacts(impacts)
+        self.source = source
+        self.mtime = mtime
+        self.version = version
+        self.loaded_at = time.time()
+        self.fitted = functools.lru_cache(maxsize=FIT_CACHE_SIZE)(self._fit)
+        # Warms the default; raises MatrixError for an all-zero criterion
+        self.fitted(self.weights, self.impacts)
+
+    @classmethod
+    def from_csv(cls, path, weights=None, impacts=None, version=1):
+        """Load `path`; weights default to equal, impacts to all '+'."""
+        # Taken first, so a write during the read is seen by the watcher
+        mtime = os.path.getmtime(path)
+        df = pd.read_csv(path)
+        if df.shape[1] < 2:
+            raise MatrixError("The reference matrix must have at least 2 "
+                              "columns (1 alternatives + 1 criterion).")
+        n_criteria = df.shape[1] - 1
+        return cls(df, weights or [1.0] * n_criteria,
+                   impacts or ['+'] * n_criteria, source=path, mtime=mtime,
+                   version=version)
+
+    def _weights(self, weights):
+        try:
+            weights = as_weights(weights)
+        except ValueError:
+            raise ScoringError("Weights must be numeric values (e.g., 1,2,1,3).")
+        if not (np.isfinite(weights) & (weights > 0)).all():
+            raise ScoringError("All weights must be positive numbers.")
+        if len(weights) != self.n_criteria:
+            raise ScoringError(f"Number of weights ({len(weights)}) must equal "
+                               f"number of criteria columns ({self.n_criteria}).")
+        return tuple(weights.tolist())
+
+    def _impacts(self, impacts):
+        try:
+            impacts = as_impacts(impacts)
+        except ValueError as e:
+            raise ScoringError(str(e))
+        if len(impacts) != self.n_criteria:
+            raise ScoringError(f"Number of impacts ({len(impacts)}) must equal "
+                               f"number of criteria columns ({self.n_criteria}).")
+        return tuple(impacts)
+
+    def _fit(self, weights, impacts):
+        """(fitted TopsisModel, reference scores, reference scores sorted)."""
+        model = TopsisModel(weights, impacts).fit_stats(
+            self.sumsq, self.col_min, self.col_max, criteria=self.columns)
+        scores = model.score(self.matrix)
+        return model, scores, np.sort(scores)
+
+    def resolve(self, weights=None, impacts=None):
+        """Request weights/impacts, or the reference defaults, as cache keys."""
+        weights = self.weights if weights is None else self._weights(weights)
+        impacts = self.impacts if impacts is None else self._impacts(impacts)
+        return weights, impacts
+
+    def as_rows(self, rows):
+        """Candidate rows (lists, or objects keyed by column) as a float matrix."""
+        if rows and isinstance(rows[0], dict):
+            try:
+                rows = [[row[c] for c in self.columns] for row in rows]
+            except (KeyError, TypeError):
+                raise ScoringError(f"Each row must have the columns {self.columns}.")
+        try:
+            matrix = np.array(rows, dtype=float, ndmin=2)
+        except (TypeError, ValueError):
+            raise ScoringError("Rows must contain numeric values only.")
+        if matrix.ndim != 2 or matrix.shape[1] != self.n_criteria:
+            raise ScoringError(f"Each row must have {self.n_criteria} values "
+                               f"({', '.join(self.columns)}).")
+        if not np.isfinite(matrix).all():
+            raise ScoringError("Rows must not contain missing or infinite values.")
+        return matrix
+
+    def score(self, matrix, weights, impacts):
+        """Scores of candidate rows and the rank each would take."""
+        model, _, ordered = self.fitted(weights, impacts)
+        scores = model.score(matrix)
+        return scores, insertion_ranks(ordered, scores)
+
+    def rerank(self, weights, impacts, top):
+        """Positions, scores and ranks of the best `top` reference rows."""
+        _, scores, _ = self.fitted(weights, impacts)
+        best, ranks = top_k(scores, top)
+        return best, scores[best], ranks
+
+    def info(self):
+        return {
+            'source': self.source,
+            'version': self.version,
+            'loaded_at': self.loaded_at,
+            'rows': self.n_rows,
+            'columns': self.columns,
+            'weights': list(self.weights),
+            'impacts': list(self.impacts),
+        }
+
+
+# ── Micro-batching ──
+
+class MicroBatcher:
+    """
+    Scores single rows submitted from many threads in shared batches.
+
+    `fn(key, matrix)` scores the stacked rows of requests with the same
+    `key` and returns one result per row.  The worker takes every waiting
+    request, up to `max_batch`; `max_wait` seconds (0 = do not wait) lets
+    a batch fill further at the cost of that much latency.
+    """
+
+    def __init__(self, fn, max_batch=1024, max_wait=0.0):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.SimpleQueue()
+        self._stats = {'requests': 0, 'batches': 0, 'largest_batch': 0}
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name='score-batcher',
+                                        daemon=True)
+        self._worker.start()
+
+    def submit(self, key, row):
+        """Queue one row; returns a Future of its result."""
+        future = Future()
+        self._queue.put((key, row, future))
+        return future
+
+    def _take(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                timeout = deadline - time.perf_counter()
+                if timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._take()
+            with self._lock:
+                self._stats['requests'] += len(batch)
+                self._stats['batches'] += 1
+                self._stats['largest_batch'] = max(self._stats['largest_batch'],
+                                                   len(batch))
+            groups = {}
+            for key, row, future in batch:
+                groups.setdefault(key, []).append((row, future))
+            for key, items in groups.items():
+                try:
+                    results = self.fn(key, np.vstack([row for row, _ in items]))
+                except Exception as e:
+                    for _, future in items:
+                        future.set_exception(e)
+                    continue
+                for (_, future), result in zip(items, results):
+                    future.set_result(result)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+# ── Latency ──
+
+class LatencyHistogram:
+    """Counts of durations per endpoint in the fixed `LATENCY_BUCKETS`."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._series = {}   # name -> [bucket counts, total seconds]
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            counts, _ = series = self._series.setdefault(
+                name, [[0] * len(self.buckets), 0.0])
+            counts[i] += 1
+            series[1] += seconds
+
+    def _quantile(self, counts, q):
+        # Upper bound of the bucket holding the q-th observation
+        target = q * sum(counts)
+        seen = 0
+        for bound, count in zip(self.buckets, counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.buckets[-1]
+
+    def snapshot(self):
+        with self._lock:
+            series = {name: (list(c), total) for name, (c, total) in self._series.items()}
+        result = {}
+        for name, (counts, total) in sorted(series.items()):
+            n = sum(counts)
+            result[name] = {
+                'count': n,
+                'mean_ms': total / n * 1000 if n else None,
+                'p50_ms': self._quantile(counts, 0.5) * 1000 if n else None,
+                'p99_ms': self._quantile(counts, 0.99) * 1000 if n else None,
+                'buckets': [{'le_ms': 'inf' if b == float('inf') else b * 1000,
+                             'count': c} for b, c in zip(self.buckets, counts)],
+            }
+        return result
+
+
+# ── Service ──
+
+class ScoringService:
+    """The current reference model, its micro-batcher and hot reload."""
+
+    def __init__(self, path=None, max_batch=1024, max_wait=0.0):
+        self.path = path
+        self.model = None
+        self.latency = LatencyHistogram()
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+        self.batcher = MicroBatcher(self._score_batch, max_batch, max_wait)
+
+    def current(self):
+        model = self.model
+        if model is None:
+            raise NoReference("No reference matrix is loaded.")
+        return model
+
+    def reload(self, weights=None, impacts=None):
+        """
+        Load the reference file again and swap it in; requests in flight
+        finish on the old model.  Keeps the default weights/impacts unless
+        new ones are given.  Raises MatrixError / ScoringError, leaving the
+        current model in place.
+        """
+        if not self.path:
+            raise NoReference("REFERENCE_MATRIX is not configured.")
+        with self._reload_lock:
+            old = self.model
+            if old is not None:
+                weights = old.weights if weights is None else weights
+                impacts = old.impacts if impacts is None else impacts
+            try:
+                model = ReferenceModel.from_csv(
+                    self.path, weights, impacts,
+                    version=old.version + 1 if old else 1)
+            except ValueError:
+                raise   # MatrixError / ScoringError: already user-facing
+            except Exception as e:
+                raise MatrixError(f"Failed to load the reference matrix: {e}")
+            self.model = model
+        return model
+
+    def start_watcher(self, interval=5):
+        """Reload whenever the reference file's mtime changes."""
+        if self._watcher is not None or not self.path:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                model = self.model
+                try:
+                    changed = model is None or os.path.getmtime(self.path) != model.mtime
+                    if changed:
+                        self.reload()
+                except (OSError, ValueError):
+                    pass  # missing or invalid file; keep the current model
+
+        self._watcher = threading.Thread(target=run, name='reference-watcher',
+                                         daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+
+    def _score_batch(self, key, matrix):
+        model, weights, impacts = key
+        start = time.perf_counter()
+        scores, ranks = model.score(matrix, weights, impacts)
+        self.latency.observe('score_compute', time.perf_counter() - start)
+        return list(zip(scores.tolist(), ranks.tolist()))
+
+    def score_one(self, row, weights=None, impacts=None, timeout=5):
+        """Score one candidate through the micro-batcher."""
+        model = self.current()
+        weights, impacts = model.resolve(weights, impacts)
+        matrix = model.as_rows([row])
+        future = self.batcher.submit((model, weights, impacts), matrix[0])
+        score, rank = future.result(timeout)
+        return model, score, rank
+
+    def score(self, rows, weights=None, impacts=None):
+        """Score a batch of candidates in one call."""
+        model = self.current()
+        weights, impacts = model.resolve(weights, impacts)
+        matrix = model.as_rows(rows)
+        start = time.perf_counter()
+        scores, ranks = model.score(matrix, weights, impacts)
+        self.latency.observe('score_batch_compute', time.perf_counter() - start)
+        return model, scores, ranks
+
+    def rerank(self, weights=None, impacts=None, top=10):
+        """The best `top` reference alternatives under new weights/impacts."""
+        model = self.current()
+        weights, impacts = model.resolve(weights, impacts)
+        start = time.perf_counter()
+        positions, scores, ranks = model.rerank(weights, impacts, top)
+        self.latency.observe('rerank_compute', time.perf_counter() - start)
+        return model, positions, scores, ranks
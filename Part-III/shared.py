@@ -0,0 +1,57 @@
+"""
+The parts of the `topsis_pkg` package that the web service (and the Part I
+script) share.
+
+Validation comes from `topsis_pkg.validation`, so an upload is accepted or
+rejected, with the same message, exactly as the command line would; the
+TOPSIS model comes from `topsis_pkg.model`, ranks from `topsis_pkg.ranking`
+and per-stage profiling from `topsis_pkg.profiling`.  The package is loaded from this checkout
+(part-II/topsis-pkg, whose directory name is not importable) and otherwise
+imported as an installed `topsis_pkg`.  Importing it does not load pandas.
+"""
+
+import importlib
+import importlib.util
+import os
+import sys
+
+
+PKG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       os.pardir, 'part-II', 'topsis-pkg')
+
+
+def _load_package():
+    if 'topsis_pkg' in sys.modules:
+        return sys.modules['topsis_pkg']
+    init = os.path.join(PKG_DIR, '__init__.py')
+    if not os.path.isfile(init):
+        return importlib.import_module('topsis_pkg')
+    spec = importlib.util.spec_from_file_location(
+        'topsis_pkg', init, submodule_search_locations=[PKG_DIR])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['topsis_pkg'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+_load_package()
+
+from topsis_pkg.model import TopsisModel, as_impacts, as_weights  # noqa: E402
+from topsis_pkg.profiling import (NULL_PROFILER, JSONLinesSink,  # noqa: E402
+                                  LoggingSink, Profiler, PrometheusSink)
+from topsis_pkg.ranking import (insertion_ranks, ranks, top_k,  # noqa: E402
+                                written_ranks)
+from topsis_pkg.validation import (MatrixError, check_divisors,  # noqa: E402
+                                   criteria_matrix)
+
+
+def numeric_text(df, matrix):
+    """
+    Replace the criteria of `df` that were read as text (e.g. quoted
+    numbers) with their values in `matrix`, so results are written as
+    numbers.
+    """
+    criteria = df.columns[1:]
+    text = df[criteria].select_dtypes(exclude=['number', 'bool']).columns
+    if len(text):
+        df[text] = matrix[:, criteria.get_indexer(text)]
@@ -0,0 +1,246 @@
+"""
+Streaming parser for CSV uploads.
+
+`/analyze` used to save the whole upload to UPLOAD_FOLDER, read it back with
+`pd.read_csv` to validate it, and read it a third time to compute.  Here the
+multipart request body is decoded as it arrives (werkzeug's sans-IO
+`MultipartDecoder`) and the CSV part is fed straight into
+`pd.read_csv(chunksize=...)`.  Every chunk is validated and folded into the
+per-column statistics TOPSIS needs (sum of squares, min, max) while the
+rest of the body is still on the wire, and the raw bytes are hashed for the
+results store on the way through.
+
+A full ranking needs a second pass over the rows once the ideal points are
+known, so parsed chunks are kept in a `ChunkSpool`: in memory up to
+`memory_bytes`, then spilled to one pickle file in UPLOAD_FOLDER.  Memory
+per request is therefore bounded by the spool budget plus one chunk.
+
+Usage:
+    upload = parse_upload(request.stream, boundary, spool)
+    upload.fields['weights'], upload.stats.n_rows, upload.digest.hexdigest()
+"""
+
+import hashlib
+import io
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+from werkzeug.sansio.multipart import (Data, Epilogue, Field, File,
+                                       MultipartDecoder, NeedData)
+
+from shared import MatrixError, criteria_matrix, numeric_text
+
+
+# Rows per parsed chunk, and bytes read from the socket at a time
+CHUNK_ROWS = 50_000
+READ_SIZE = 64 * 1024
+
+# Limit for the plain form fields (weights, impacts, emails...)
+MAX_FIELD_BYTES = 64 * 1024
+
+
+class UploadError(Exception):
+    """The upload is malformed; the message is shown to the user."""
+
+
+# ── Parsed data ──
+
+class ColumnStats:
+    """Running per-criterion statistics of the parsed rows."""
+
+    def __init__(self):
+        self.columns = None
+        self.n_rows = 0
+        self.sumsq = self.col_min = self.col_max = None
+
+    def add(self, matrix):
+        if self.sumsq is None:
+            n_criteria = matrix.shape[1]
+            self.sumsq = np.zeros(n_criteria)
+            self.col_min = np.full(n_criteria, np.inf)
+            self.col_max = np.full(n_criteria, -np.inf)
+        self.sumsq += (matrix ** 2).sum(axis=0)
+        np.minimum(self.col_min, matrix.min(axis=0), out=self.col_min)
+        np.maximum(self.col_max, matrix.max(axis=0), out=self.col_max)
+        self.n_rows += len(matrix)
+
+
+class ChunkSpool:
+    """
+    Ordered store of parsed chunks for the second pass.
+
+    Chunks stay in memory until they exceed `memory_bytes`; from then on
+    every chunk is appended to a pickle file at `path`.
+    """
+
+    def __init__(self, path, memory_bytes=32 * 1024 * 1024):
+        self.path = path
+        self.memory_bytes = memory_bytes
+        self._chunks = []
+        self._memory_used = 0
+        self._file = None
+
+    def append(self, chunk):
+        if self._file is None:
+            self._chunks.append(chunk)
+            self._memory_used += int(chunk.memory_usage(deep=True).sum())
+            if self._memory_used <= self.memory_bytes:
+                return
+            self._file = open(self.path, 'wb')
+            chunks, self._chunks = self._chunks, []
+        else:
+            chunks = [chunk]
+        for c in chunks:
+            pickle.dump(c, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def finish(self):
+        """Flush the spill file; call once all chunks are appended."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __iter__(self):
+        if not os.path.exists(self.path):
+            yield from self._chunks
+            return
+        with open(self.path, 'rb') as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+
+    def close(self):
+        """Drop the chunks and delete the spill file."""
+        self.finish()
+        self._chunks = []
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class Upload:
+    """Result of `parse_upload`."""
+
+    def __init__(self, spool):
+        self.fields = {}
+        self.filename = None
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.stats = ColumnStats()
+        self.spool = spool
+
+
+# ── Multipart decoding ──
+
+class _PartReader(io.RawIOBase):
+    """File-like view of the current file part, pulling from the decoder."""
+
+    def __init__(self, events, upload):
+        self._events = events
+        self._upload = upload
+        self._buffer = b''
+        self._done = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer and not self._done:
+            event = next(self._events)
+            if not isinstance(event, Data):
+                raise UploadError("Malformed multipart body.")
+            self._buffer = event.data
+            self._done = not event.more_data
+            self._upload.digest.update(event.data)
+            self._upload.size += len(event.data)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+    def drain(self):
+        while self.readinto(bytearray(READ_SIZE)):
+            pass
+
+
+def _events(stream, boundary):
+    decoder = MultipartDecoder(boundary)
+    while True:
+        data = stream.read(READ_SIZE)
+        try:
+            decoder.receive_data(data or None)
+            event = decoder.next_event()
+            while not isinstance(event, NeedData):
+                yield event
+                if isinstance(event, Epilogue):
+                    return
+                event = decoder.next_event()
+        except ValueError:
+            raise UploadError("Malformed multipart body.")
+        if not data:
+            raise UploadError("Upload ended unexpectedly.")
+
+
+def _read_csv(reader, upload):
+    """Parse, validate and spool the CSV part chunk by chunk."""
+    stats = upload.stats
+    try:
+        chunks = pd.read_csv(io.BufferedReader(reader, READ_SIZE),
+                             chunksize=CHUNK_ROWS)
+        for chunk in chunks:
+            if stats.columns is None:
+                if chunk.shape[1] < 2:
+                    raise UploadError("CSV must have at least 2 columns "
+                                      "(1 alternatives + 1 criterion).")
+                stats.columns = list(chunk.columns)
+            if chunk.empty:
+                continue
+            try:
+                matrix = criteria_matrix(chunk, first_row=stats.n_rows + 1)
+            except MatrixError as e:
+                raise UploadError(str(e))
+            numeric_text(chunk, matrix)
+            stats.add(matrix)
+            upload.spool.append(chunk)
+    except UploadError:
+        raise
+    except Exception as e:
+        raise UploadError(f"Failed to parse CSV: {str(e)}")
+    upload.spool.finish()
+    if stats.n_rows == 0:
+        raise UploadError("CSV contains no alternatives.")
+
+
+def parse_upload(stream, boundary, spool, file_field='file'):
+    """
+    Decode a multipart body, parsing the `file_field` part as CSV.
+
+    Raises UploadError with a user-facing message on malformed input.  The
+    caller owns `spool` and must close it.
+    """
+    upload = Upload(spool)
+    events = _events(stream, boundary)
+    for event in events:
+        if isinstance(event, File):
+            reader = _PartReader(events, upload)
+            if event.name == file_field and upload.filename is None:
+                upload.filename = event.filename
+                if not event.filename.lower().endswith('.csv'):
+                    raise UploadError("Input file must be in CSV format "
+                                      "(.csv extension required).")
+                _read_csv(reader, upload)
+            reader.drain()
+        elif isinstance(event, Field):
+            value = b''
+            for data in events:
+                value += data.data
+                if len(value) > MAX_FIELD_BYTES:
+                    raise UploadError(f"Form field '{event.name}' is too large.")
+                if not data.more_data:
+                    break
+            upload.fields[event.name] = value.decode('utf-8', 'replace')
+    return upload
@@ -0,0 +1,112 @@
+"""
+Benchmark the normalisation and distance kernels of the package.
+
+Every registered normalisation is combined with every distance and timed
+fitting and scoring a random in-memory matrix (no I/O).  The ``inline``
+row is the original fixed vector / Euclidean expression, for checking that
+the default ``vector`` / ``euclidean`` kernels are no slower.
+
+Usage:
+    python benchmarks/bench_kernels.py --rows 1e6 --criteria 20
+    python benchmarks/bench_kernels.py --distances euclidean,minkowski:3
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PKG_DIR = os.path.join(ROOT, "part-II", "topsis-pkg")
+
+
+def load_package():
+    # The directory name has a hyphen, so load it as ``topsis_pkg``
+    spec = importlib.util.spec_from_file_location(
+        "topsis_pkg", os.path.join(PKG_DIR, "__init__.py"),
+        submodule_search_locations=[PKG_DIR])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["topsis_pkg"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def inline_topsis(matrix, weights, benefit):
+    """The pre-registry implementation: vector norm, Euclidean distance."""
+    import numpy as np
+
+    weighted = matrix / np.sqrt((matrix ** 2).sum(axis=0)) * weights
+    best = np.where(benefit, weighted.max(axis=0), weighted.min(axis=0))
+    worst = np.where(benefit, weighted.min(axis=0), weighted.max(axis=0))
+    d_best = np.sqrt(((weighted - best) ** 2).sum(axis=1))
+    d_worst = np.sqrt(((weighted - worst) ** 2).sum(axis=1))
+    return d_worst / (d_best + d_worst)
+
+
+def best_of(repeat, fn):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=float, default=1e6)
+    parser.add_argument("--criteria", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per kernel; the fastest is reported")
+    parser.add_argument("--normalizations",
+                        help="comma-separated subset (default: all registered)")
+    parser.add_argument("--distances",
+                        help="comma-separated subset (default: all registered, "
+                             "minkowski as minkowski:3)")
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    import numpy as np
+
+    pkg = load_package()
+    from topsis_pkg.kernels import DISTANCES, NORMALIZATIONS
+
+    normalizations = (args.normalizations.split(",") if args.normalizations
+                      else list(NORMALIZATIONS))
+    distances = (args.distances.split(",") if args.distances else
+                 [f"{name}:3" if fn.parametric else name
+                  for name, fn in DISTANCES.items()])
+
+    n_rows, n_criteria = int(args.rows), args.criteria
+    matrix = np.random.default_rng(0).uniform(1.0, 100.0, (n_rows, n_criteria))
+    weights = np.array([1 + j % 3 for j in range(n_criteria)], dtype=float)
+    impacts = ["+" if j % 2 == 0 else "-" for j in range(n_criteria)]
+    benefit = np.array([i == "+" for i in impacts])
+    cells = n_rows * n_criteria / 1e6
+
+    def report(label, seconds):
+        print(f"{label:<28}{seconds * 1000:>10.1f} ms{cells / seconds:>10.0f} Mcells/s")
+        results.append({"kernel": label, "seconds": round(seconds, 6)})
+
+    results = []
+    print(f"{n_rows} x {n_criteria}, best of {args.repeat}")
+    report("inline vector/euclidean",
+           best_of(args.repeat, lambda: inline_topsis(matrix, weights, benefit)))
+    for normalization in normalizations:
+        for distance in distances:
+            def run():
+                pkg.TopsisModel(weights, impacts, normalization=normalization,
+                                distance=distance).fit(matrix).score(matrix)
+            report(f"{normalization}/{distance}", best_of(args.repeat, run))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"rows": n_rows, "criteria": n_criteria,
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark ranking: the NumPy routine of the package against pandas.
+
+The ``pandas`` row is the ranking every entry point used before,
+``pd.Series(scores).rank(ascending=False).astype(int)``; the other rows are
+``topsis_pkg.ranking.ranks`` with each tie method.  Scores are random
+closeness values; ``--ties`` rounds them so that many alternatives tie.
+Each row is checked against ``Series.rank`` with the same method.
+
+Usage:
+    python benchmarks/bench_ranking.py --rows 1e7
+    python benchmarks/bench_ranking.py --rows 1e6 --ties 4
+"""
+
+import argparse
+import json
+
+from bench_kernels import best_of, load_package
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=float, default=1e6)
+    parser.add_argument("--ties", type=int,
+                        help="round scores to this many decimals")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per method; the fastest is reported")
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    import numpy as np
+    import pandas as pd
+
+    load_package()
+    from topsis_pkg.ranking import TIE_METHODS, ranks
+
+    n_rows = int(args.rows)
+    scores = np.random.default_rng(0).random(n_rows)
+    if args.ties is not None:
+        scores = np.round(scores, args.ties)
+
+    def report(label, seconds):
+        print(f"{label:<28}{seconds * 1000:>10.1f} ms")
+        results.append({"method": label, "seconds": round(seconds, 6)})
+
+    results = []
+    print(f"{n_rows} scores, {len(np.unique(scores))} distinct, "
+          f"best of {args.repeat}")
+    report("pandas (average, truncated)", best_of(
+        args.repeat,
+        lambda: pd.Series(scores).rank(ascending=False).astype(int).values))
+    for method in TIE_METHODS:
+        expected = pd.Series(scores).rank(
+            ascending=False, method="first" if method == "ordinal" else method)
+        if not np.array_equal(ranks(scores, method), expected.to_numpy()):
+            raise SystemExit(f"ranks(..., '{method}') differs from pandas")
+        report(method, best_of(args.repeat, lambda: ranks(scores, method)))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"rows": n_rows, "ties": args.ties,
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+Benchmark the three TOPSIS implementations across data sizes.
+
+    part1    Part-I/topsis.py           read_input_file / validate_data /
+                                        calculate_topsis / save_output
+    package  part-II/topsis-pkg         load_decision_matrix / TopsisModel /
+                                        write_table
+    flask    Part-III/app.py            parse_upload / score_upload /
+                                        _result_chunks + to_csv
+
+Synthetic decision matrices (first column alternatives, the rest uniform
+random criteria) are written to CSV once per size and every implementation
+reads the same file.  Each phase is timed at the implementation's own
+function boundaries; where one function covers several phases the key joins
+them, e.g. ``normalization+ideal_points+distances``.  Phases are:
+
+    io, validation, normalization, ideal_points, distances, ranking, output
+
+Every case runs in a fresh (spawned) process so its peak RSS is its own.
+Results are written as JSON; ``--compare`` checks them against an earlier
+run and exits non-zero when any phase got slower than ``--threshold``.
+
+Usage:
+    python benchmarks/bench_topsis.py --rows 1e3,1e5 --criteria 3,50 \\
+        --output bench.json
+    python benchmarks/bench_topsis.py --compare baseline.json --output new.json
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPLEMENTATIONS = ("part1", "package", "flask")
+DEFAULT_ROWS = "1e3,1e4,1e5,1e6,1e7"
+DEFAULT_CRITERIA = "3,10,50,500"
+
+# Cases above this many cells are skipped; 1e7 x 500 would be ~40 GB of
+# float64 before any temporaries.
+DEFAULT_MAX_CELLS = 10_000_000
+
+# Phases faster than this are timer noise and never count as regressions.
+MIN_COMPARE_SECONDS = 0.001
+
+
+# ── Measurement ──────────────────────────────────────────────────────────────
+
+class PhaseTimer:
+    """Collect wall-clock seconds per named phase."""
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + \
+                time.perf_counter() - start
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+# ── Implementations ──────────────────────────────────────────────────────────
+
+def _load_module(name, path, package_dir=None):
+    kwargs = {}
+    if package_dir is not None:
+        kwargs["submodule_search_locations"] = [package_dir]
+    spec = importlib.util.spec_from_file_location(name, path, **kwargs)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def weights_impacts(n_criteria):
+    """Weights 1..3 and alternating impacts, as comma-separated strings."""
+    weights = ",".join(str(1 + j % 3) for j in range(n_criteria))
+    impacts = ",".join("+" if j % 2 == 0 else "-" for j in range(n_criteria))
+    return weights, impacts
+
+
+def load_part1():
+    return _load_module("part1_topsis", os.path.join(ROOT, "Part-I", "topsis.py"))
+
+
+def load_package():
+    pkg_dir = os.path.join(ROOT, "part-II", "topsis-pkg")
+    return _load_module("topsis_pkg", os.path.join(pkg_dir, "__init__.py"), pkg_dir)
+
+
+def load_flask():
+    sys.path.insert(0, os.path.join(ROOT, "Part-III"))
+    return _load_module("topsis_app", os.path.join(ROOT, "Part-III", "app.py"))
+
+
+def bench_part1(part1, input_file, output_file, weights, impacts, timer):
+    with timer.phase("io"):
+        data = part1.read_input_file(input_file)
+    with timer.phase("validation"):
+        w, imp, matrix = part1.validate_data(data, weights, impacts)
+    with timer.phase("normalization+ideal_points+distances"):
+        scores = part1.calculate_topsis(matrix, w, imp)
+    with timer.phase("ranking+output"):
+        part1.save_output(data, scores, output_file)
+
+
+def bench_package(pkg, input_file, output_file, weights, impacts, timer):
+    from topsis_pkg.formats import write_table
+    from topsis_pkg.ranking import ranks as rank_scores
+    from topsis_pkg.topsis import load_decision_matrix
+
+    with timer.phase("io+validation"):
+        df, matrix = load_decision_matrix(input_file)
+    with timer.phase("normalization+ideal_points"):
+        model = pkg.TopsisModel(weights, impacts).fit(matrix)
+    with timer.phase("distances"):
+        scores = model.score(matrix)
+    with timer.phase("ranking"):
+        ranks = rank_scores(scores)
+    with timer.phase("output"):
+        result_df = df.copy()
+        result_df["Topsis Score"] = scores.round(4)
+        result_df["Rank"] = ranks
+        write_table(result_df, output_file)
+
+
+def bench_flask(app, input_file, output_file, weights, impacts, timer):
+    from upload import ChunkSpool, parse_upload
+
+    # The multipart body /analyze receives; building it is not timed
+    boundary = b"bench-boundary"
+    with open(input_file, "rb") as f:
+        body = (b"--" + boundary + b"\r\n"
+                b'Content-Disposition: form-data; name="file"; '
+                b'filename="input.csv"\r\n'
+                b"Content-Type: text/csv\r\n\r\n" + f.read() +
+                b"\r\n--" + boundary + b"--\r\n")
+    spool = ChunkSpool(os.path.join(os.path.dirname(output_file), "bench.spool"))
+    try:
+        with timer.phase("io+validation"):
+            upload = parse_upload(io.BytesIO(body), boundary, spool)
+        with timer.phase("ideal_points+distances+ranking"):
+            scores, ranks = app.score_upload(
+                upload, [float(w) for w in weights.split(",")],
+                impacts.split(","))
+        with timer.phase("output"):
+            with open(output_file, "w", newline="") as out:
+                for i, chunk in enumerate(app._result_chunks(spool, scores, ranks)):
+                    chunk.to_csv(out, index=False, header=i == 0)
+    finally:
+        spool.close()
+
+
+# Implementation -> (loader, benchmark); loading is not timed
+BENCHES = {
+    "part1": (load_part1, bench_part1),
+    "package": (load_package, bench_package),
+    "flask": (load_flask, bench_flask),
+}
+
+
+def run_case(impl, input_file, n_criteria, repeat, workdir):
+    """Run one implementation on one file; executed in a fresh process."""
+    os.chdir(workdir)
+    weights, impacts = weights_impacts(n_criteria)
+    output_file = os.path.join(workdir, f"{impl}_out.csv")
+    loader, bench = BENCHES[impl]
+    try:
+        # app.py creates uploads/ and results/ in the working directory,
+        # which is this case's scratch directory
+        module = loader()
+    except ImportError as e:
+        return {"skipped": f"import failed: {e}"}
+    baseline_rss = peak_rss_mb()
+
+    runs = []
+    try:
+        for _ in range(repeat):
+            timer = PhaseTimer()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                bench(module, input_file, output_file, weights, impacts, timer)
+            timer.phases["total"] = time.perf_counter() - start
+            runs.append(timer.phases)
+    except (Exception, SystemExit) as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+
+    # Best of `repeat` per phase, the usual choice for noisy timings
+    phases = {name: round(min(run[name] for run in runs), 6) for name in runs[0]}
+    return {"phases": phases, "peak_rss_mb": round(peak_rss_mb(), 1),
+            "import_rss_mb": round(baseline_rss, 1)}
+
+
+# ── Data ─────────────────────────────────────────────────────────────────────
+
+def generate_csv(path, n_rows, n_criteria, seed=0, block=100_000):
+    """Write an n_rows x n_criteria decision matrix in blocks of rows."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    columns = [f"C{j + 1}" for j in range(n_criteria)]
+    for start in range(0, n_rows, block):
+        stop = min(start + block, n_rows)
+        df = pd.DataFrame(rng.uniform(1.0, 100.0, (stop - start, n_criteria)),
+                          columns=columns)
+        df.insert(0, "Alternative", [f"A{i + 1}" for i in range(start, stop)])
+        df.to_csv(path, mode="w" if start == 0 else "a", header=(start == 0),
+                  index=False, float_format="%.6g")
+
+
+# ── Regression comparison ────────────────────────────────────────────────────
+
+def _case_key(result):
+    return (result["impl"], result["rows"], result["criteria"])
+
+
+def compare(baseline, current, threshold):
+    """Return a list of (case, phase, old, new) that slowed beyond threshold."""
+    old_cases = {_case_key(r): r for r in baseline["results"] if "phases" in r}
+    regressions = []
+    for result in current["results"]:
+        old = old_cases.get(_case_key(result))
+        if old is None or "phases" not in result:
+            continue
+        for phase, seconds in result["phases"].items():
+            before = old["phases"].get(phase)
+            if before is None or max(before, seconds) < MIN_COMPARE_SECONDS:
+                continue
+            if seconds > before * (1 + threshold):
+                regressions.append((_case_key(result), phase, before, seconds))
+    return regressions
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def _int_list(value):
+    return [int(float(v)) for v in value.split(",") if v.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=_int_list, default=_int_list(DEFAULT_ROWS),
+                        help=f"comma-separated row counts (default {DEFAULT_ROWS})")
+    parser.add_argument("--criteria", type=_int_list,
+                        default=_int_list(DEFAULT_CRITERIA),
+                        help=f"comma-separated criteria counts (default {DEFAULT_CRITERIA})")
+    parser.add_argument("--impl", default=",".join(IMPLEMENTATIONS),
+                        help="comma-separated implementations to run")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per case; the fastest is reported")
+    parser.add_argument("--max-cells", type=float, default=DEFAULT_MAX_CELLS,
+                        help="skip cases with more rows x criteria than this")
+    parser.add_argument("--output", default="bench_results.json",
+                        help="JSON file to write")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="JSON from an earlier run to check against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown per phase for --compare")
+    args = parser.parse_args(argv)
+    args.impl = [i.strip() for i in args.impl.split(",") if i.strip()]
+    unknown = [i for i in args.impl if i not in BENCHES]
+    if unknown:
+        parser.error(f"unknown implementations: {unknown}")
+    return args
+
+
+def metadata():
+    import numpy as np
+    import pandas as pd
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    ctx = multiprocessing.get_context("spawn")
+    report = {"meta": metadata(), "results": []}
+    scratch = tempfile.mkdtemp(prefix="topsis_bench_")
+
+    try:
+        for n_rows in args.rows:
+            for n_criteria in args.criteria:
+                if n_rows * n_criteria > args.max_cells:
+                    print(f"skip   {n_rows:>10} x {n_criteria:<4} "
+                          f"(> --max-cells {args.max_cells:g})")
+                    continue
+                input_file = os.path.join(scratch, f"data_{n_rows}x{n_criteria}.csv")
+                generate_csv(input_file, n_rows, n_criteria)
+
+                for impl in args.impl:
+                    workdir = tempfile.mkdtemp(dir=scratch)
+                    with ctx.Pool(1) as pool:
+                        result = pool.apply(run_case, (impl, input_file, n_criteria,
+                                                       args.repeat, workdir))
+                    shutil.rmtree(workdir, ignore_errors=True)
+                    result = {"impl": impl, "rows": n_rows,
+                              "criteria": n_criteria, **result}
+                    report["results"].append(result)
+
+                    if "phases" in result:
+                        print(f"{impl:<8} {n_rows:>10} x {n_criteria:<4} "
+                              f"{result['phases']['total']:9.3f} s "
+                              f"{result['peak_rss_mb']:9.1f} MB")
+                    else:
+                        reason = result.get("skipped") or result.get("error")
+                        print(f"{impl:<8} {n_rows:>10} x {n_criteria:<4} {reason}")
+                os.remove(input_file)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        for (impl, n_rows, n_criteria), phase, before, after in regressions:
+            print(f"REGRESSION {impl} {n_rows} x {n_criteria} {phase}: "
+                  f"{before:.4f} s -> {after:.4f} s")
+        if regressions:
+            return 1
+        print(f"No phase slower than {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Parity check of the pandas-free fast path against the pandas path.
+
+Writes random small CSV files (integers, signed and zero-padded integers,
+decimals, exponents, trailing zeros, "5." and numeric or text alternative
+names; now and then every row is the same, so every score is NaN) and runs
+``run_topsis`` on each twice: once as the CLI would, taking the fast path,
+and once with ``fastpath.MAX_BYTES = 0`` so that pandas reads and writes
+the file.  Fails unless both outputs are byte-identical.
+
+Usage:
+    python benchmarks/check_fastpath.py [--files 300] [--seed 3]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+
+from bench_kernels import load_package
+
+
+CELLS = {
+    "int": lambda rng: str(rng.randint(-50, 900)),
+    "plusint": lambda rng: f"+0{rng.randint(1, 9)}",
+    "float": lambda rng: f"{rng.random() * 100:.3f}",
+    "exp": lambda rng: f"{rng.random() * 100:.2e}",
+    "trail": lambda rng: f"{rng.random() * 100:.2f}0",
+    "dot": lambda rng: f"{rng.randint(0, 99)}.",
+}
+
+NAMES = {
+    "text": lambda rng, i: f"M{i}",
+    "int": lambda rng, i: str(i * 3),
+    "float": lambda rng, i: f"{i}.5",
+    "special": lambda rng, i: rng.choice(["NA", "M", "x"]),
+}
+
+
+def random_csv(rng, path):
+    """Write a random decision matrix; return its number of criteria."""
+    n_criteria, n_rows = rng.randint(2, 5), rng.randint(2, 8)
+    kinds = [rng.choice(list(CELLS)) for _ in range(n_criteria)]
+    mixed = rng.random() < 0.4
+    name = NAMES[rng.choice(list(NAMES))]
+    identical = rng.random() < 0.05
+    lines = ["Name," + ",".join(f"C{j}" for j in range(n_criteria))]
+    for i in range(n_rows):
+        if not (identical and i):
+            cells = [CELLS[rng.choice(list(CELLS)) if mixed else kind](rng)
+                     for kind in kinds]
+        lines.append(",".join([name(rng, i)] + cells))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return n_criteria
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    load_package()
+    from topsis_pkg import fastpath
+    from topsis_pkg.topsis import run_topsis
+
+    rng = random.Random(args.seed)
+    limit = fastpath.MAX_BYTES
+    checked = mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        data, fast, slow = (os.path.join(tmp, name)
+                            for name in ("data.csv", "fast.csv", "slow.csv"))
+        for _ in range(args.files):
+            n_criteria = random_csv(rng, data)
+            weights = ",".join(["1"] * n_criteria)
+            impacts = ",".join(["+"] * n_criteria)
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    fastpath.MAX_BYTES = limit
+                    run_topsis(data, weights, impacts, fast)
+                    fastpath.MAX_BYTES = 0
+                    run_topsis(data, weights, impacts, slow)
+            except SystemExit:
+                # Rejected input (e.g. an all-zero column); both paths exit
+                continue
+            finally:
+                fastpath.MAX_BYTES = limit
+            checked += 1
+            with open(fast, "rb") as a, open(slow, "rb") as b:
+                if a.read() != b.read():
+                    mismatches += 1
+                    if mismatches <= 3:
+                        with open(data, encoding="utf-8") as f:
+                            print(f"differs on:\n{f.read()}")
+
+    print(f"{checked} files compared, {mismatches} differ")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Import-time regression check for the ``topsis`` console script.
+
+Runs the CLI in fresh interpreters under ``python -X importtime`` and fails
+when a scenario imports a module it should not, or when the package's own
+import time exceeds its budget:
+
+    help         ``topsis --help``: neither pandas nor NumPy
+    usage-error  ``topsis a b``: neither pandas nor NumPy
+    fast-path    a small numeric CSV: NumPy but not pandas
+
+Usage:
+    python benchmarks/check_import_time.py [--budget-ms 50]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PKG_DIR = os.path.join(ROOT, "part-II", "topsis-pkg")
+
+# Load the source tree as ``topsis_pkg`` (the directory name has a hyphen)
+# and run the console entry point with the given arguments.
+RUNNER = """
+import importlib.util, sys
+spec = importlib.util.spec_from_file_location(
+    "topsis_pkg", {init!r}, submodule_search_locations=[{pkg!r}])
+module = importlib.util.module_from_spec(spec)
+sys.modules["topsis_pkg"] = module
+spec.loader.exec_module(module)
+import topsis_pkg.cli
+sys.argv = ["topsis"] + {args!r}
+try:
+    topsis_pkg.cli.main()
+except SystemExit:
+    pass
+"""
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def imported_modules(args):
+    """Run the CLI once; return {module: self import time in microseconds}."""
+    code = RUNNER.format(init=os.path.join(PKG_DIR, "__init__.py"),
+                         pkg=PKG_DIR, args=list(args))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True)
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(1))
+    return modules
+
+
+def check(name, args, forbidden, budget_ms):
+    modules = imported_modules(args)
+    failures = []
+    for top in forbidden:
+        if top in modules:
+            failures.append(f"{name}: imports {top}")
+    # Self time of the package's submodules, so NumPy does not count
+    total_ms = sum(us for mod, us in modules.items()
+                   if mod.startswith("topsis_pkg.")) / 1000
+    if total_ms > budget_ms:
+        failures.append(f"{name}: topsis_pkg imports took {total_ms:.1f} ms "
+                        f"(budget {budget_ms} ms)")
+    status = "FAIL" if failures else "ok"
+    print(f"{status:<5} {name:<12} topsis_pkg {total_ms:7.1f} ms   "
+          f"pandas={'pandas' in modules}  numpy={'numpy' in modules}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--budget-ms", type=float, default=50.0,
+                        help="maximum self import time of topsis_pkg "
+                             "modules (default 50)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = os.path.join(tmp, "data.csv")
+        with open(data, "w", encoding="utf-8") as f:
+            f.write("Fund,Return,Risk,Expense\n"
+                    "M1,0.94,0.88,6.3\nM2,0.76,0.58,7.0\nM3,0.93,0.86,3.4\n")
+        scenarios = [
+            ("help", ["--help"], ("pandas", "numpy")),
+            ("usage-error", ["a", "b"], ("pandas", "numpy")),
+            ("fast-path", [data, "1,1,2", "+,-,-", os.path.join(tmp, "out.csv")],
+             ("pandas",)),
+        ]
+        failures = []
+        for name, cli_args, forbidden in scenarios:
+            failures += check(name, cli_args, forbidden, args.budget_ms)
+
+    for failure in failures:
+        print(f"  {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
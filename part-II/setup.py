@@ -22,6 +22,12 @@ setup(
         "pandas>=1.3.0",
         "numpy>=1.21.0",
     ],
+    extras_require = {
+        # Parquet and Arrow IPC input / output
+        "arrow": ["pyarrow>=7.0.0"],
+        # Sparse .npz input
+        "sparse": ["scipy>=1.8"],
+    },
 
     # This creates the `topsis` command in terminal after pip install
     entry_points = {
@@ -10,12 +10,54 @@ Usage (CLI):
 Usage (Python):
     from topsis_pkg import run_topsis
     run_topsis("data.csv", "1,1,2,1", "+,+,-,+", "result.csv")
+
+    from topsis_pkg import TopsisModel
+    model = TopsisModel("1,1,2,1", "+,+,-,+").fit(reference_df)
+    model.score(candidates_df)
 """
 
-from .topsis import run_topsis
+import importlib
+
+# Public name -> submodule.  Submodules are imported on first attribute
+# access, so ``import topsis_pkg`` (and the CLI) does not load pandas.
+_EXPORTS = {
+    "run_topsis": ".topsis",
+    "TopsisModel": ".model",
+    "score_scenarios": ".scenarios",
+    "run_topsis_scenarios": ".scenarios",
+    "IncrementalTopsis": ".incremental",
+    "run_batch": ".batch",
+    "score_groups": ".groups",
+    "rank_sensitivity": ".sensitivity",
+    "critical_weights": ".sensitivity",
+    "score_sparse": ".sparse",
+}
 
 __version__ = "1.0.0"
 __author__  = "Your Name"
 __email__   = "your.email@gmail.com"
 
-__all__ = ["run_topsis"]
+__all__ = [
+    "run_topsis",
+    "TopsisModel",
+    "score_scenarios",
+    "run_topsis_scenarios",
+    "IncrementalTopsis",
+    "run_batch",
+    "score_groups",
+    "rank_sensitivity",
+    "critical_weights",
+    "score_sparse",
+]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
@@ -0,0 +1,206 @@
+"""
+Run TOPSIS over many input files in one interpreter.
+
+One ``topsis`` invocation per file pays the Python, pandas and NumPy import
+cost every time.  ``topsis batch`` takes either a glob with shared weights
+and impacts, or a manifest listing one job per line, and runs the jobs on a
+process pool whose workers import everything once.
+
+``run_topsis`` reports bad input with ``sys.exit(1)``; each job catches that
+in its worker, so one bad file is reported as failed and the rest of the run
+carries on.
+
+Every option of the main command except ``--scenarios`` applies to each
+file; with ``--profile`` the stage table of each file is printed after its
+result line.
+
+Usage:
+    topsis batch "regions/*.csv" "1,1,1,2" "+,+,-,+" results/ --workers 8
+    topsis batch --manifest jobs.csv --workers 8
+
+The manifest is a CSV with the header ``input,weights,impacts,output``;
+relative paths are taken relative to the manifest.
+"""
+
+import contextlib
+import csv
+import glob
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def print_batch_usage():
+    """Print the usage banner of the batch subcommand."""
+    from .cli import print_options
+
+    print("=" * 55)
+    print("  TOPSIS — Batch Mode")
+    print("=" * 55)
+    print("\nUsage:")
+    print("  topsis batch <Glob> <Weights> <Impacts> <OutputDir> [options]")
+    print("  topsis batch --manifest <Manifest.csv> [options]")
+    print("\nExample:")
+    print('  topsis batch "regions/*.csv" "1,1,1,2" "+,+,-,+" results/')
+    print("\nOptions (applied to each file):")
+    print("  --workers N    - Worker processes (default: CPU count)")
+    print("  --manifest F   - Read the jobs from F instead of a glob")
+    print_options()
+    print("\nManifest columns: input,weights,impacts,output")
+    print("=" * 55)
+
+
+def jobs_from_glob(pattern, weights, impacts, output_dir):
+    """One job per file matching ``pattern``, written as <stem>-result<ext>."""
+    jobs = []
+    for path in sorted(glob.glob(pattern)):
+        stem, ext = os.path.splitext(os.path.basename(path))
+        output = os.path.join(output_dir, f"{stem}-result{ext}")
+        jobs.append((path, weights, impacts, output))
+    return jobs
+
+
+def jobs_from_manifest(manifest):
+    """Read (input, weights, impacts, output) tuples from a manifest CSV."""
+    if not os.path.isfile(manifest):
+        print(f"Error: File '{manifest}' not found.")
+        sys.exit(1)
+
+    base = os.path.dirname(os.path.abspath(manifest))
+    fields = ("input", "weights", "impacts", "output")
+    jobs = []
+    with open(manifest, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        missing = [c for c in fields if c not in (reader.fieldnames or [])]
+        if missing:
+            print(f"Error: Manifest is missing columns: {missing}")
+            sys.exit(1)
+        for row in reader:
+            jobs.append((os.path.join(base, row["input"].strip()),
+                         row["weights"].strip(),
+                         row["impacts"].strip(),
+                         os.path.join(base, row["output"].strip())))
+    return jobs
+
+
+def run_job(job, options, profile=False):
+    """
+    Worker body: run one job and report how it went instead of exiting.
+
+    Returns a dict with the input and output paths, ``ok``, an ``error``
+    message on failure, the input size in bytes, the elapsed seconds and,
+    with ``profile``, the stage table of ``Profiler.report`` (else None).
+    """
+    from .topsis import run_topsis
+
+    input_file, weights, impacts, output_file = job
+    result = {"input": input_file, "output": output_file, "ok": True,
+              "error": None, "bytes": 0, "seconds": 0.0, "profile": None}
+    profiler = None
+    if profile:
+        from .profiling import Profiler
+        profiler = Profiler(run=os.path.basename(input_file))
+    captured = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(captured):
+            run_topsis(input_file, weights, impacts, output_file,
+                       profiler=profiler, **options)
+        result["bytes"] = os.path.getsize(input_file)
+        if profiler is not None:
+            result["profile"] = profiler.report()
+    except SystemExit:
+        lines = [l.strip() for l in captured.getvalue().splitlines() if l.strip()]
+        errors = [l for l in lines if l.startswith("Error")]
+        result.update(ok=False, error=(errors or lines or ["Failed"])[-1])
+    except Exception as e:
+        result.update(ok=False, error=f"Error: {e}")
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(jobs, workers=None, profile=False, **options):
+    """
+    Run ``jobs`` on a process pool and print one line per finished file.
+
+    Parameters:
+        jobs    (list): (input, weights, impacts, output) tuples
+        workers (int):  Worker processes; defaults to the CPU count
+        profile (bool): Profile each file and print its stage table
+        options:        Passed to ``run_topsis`` (chunksize, top_k, columns,
+                        threads, dtype, ...)
+
+    Returns the list of per-job result dicts, in completion order.
+    """
+    results = []
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, job, options, profile): job
+                   for job in jobs}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. killed for memory)
+                input_file, _, _, output_file = futures[future]
+                result = {"input": input_file, "output": output_file,
+                          "ok": False, "error": f"Error: worker failed: {e}",
+                          "bytes": 0, "seconds": 0.0, "profile": None}
+            results.append(result)
+            if result["ok"]:
+                print(f"✅ {result['input']} → {result['output']} "
+                      f"({result['seconds']:.2f} s)")
+                if result["profile"]:
+                    print(result["profile"] + "\n")
+            else:
+                print(f"❌ {result['input']}: {result['error']}")
+
+    elapsed = time.perf_counter() - start
+    ok = sum(r["ok"] for r in results)
+    megabytes = sum(r["bytes"] for r in results if r["ok"]) / 1e6
+    print(f"\n   Files: {ok} succeeded, {len(results) - ok} failed")
+    print(f"   Elapsed: {elapsed:.2f} s")
+    if elapsed > 0:
+        print(f"   Throughput: {len(results) / elapsed:.1f} files/s, "
+              f"{megabytes / elapsed:.1f} MB/s")
+    return results
+
+
+def main(argv):
+    """Entry point of ``topsis batch``; exits non-zero if any file failed."""
+    from .cli import OPTIONS, split_args
+
+    batch_options = dict(OPTIONS, **{"--workers": int, "--manifest": str})
+    positional, options = split_args(argv, batch_options, flags={"--profile"})
+
+    manifest = options.pop("manifest", None)
+    workers = options.pop("workers", None)
+    if workers is not None and workers < 1:
+        print("Error: Number of workers must be a positive integer.")
+        sys.exit(1)
+
+    if manifest is not None:
+        if positional:
+            print_batch_usage()
+            print("\nError: --manifest takes no positional parameters.")
+            sys.exit(1)
+        jobs = jobs_from_manifest(manifest)
+    elif len(positional) == 4:
+        pattern, weights, impacts, output_dir = positional
+        os.makedirs(output_dir, exist_ok=True)
+        jobs = jobs_from_glob(pattern, weights, impacts, output_dir)
+    else:
+        print_batch_usage()
+        print("\nError: Incorrect number of parameters.")
+        sys.exit(1)
+
+    if not jobs:
+        print("Error: No input files to process.")
+        sys.exit(1)
+
+    results = run_batch(jobs, workers=workers, **options)
+    if not all(r["ok"] for r in results):
+        sys.exit(1)
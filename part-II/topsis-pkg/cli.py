@@ -1,33 +1,175 @@
 import sys
-from .topsis import run_topsis
+
+# Nothing heavy is imported here: usage errors and --help return before
+# pandas or NumPy are loaded.
+
+
+def parse_columns(value):
+    """Parse a comma-separated list of column names."""
+    columns = [c.strip() for c in value.split(",") if c.strip()]
+    if not columns:
+        raise ValueError(value)
+    return columns
+
+
+# Options taking a value, mapped to the type used to parse it.
+OPTIONS = {
+    "--chunksize": int,
+    "--top-k": int,
+    "--columns": parse_columns,
+    "--threads": int,
+    "--dtype": str,
+    "--normalization": str,
+    "--distance": str,
+    "--group-by": str,
+    "--ties": str,
+    "--tie-tol": float,
+    "--missing": str,
+}
+
+# Options that are switches and take no value.
+FLAGS = {
+    "--scenarios",
+    "--profile",
+}
+
+
+def print_usage():
+    """Print the usage banner."""
+    print("=" * 55)
+    print("  TOPSIS — Multi-Criteria Decision Making Tool")
+    print("=" * 55)
+    print("\nUsage:")
+    print("  topsis <InputFile> <Weights> <Impacts> <OutputFile> [options]")
+    print("  topsis batch ...   - Many files at once (topsis batch --help)")
+    print("  topsis sensitivity ... - Rank stability under weight changes")
+    print("\nExample:")
+    print('  topsis data.csv "1,1,1,2" "+,+,-,+" result.csv')
+    print("\nParameters:")
+    print("  InputFile   - Decision matrix (.csv, .npy, .parquet, .arrow,")
+    print("                .npz sparse with --missing)")
+    print("  Weights     - Comma-separated weights  e.g. 1,1,2,1")
+    print("  Impacts     - Comma-separated impacts  e.g. +,+,-,+")
+    print("  OutputFile  - Result file; format follows the extension")
+    print("\nOptions:")
+    print_options()
+    print("  --scenarios    - Weights is a CSV file with one weight vector")
+    print("                   per line; Impacts may be a file with one")
+    print("                   impact set per line")
+    print("=" * 55)
+
+
+def print_options():
+    """Print the options shared by the main command and ``topsis batch``."""
+    print("  --chunksize N  - Stream the input N rows at a time (CSV only)")
+    print("  --top-k K      - Write only the best K alternatives")
+    print("  --columns A,B  - Read only these criteria columns")
+    print("  --threads N    - Score in row blocks on N threads (0 = all CPUs)")
+    print("  --dtype T      - float32 halves memory (default float64)")
+    print("  --normalization N - vector (default), max, sum or minmax")
+    print("  --distance D   - euclidean (default), manhattan, chebyshev")
+    print("                   or minkowski:P")
+    print("  --group-by COL - Rank within each group of column COL")
+    print("  --ties M       - Ranks of tied scores: average (default), min,")
+    print("                   max, dense or ordinal")
+    print("  --tie-tol T    - Scores less than T apart are tied")
+    print("  --missing P    - Allow blank cells: skip, impute (column mean)")
+    print("                   or penalize (column worst)")
+    print("  --profile      - Print time, CPU and memory per stage")
+
+
+def split_args(argv, options_spec=OPTIONS, flags=FLAGS):
+    """
+    Separate ``--option value`` pairs from positional arguments.
+
+    argparse is not used because impacts such as ``-,+,+`` look like flags
+    to it; here only arguments starting with ``--`` are options.
+    ``options_spec`` and ``flags`` default to those of the main command.
+    """
+    positional, options = [], {}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg.startswith("--"):
+            name, _, value = arg.partition("=")
+            if name in flags:
+                options[name[2:].replace("-", "_")] = True
+                i += 1
+                continue
+            if name not in options_spec:
+                print(f"Error: Unknown option '{name}'.")
+                sys.exit(1)
+            if not value:
+                i += 1
+                if i >= len(argv):
+                    print(f"Error: Option '{name}' requires a value.")
+                    sys.exit(1)
+                value = argv[i]
+            try:
+                options[name[2:].replace("-", "_")] = options_spec[name](value)
+            except ValueError:
+                print(f"Error: Invalid value for '{name}': {value}")
+                sys.exit(1)
+        else:
+            positional.append(arg)
+        i += 1
+    return positional, options
 
 
 def main():
     """Console entry point for the topsis command."""
 
-    if len(sys.argv) != 5:
-        print("=" * 55)
-        print("  TOPSIS — Multi-Criteria Decision Making Tool")
-        print("=" * 55)
+    if sys.argv[1:2] in (["-h"], ["--help"]):
+        print_usage()
+        return
+
+    if sys.argv[1:2] == ["sensitivity"]:
+        from .sensitivity import main as sensitivity_main
+        from .sensitivity import print_sensitivity_usage
+        if "--help" in sys.argv[2:]:
+            print_sensitivity_usage()
+            return
+        sensitivity_main(sys.argv[2:])
+        return
+
+    if sys.argv[1:2] == ["batch"]:
+        from .batch import main as batch_main, print_batch_usage
+        if "--help" in sys.argv[2:]:
+            print_batch_usage()
+            return
+        batch_main(sys.argv[2:])
+        return
+
+    positional, options = split_args(sys.argv[1:])
+
+    if len(positional) != 4:
+        print_usage()
         print("\nError: Incorrect number of parameters.")
-        print("\nUsage:")
-        print("  topsis <InputFile> <Weights> <Impacts> <OutputFile>")
-        print("\nExample:")
-        print('  topsis data.csv "1,1,1,2" "+,+,-,+" result.csv')
-        print("\nParameters:")
-        print("  InputFile   - CSV file with decision matrix")
-        print("  Weights     - Comma-separated weights  e.g. 1,1,2,1")
-        print("  Impacts     - Comma-separated impacts  e.g. +,+,-,+")
-        print("  OutputFile  - Name for the result CSV file")
-        print("=" * 55)
         sys.exit(1)
 
-    input_file  = sys.argv[1]
-    weights     = sys.argv[2]
-    impacts     = sys.argv[3]
-    output_file = sys.argv[4]
+    input_file, weights, impacts, output_file = positional
+
+    profile = options.pop("profile", False)
+
+    if options.pop("scenarios", False):
+        from .scenarios import run_topsis_scenarios
+        if options or profile:
+            print("Error: --scenarios cannot be combined with other options.")
+            sys.exit(1)
+        run_topsis_scenarios(input_file, weights, impacts, output_file)
+        return
+
+    from .topsis import run_topsis
+    if not profile:
+        run_topsis(input_file, weights, impacts, output_file, **options)
+        return
 
-    run_topsis(input_file, weights, impacts, output_file)
+    from .profiling import Profiler
+    profiler = Profiler()
+    run_topsis(input_file, weights, impacts, output_file, profiler=profiler,
+               **options)
+    print()
+    print(profiler.report())
 
 
 if __name__ == "__main__":
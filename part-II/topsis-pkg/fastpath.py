@@ -0,0 +1,170 @@
+"""
+pandas-free TOPSIS for small, plain numeric CSV files.
+
+Importing pandas costs hundreds of milliseconds, more than the whole
+analysis of a typical input.  For CSV files up to ``MAX_BYTES`` this path
+parses with the stdlib ``csv`` module and scores with NumPy only.
+
+The output must not depend on which path ran, so cells are written as
+``read_csv`` followed by ``DataFrame.to_csv`` would write them: a column of
+integers keeps its integers ("+07" becomes "7"), any other numeric column
+is written as floats ("43" becomes "43.0"), and text is copied verbatim.
+
+The fast path only accepts what it can handle exactly like the pandas path:
+a unique header, at least three columns, and plainly written finite numbers
+in every criterion.  Anything else (blank cells, text, NaN, names pandas
+would read as missing or boolean, large files) returns False and
+``run_topsis`` falls back to pandas, which also produces the usual error
+messages.  ``run_topsis`` does not take this path with ``threads`` or
+``dtype``.
+"""
+
+import csv
+import os
+import re
+import sys
+
+from .profiling import NULL_PROFILER
+from .topsis import check_criteria_counts, parse_impacts, parse_weights
+
+
+# Above this size pandas' C parser outweighs its import cost.
+MAX_BYTES = 4 * 1024 * 1024
+
+# Numbers as pandas' C parser reads them; others (e.g. "1_000", " 4") are
+# left to pandas
+INTEGER = re.compile(r"[+-]?\d+")
+FLOAT = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?")
+
+# Alternative names that read_csv turns into NaN or booleans by default
+PANDAS_SPECIAL = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null", "True", "False", "TRUE", "FALSE", "true", "false"})
+
+
+def _as_written(cells, values=None):
+    """
+    Return the cells of one column as ``DataFrame.to_csv`` writes them
+    after ``read_csv``, or None if pandas might read them differently.
+    ``values`` are the cells already parsed as floats, for criteria.
+    """
+    if all(INTEGER.fullmatch(c) for c in cells):
+        ints = [int(c) for c in cells]
+        if any(not -2 ** 63 <= i < 2 ** 63 for i in ints):
+            return None
+        return [str(i) for i in ints]
+    if all(FLOAT.fullmatch(c) for c in cells):
+        if values is None:
+            values = [float(c) for c in cells]
+        return [repr(float(v)) for v in values]
+    if values is not None or PANDAS_SPECIAL.intersection(cells):
+        return None
+    return list(cells)
+
+
+def read_plain_csv(input_file, profiler=NULL_PROFILER):
+    """
+    Return (header, rows, matrix) for a plain numeric CSV, or None.
+
+    ``rows`` are the cells as pandas would write them; ``matrix`` holds
+    the criteria as floats.
+    """
+    import numpy as np
+
+    if os.path.getsize(input_file) > MAX_BYTES:
+        return None
+
+    with profiler.stage("read"), \
+            open(input_file, newline="", encoding="utf-8-sig") as f:
+        try:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            rows = [row for row in reader if row]
+        except (csv.Error, UnicodeDecodeError):
+            return None
+
+    with profiler.stage("validate"):
+        if (not header or len(header) < 3 or len(set(header)) != len(header)
+                or not rows or any(len(row) != len(header) for row in rows)):
+            return None
+        try:
+            matrix = np.array([row[1:] for row in rows], dtype=float)
+        except ValueError:
+            return None
+        if not np.isfinite(matrix).all():
+            return None
+        columns = [_as_written([row[0] for row in rows])]
+        for j in range(1, len(header)):
+            columns.append(_as_written([row[j] for row in rows],
+                                       matrix[:, j - 1]))
+        if any(column is None for column in columns):
+            return None
+        rows = [list(row) for row in zip(*columns)]
+    return header, rows, matrix
+
+
+def run_topsis_fast(input_file, weights, impacts, output_file, top_k=None,
+                    profiler=NULL_PROFILER, normalization="vector",
+                    distance="euclidean", ties="average", tie_tol=None):
+    """
+    Run TOPSIS without pandas; returns False if the input needs pandas.
+
+    Parameters are those of ``run_topsis``; the output is always CSV.
+    """
+    parsed = read_plain_csv(input_file, profiler)
+    if parsed is None:
+        return False
+    header, rows, matrix = parsed
+
+    import numpy as np
+
+    from .model import TopsisModel
+    from .ranking import (ranks as rank_scores, top_k as select_top_k,
+                          written_ranks)
+
+    w = parse_weights(weights)
+    imp = parse_impacts(impacts)
+    check_criteria_counts(w, imp, len(header) - 1)
+
+    model = TopsisModel(w, imp, normalization=normalization, distance=distance)
+    with profiler.stage("normalize"):
+        sumsq = (matrix ** 2).sum(axis=0)
+        col_sum = matrix.sum(axis=0) if model.needs_sum else None
+    with profiler.stage("ideal_points"):
+        try:
+            model.fit_stats(sumsq, matrix.min(axis=0), matrix.max(axis=0),
+                            col_sum, criteria=header[1:])
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    with profiler.stage("distances"):
+        scores = model.score(matrix)
+
+    with profiler.stage("rank"):
+        if top_k is None:
+            positions = range(len(rows))
+            ranks = rank_scores(scores, ties, tie_tol)
+        else:
+            positions, ranks = select_top_k(scores, top_k, ties)
+            scores = scores[positions]
+
+    with profiler.stage("write"), \
+            open(output_file, "w", newline="", encoding="utf-8") as f:
+        # DataFrame.to_csv ends lines with os.linesep
+        writer = csv.writer(f, lineterminator=os.linesep)
+        writer.writerow(header + ["Topsis Score", "Rank"])
+        # Whole ranks are written as integers, average ranks as e.g. 2.5;
+        # a NaN score (identical alternatives) is an empty cell, as in pandas
+        for pos, score, rank in zip(positions, np.round(scores, 4).tolist(),
+                                    written_ranks(ranks).tolist()):
+            cell = "" if score != score else repr(score)
+            writer.writerow(rows[pos] + [cell, rank])
+
+    print(f"✅ TOPSIS analysis complete!")
+    print(f"   Results saved to: {output_file}")
+    if top_k is None:
+        print(f"   Alternatives ranked: {len(rows)}")
+    else:
+        print(f"   Top {len(positions)} of {len(rows)} alternatives written")
+    return True
@@ -0,0 +1,237 @@
+"""
+Binary input and output formats for decision matrices.
+
+Parsing CSV text dominates the runtime on large matrices.  The format is
+chosen by file extension, and the binary formats skip parsing entirely:
+
+    .npy                 ``np.load(mmap_mode='r')``.  A plain 2-D numeric
+                         array holds only criteria (named C1..Cm) and is used
+                         without copying; alternatives are labelled A1..An.
+                         A structured array is a table whose first field
+                         holds the alternatives, as written by ``write_table``.
+    .parquet             Only the projected columns are decoded.
+    .arrow / .feather    Arrow IPC files, memory-mapped, with projection.
+    .npz                 A SciPy sparse matrix (``scipy.sparse.save_npz``)
+                         of criteria named C1..Cm; only the stored cells
+                         are present.  Read with ``read_sparse`` for
+                         missing-value scoring (see ``topsis_pkg.sparse``).
+
+Every other extension is read as CSV, as before.  Parquet and Arrow need
+``pyarrow`` (``pip install Topsis-swastik-102316020[arrow]``), NPZ needs
+``scipy`` (``[sparse]``).
+
+With ``dtype`` (e.g. "float32"), criteria are stored in that type, and CSV
+is parsed straight into it.  An alternatives column with repeated names is
+stored as a categorical; unique names are smaller left as they are.
+
+NumPy and pandas are imported when a file is read or written, so that
+``file_format`` stays cheap for the CLI fast path.
+
+Usage:
+    df = read_table("data.parquet", columns=["Return", "Risk"])
+    write_table(result_df, "result.arrow")
+"""
+
+import os
+import sys
+
+
+EXTENSIONS = {
+    ".npy": "npy",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+    ".npz": "npz",
+}
+
+
+def file_format(path):
+    """Return 'csv', 'npy', 'parquet', 'arrow' or 'npz' for ``path``."""
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), "csv")
+
+
+def _require_pyarrow(fmt):
+    """Exit with an install hint unless pyarrow can be imported."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print(f"Error: {fmt.capitalize()} files require pyarrow "
+              "(pip install pyarrow).")
+        sys.exit(1)
+
+
+def _require_scipy(fmt):
+    """Exit with an install hint unless scipy can be imported."""
+    try:
+        import scipy.sparse  # noqa: F401
+    except ImportError:
+        print(f"Error: {fmt.upper()} files require scipy "
+              "(pip install scipy).")
+        sys.exit(1)
+
+
+def _projection(names, columns):
+    """First column plus the requested criteria, in the requested order."""
+    if columns is None:
+        return None
+    missing = [c for c in columns if c not in names]
+    if missing:
+        raise ValueError(f"Columns not found: {missing}")
+    return [names[0]] + [c for c in columns if c != names[0]]
+
+
+def _compact(df, dtype, criteria=True):
+    """
+    Cast criteria to ``dtype`` and repeated alternative names to a
+    categorical.  ``criteria=False`` leaves criteria that are already typed.
+    """
+    if dtype is None or df.shape[1] == 0:
+        return df
+    if criteria:
+        for col in df.columns[1:]:
+            df[col] = df[col].astype(dtype, copy=False)
+    names = df.iloc[:, 0]
+    if names.dtype != "category" and names.nunique() <= len(names) // 2:
+        df[df.columns[0]] = names.astype("category")
+    return df
+
+
+def _read_npy(path, columns):
+    import numpy as np
+    import pandas as pd
+
+    array = np.load(path, mmap_mode="r")
+
+    if array.dtype.names:
+        names = list(array.dtype.names)
+        projection = _projection(names, columns)
+        if projection is not None:
+            array = array[projection]
+        return pd.DataFrame.from_records(array)
+
+    if array.ndim != 2:
+        raise ValueError("NPY input must be a 2-D array "
+                         "(alternatives x criteria).")
+    names = [f"C{j + 1}" for j in range(array.shape[1])]
+    if columns is not None:
+        missing = [c for c in columns if c not in names]
+        if missing:
+            raise ValueError(f"Columns not found: {missing}")
+        array = array[:, [names.index(c) for c in columns]]
+        names = list(columns)
+
+    # Wraps the memory map; criteria are not copied
+    df = pd.DataFrame(array, columns=names, copy=False)
+    df.insert(0, "Alternative", [f"A{i + 1}" for i in range(len(df))])
+    return df
+
+
+def read_table(path, columns=None, dtype=None):
+    """
+    Read a decision matrix file into a DataFrame.
+
+    Parameters:
+        path    (str):  Input file; the format follows the extension
+        columns (list): Criteria to load, by name; the alternatives column
+                        is always kept.  None loads every column.
+        dtype   (str):  If given, criteria are stored in this type (e.g.
+                        "float32") and alternatives as a categorical.
+                        Non-numeric criteria then raise ValueError.
+    """
+    import pandas as pd
+
+    fmt = file_format(path)
+
+    if fmt == "npy":
+        return _compact(_read_npy(path, columns), dtype)
+
+    if fmt == "npz":
+        raise ValueError("Sparse .npz input is scored with missing values; "
+                         "pass --missing skip, impute or penalize.")
+
+    if fmt == "parquet":
+        _require_pyarrow(fmt)
+        import pyarrow.parquet as pq
+        names = pq.read_schema(path).names
+        return _compact(pd.read_parquet(path, columns=_projection(names, columns)),
+                        dtype)
+
+    if fmt == "arrow":
+        _require_pyarrow(fmt)
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        with pa.memory_map(path) as source:
+            names = pa.ipc.open_file(source).schema.names
+        table = feather.read_table(path, columns=_projection(names, columns),
+                                   memory_map=True)
+        return _compact(table.to_pandas(), dtype)
+
+    if columns is None and dtype is None:
+        return pd.read_csv(path)
+    names = list(pd.read_csv(path, nrows=0).columns)
+    projection = _projection(names, columns) or names
+    # Parse straight into the compact type; no float64 frame is built first
+    types = None if dtype is None else dict.fromkeys(projection[1:], dtype)
+    df = pd.read_csv(path, usecols=projection, dtype=types)
+    if columns is not None:
+        df = df[projection]
+    return _compact(df, dtype, criteria=False)
+
+
+def read_sparse(path, columns=None):
+    """
+    Read a SciPy sparse matrix saved with ``scipy.sparse.save_npz``.
+
+    Returns ``(matrix, names)``: the criteria as a CSC matrix, which is
+    never densified, and their names C1..Cm (or ``columns``, the criteria
+    to keep).
+    """
+    _require_scipy("npz")
+    import scipy.sparse
+
+    matrix = scipy.sparse.load_npz(path).tocsc()
+    names = [f"C{j + 1}" for j in range(matrix.shape[1])]
+    if columns is not None:
+        missing = [c for c in columns if c not in names]
+        if missing:
+            raise ValueError(f"Columns not found: {missing}")
+        matrix = matrix[:, [names.index(c) for c in columns]]
+        names = list(columns)
+    return matrix, names
+
+
+def _to_records(df):
+    """Structured array of ``df``; text columns become fixed-width unicode."""
+    import pandas as pd
+
+    text = {}
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            width = int(df[col].astype(str).str.len().max() or 1)
+            text[col] = f"<U{width}"
+    return df.to_records(index=False, column_dtypes=text)
+
+
+def write_table(df, path):
+    """Write ``df`` in the format given by the extension of ``path``."""
+    import numpy as np
+
+    fmt = file_format(path)
+
+    if fmt == "npy":
+        np.save(path, _to_records(df))
+    elif fmt == "parquet":
+        _require_pyarrow(fmt)
+        df.to_parquet(path, index=False)
+    elif fmt == "arrow":
+        _require_pyarrow(fmt)
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        if "Rank" in df.columns and df["Rank"].dtype.kind == "f":
+            from .ranking import written_ranks
+
+            # One even-sized tie makes every rank a float; keep "3", not "3.0"
+            df = df.copy(deep=False)
+            df["Rank"] = written_ranks(df["Rank"].to_numpy())
+        df.to_csv(path, index=False)
@@ -0,0 +1,170 @@
+"""
+Grouped TOPSIS: rank alternatives within each group in one pass.
+
+Ranking products within each of many categories used to mean splitting the
+input and calling ``run_topsis`` once per group.  Here every group is
+handled in one pass over the matrix:
+
+    1. factorise the group labels to group numbers and, unless the rows
+       are already contiguous by group, sort them by group (stable)
+    2. per-group sum of squares, minimum, maximum (and sum) with
+       ``np.add.reduceat`` / ``np.minimum.reduceat`` / ... over the segments
+    3. fit every group at once: the normalisation kernels are elementwise,
+       so they turn (groups x m) statistics into (groups x m) divisors and
+       ideal points
+    4. score the rows in blocks, each row against its own group's
+       parameters, optionally on several threads (see
+       ``topsis_pkg.parallel``)
+    5. rank within groups with one lexsort (``ranking.group_ranks``)
+
+Scores equal those of running each group on its own up to floating-point
+summation order.  A criterion that is 0 for every alternative of a group
+does not separate them; it is normalised to 0 in that group rather than
+rejected.  An alternative that equals both ideal points (a group of one, or
+of identical alternatives) scores 1 instead of 0 / 0.
+
+Usage:
+    scores, ranks = score_groups(df.drop(columns="Category"), df["Category"],
+                                 "1,1,2", "+,-,+")
+    run_topsis("data.csv", "1,1,2", "+,-,+", "out.csv", group_by="Category")
+"""
+
+import numpy as np
+
+from .kernels import get_distance, get_normalization
+from .model import as_impacts, as_matrix, as_weights
+from .parallel import _blocks, _map_blocks, resolve_threads
+from .ranking import group_ranks
+from .validation import MatrixError, check_finite, describe_rows
+
+
+def factorize_groups(groups):
+    """
+    Return ``(codes, labels)``: a group number per row, numbered in order
+    of first appearance, and the label of each group.
+    """
+    import pandas as pd
+
+    if not hasattr(groups, "dtype"):
+        groups = np.asarray(groups, dtype=object)
+    codes, labels = pd.factorize(groups)
+    missing = np.flatnonzero(codes < 0)
+    if len(missing):
+        raise MatrixError(f"Group column has missing values "
+                          f"({describe_rows(missing)}).")
+    return codes, labels
+
+
+def _group_divisors(normalize, stats, labels, criteria):
+    """Fit the normalisation of every group; zero-valued columns get 1."""
+    sumsq, col_sum, col_min, col_max = stats
+    shift, norm = normalize(sumsq, col_sum, col_min, col_max)
+    zero = norm == 0
+    if zero.any():
+        # Harmless only when every value is 0; otherwise NaN would follow
+        all_zero = (col_min == 0) & (col_max == 0)
+        bad = np.argwhere(zero & ~all_zero)
+        if len(bad):
+            g, j = bad[0]
+            name = f"'{criteria[j]}'" if criteria is not None else str(j + 1)
+            raise MatrixError(f"Column {name} cannot be normalised in group "
+                              f"'{labels[g]}': its divisor is zero.")
+        norm = np.where(zero, 1.0, norm)
+    return shift, norm
+
+
+def score_groups(data, groups, weights, impacts, normalization="vector",
+                 distance="euclidean", threads=None, criteria=None,
+                 ties="average", tie_tol=None):
+    """
+    Score and rank every alternative within its group.
+
+    Parameters:
+        data     (ndarray | DataFrame): Decision matrix (n x m); as
+                                        everywhere, the first DataFrame
+                                        column (the alternatives) is
+                                        dropped
+        groups   (array-like): Group label of each alternative (n)
+        weights, impacts: As for ``TopsisModel``
+        normalization, distance (str): Kernels, see ``topsis_pkg.kernels``
+        threads  (int):   Score row blocks on this many threads, 0 = one
+                          per CPU; default single-threaded
+        criteria (list):  Column names for error messages
+        ties, tie_tol:    Tie handling, see ``topsis_pkg.ranking``
+
+    Returns:
+        scores (ndarray): Closeness of each alternative within its group
+        ranks  (ndarray): Rank within the group, 1 = best
+    """
+    matrix = as_matrix(data)
+    weights = as_weights(weights)
+    impacts = as_impacts(impacts)
+    n_rows, n_criteria = matrix.shape
+    if len(weights) != n_criteria or len(impacts) != n_criteria:
+        raise ValueError(f"Expected {n_criteria} weights and impacts, got "
+                         f"{len(weights)} and {len(impacts)}.")
+    if len(groups) != n_rows:
+        raise ValueError(f"Expected {n_rows} group labels, got {len(groups)}.")
+    if n_rows == 0:
+        raise ValueError("Decision matrix contains no alternatives.")
+    check_finite(matrix, criteria)
+    normalize = get_normalization(normalization)
+    distance_fn = get_distance(distance)
+    threads = 1 if threads is None else resolve_threads(threads)
+
+    # ── 1. Group numbers; sort only if the groups are not contiguous ───────
+    codes, labels = factorize_groups(groups)
+    order = None
+    if np.any(codes[1:] < codes[:-1]):
+        order = np.argsort(codes, kind="stable")
+        matrix, codes = matrix[order], codes[order]
+    starts = np.flatnonzero(np.diff(codes, prepend=-1))
+
+    # ── 2. Per-group column statistics over the segments ───────────────────
+    stats = (np.add.reduceat(np.square(matrix), starts, axis=0),
+             np.add.reduceat(matrix, starts, axis=0) if normalize.needs_sum else None,
+             np.minimum.reduceat(matrix, starts, axis=0),
+             np.maximum.reduceat(matrix, starts, axis=0))
+
+    # ── 3. Divisors and ideal points of every group at once ────────────────
+    shift, norm = _group_divisors(normalize, stats, labels, criteria)
+    col_min, col_max = stats[2], stats[3]
+    if shift is not None:
+        col_min, col_max = col_min - shift, col_max - shift
+    high = col_max / norm * weights
+    low = col_min / norm * weights
+    benefit = np.array([i == '+' for i in impacts])
+    ideal_best = np.where(benefit, np.maximum(high, low), np.minimum(high, low))
+    ideal_worst = np.where(benefit, np.minimum(high, low), np.maximum(high, low))
+
+    # ── 4. Score each row against its group's parameters ───────────────────
+    scores = np.empty(n_rows)
+
+    def score_block(start, stop):
+        g = codes[start:stop]
+        block = matrix[start:stop]
+        if shift is None:
+            weighted = np.divide(block, norm[g])
+        else:
+            weighted = np.subtract(block, shift[g])
+            np.divide(weighted, norm[g], out=weighted)
+        np.multiply(weighted, weights, out=weighted)
+        diff = np.subtract(weighted, ideal_best[g])
+        d_best = distance_fn(diff)
+        np.subtract(weighted, ideal_worst[g], out=diff)
+        d_worst = distance_fn(diff)
+        np.add(d_best, d_worst, out=d_best)
+        out = scores[start:stop]
+        out.fill(1.0)
+        np.divide(d_worst, d_best, out=out, where=d_best > 0)
+
+    _map_blocks(score_block, _blocks(n_rows, n_criteria), threads)
+
+    # ── 5. Ranks within groups, back in input order ────────────────────────
+    ranks = group_ranks(scores, codes, ties, tie_tol)
+    if order is None:
+        return scores, ranks
+    unsorted_scores, unsorted_ranks = np.empty_like(scores), np.empty_like(ranks)
+    unsorted_scores[order] = scores
+    unsorted_ranks[order] = ranks
+    return unsorted_scores, unsorted_ranks
@@ -0,0 +1,258 @@
+"""
+Incremental TOPSIS for alternatives tables that change a few rows at a time.
+
+TOPSIS depends on the reference data only through per-column sufficient
+statistics: the sum of squares (for the vector norm) and the minimum and
+maximum (for the ideal points).  ``IncrementalTopsis`` keeps the extrema up
+to date as rows are inserted, updated and deleted, so an edit costs
+O(m log n): the extrema of each column live in a multiset backed by a pair
+of heaps with lazy deletion, so removing the current maximum still works.
+
+Scores are computed lazily when asked for.  Nearly every edit moves a
+column norm, and with it every score, so the first query after a batch of
+edits takes the sum of squares and re-scores every row in one vectorised
+pass.  The typical pattern is many O(m log n) edits followed by a single
+re-score at query time.
+
+Rows are checked with ``check_finite`` as they come in, so a NaN or an
+infinity never reaches the extrema.
+
+Usage:
+    ranker = IncrementalTopsis.from_frame(df, "1,1,2,1", "+,+,-,+")
+    ranker.update("M3", [0.9, 0.8, 3.1, 61.0])
+    ranker.delete("M5")
+    ranker.insert("M9", [0.7, 0.6, 4.0, 50.0])
+    ranker.ranks()
+"""
+
+import heapq
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from .model import TopsisModel, as_matrix
+from .ranking import ranks as rank_scores
+from .validation import MatrixError, check_finite
+
+
+class _ColumnExtrema:
+    """Multiset of one column's values supporting min / max under deletion."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._size = 0
+        self._low = []     # min-heap of values
+        self._high = []    # min-heap of negated values
+
+    @classmethod
+    def from_values(cls, values):
+        extrema = cls()
+        extrema._counts.update(values.tolist())
+        extrema._size = len(values)
+        extrema._rebuild()
+        return extrema
+
+    def _rebuild(self):
+        self._low = list(self._counts)
+        heapq.heapify(self._low)
+        self._high = [-v for v in self._low]
+        heapq.heapify(self._high)
+
+    def add(self, value):
+        self._counts[value] += 1
+        self._size += 1
+        heapq.heappush(self._low, value)
+        heapq.heappush(self._high, -value)
+
+    def remove(self, value):
+        self._counts[value] -= 1
+        if self._counts[value] == 0:
+            del self._counts[value]
+        self._size -= 1
+        # Stale heap entries are discarded lazily; rebuild once they dominate
+        if len(self._low) > 2 * self._size + 64:
+            self._rebuild()
+
+    def min(self):
+        while self._low[0] not in self._counts:
+            heapq.heappop(self._low)
+        return self._low[0]
+
+    def max(self):
+        while -self._high[0] not in self._counts:
+            heapq.heappop(self._high)
+        return -self._high[0]
+
+
+class IncrementalTopsis:
+    """
+    TOPSIS ranker that is kept up to date under row-level edits.
+
+    Parameters:
+        weights (str | sequence): One weight per criterion e.g. "1,1,2,1"
+        impacts (str | sequence): One '+' / '-' per criterion e.g. "+,+,-,+"
+    """
+
+    def __init__(self, weights, impacts, capacity=1024):
+        self._template = TopsisModel(weights, impacts)
+        n_criteria = self._template.n_criteria
+
+        self._data = np.empty((max(1, capacity), n_criteria))
+        self._scores = np.full(len(self._data), np.nan)
+        self._alive = np.zeros(len(self._data), dtype=bool)
+        self._slot = {}          # key -> row slot
+        self._keys = [None] * len(self._data)
+        self._free = list(range(len(self._data) - 1, -1, -1))
+
+        self._extrema = [_ColumnExtrema() for _ in range(n_criteria)]
+        self._criteria = None    # column names, for error messages
+        self._stale = True       # any edit since the last scoring
+
+    @classmethod
+    def from_frame(cls, df, weights, impacts):
+        """Build a ranker from a DataFrame keyed by its first column."""
+        # Keys and criteria come from the same split of the columns
+        keys = list(df.iloc[:, 0])
+        matrix = as_matrix(df.iloc[:, 1:].to_numpy())
+        if len(set(keys)) != len(keys):
+            raise ValueError("Alternative names must be unique.")
+
+        ranker = cls(weights, impacts, capacity=2 * len(matrix))
+        if matrix.shape[1] != ranker._template.n_criteria:
+            raise ValueError(f"Expected {ranker._template.n_criteria} criteria "
+                             f"columns, got {matrix.shape[1]}.")
+        ranker._criteria = list(df.columns[1:])
+        check_finite(matrix, ranker._criteria)
+        n = len(matrix)
+        ranker._data[:n] = matrix
+        ranker._alive[:n] = True
+        ranker._keys[:n] = keys
+        ranker._slot = {key: i for i, key in enumerate(keys)}
+        ranker._free = list(range(len(ranker._data) - 1, n - 1, -1))
+        ranker._extrema = [_ColumnExtrema.from_values(matrix[:, j])
+                           for j in range(matrix.shape[1])]
+        return ranker
+
+    def __len__(self):
+        return len(self._slot)
+
+    def __contains__(self, key):
+        return key in self._slot
+
+    # ── Sufficient statistics ──────────────────────────────────────────────
+
+    def _add_stats(self, row):
+        for extrema, value in zip(self._extrema, row):
+            extrema.add(value)
+
+    def _remove_stats(self, row):
+        for extrema, value in zip(self._extrema, row):
+            extrema.remove(value)
+
+    def _as_row(self, key, row):
+        row = as_matrix(row)
+        if row.shape != (1, self._template.n_criteria):
+            raise ValueError(f"Expected {self._template.n_criteria} criteria "
+                             f"values, got {row.size}.")
+        try:
+            check_finite(row, self._criteria)
+        except MatrixError as e:
+            raise MatrixError(f"Alternative {key!r}: {e}") from None
+        return row[0]
+
+    def _grow(self):
+        old = len(self._data)
+        self._data = np.vstack([self._data, np.empty_like(self._data)])
+        self._scores = np.concatenate([self._scores, np.full(old, np.nan)])
+        self._alive = np.concatenate([self._alive, np.zeros(old, dtype=bool)])
+        self._keys.extend([None] * old)
+        self._free.extend(range(2 * old - 1, old - 1, -1))
+
+    # ── Deltas ─────────────────────────────────────────────────────────────
+
+    def insert(self, key, row):
+        """Add a new alternative."""
+        if key in self._slot:
+            raise ValueError(f"Alternative {key!r} already exists.")
+        row = self._as_row(key, row)
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self._data[slot] = row
+        self._alive[slot] = True
+        self._keys[slot] = key
+        self._slot[key] = slot
+        self._add_stats(row)
+        self._stale = True
+
+    def update(self, key, row):
+        """Replace the criteria values of an existing alternative."""
+        slot = self._slot[key]
+        row = self._as_row(key, row)
+        self._remove_stats(self._data[slot])
+        self._data[slot] = row
+        self._add_stats(row)
+        self._stale = True
+
+    def delete(self, key):
+        """Remove an alternative."""
+        slot = self._slot.pop(key)
+        self._remove_stats(self._data[slot])
+        self._alive[slot] = False
+        self._keys[slot] = None
+        self._scores[slot] = np.nan
+        self._free.append(slot)
+        self._stale = True
+
+    def apply(self, inserts=None, updates=None, deletes=()):
+        """
+        Apply a batch of deltas.
+
+        Parameters:
+            inserts (dict): key -> criteria values of new alternatives
+            updates (dict): key -> new criteria values
+            deletes (iterable): keys to remove
+        """
+        for key in deletes:
+            self.delete(key)
+        for key, row in (updates or {}).items():
+            self.update(key, row)
+        for key, row in (inserts or {}).items():
+            self.insert(key, row)
+
+    # ── Scoring ────────────────────────────────────────────────────────────
+
+    def _fit(self, sumsq):
+        model = TopsisModel(self._template.weights, self._template.impacts)
+        return model.fit_stats(sumsq,
+                               [e.min() for e in self._extrema],
+                               [e.max() for e in self._extrema])
+
+    def _refresh(self):
+        if not self._slot:
+            raise ValueError("No alternatives to rank.")
+        # Taken exactly rather than adjusted per edit, so a long run of
+        # edits does not accumulate rounding error
+        alive = self._alive
+        model = self._fit((self._data[alive] ** 2).sum(axis=0))
+        self._scores[alive] = model.score(self._data[alive])
+        self._stale = False
+
+    def scores(self):
+        """Return the closeness score of every alternative, indexed by key."""
+        if self._stale:
+            self._refresh()
+        alive = np.flatnonzero(self._alive)
+        return pd.Series(self._scores[alive],
+                         index=[self._keys[s] for s in alive],
+                         name='Topsis Score')
+
+    def ranks(self, ties="average"):
+        """
+        Return the rank of every alternative (1 = best), indexed by key;
+        ``ties`` is a method of ``topsis_pkg.ranking``.
+        """
+        scores = self.scores()
+        return pd.Series(rank_scores(scores.to_numpy(), ties),
+                         index=scores.index, name='Rank')
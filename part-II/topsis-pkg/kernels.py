@@ -0,0 +1,152 @@
+"""
+Pluggable normalisation and distance kernels.
+
+TOPSIS is usually run with vector (L2) normalisation and Euclidean
+separation, which stay the default.  Other units rank with other schemes;
+they are selected by name from these registries:
+
+    Normalisations                          column statistics used
+        vector    x / sqrt(sum x^2)         sum of squares
+        max       x / max |x|               min, max
+        sum       x / sum x                 sum
+        minmax    (x - min) / (max - min)   min, max
+
+    Distances (on the weighted normalised matrix)
+        euclidean     sqrt(sum d^2)
+        manhattan     sum |d|
+        chebyshev     max |d|
+        minkowski:P   (sum |d|^P)^(1/P), P >= 1
+
+Every normalisation is affine per column, ``(x - shift) / divisor``, so it
+is fitted from column statistics alone, which keeps streaming and blocked
+scoring working for all of them.  A normalisation returns ``(shift,
+divisor)`` with ``shift`` None when it is a pure scaling.  A distance
+reduces a block of differences from an ideal point to one value per row; it
+may overwrite the block, which is scratch space.
+
+New kernels are added with ``register_normalization`` and
+``register_distance``.
+
+Usage:
+    TopsisModel("1,1,2", "+,-,+", normalization="minmax",
+                distance="minkowski:3")
+"""
+
+import numpy as np
+
+
+NORMALIZATIONS = {}
+DISTANCES = {}
+
+
+def register_normalization(name, needs_sum=False):
+    """
+    Register ``fn(sumsq, col_sum, col_min, col_max) -> (shift, divisor)``.
+
+    ``col_sum`` is only computed for normalisations with ``needs_sum``.
+    """
+    def decorate(fn):
+        fn.needs_sum = needs_sum
+        NORMALIZATIONS[name] = fn
+        return fn
+    return decorate
+
+
+def register_distance(name, parametric=False):
+    """
+    Register ``fn(diff) -> distances``, or with ``parametric`` a factory
+    ``fn(p) -> kernel`` selected as ``"name:p"``.
+    """
+    def decorate(fn):
+        fn.parametric = parametric
+        DISTANCES[name] = fn
+        return fn
+    return decorate
+
+
+def get_normalization(name):
+    """Return the normalisation registered as ``name``."""
+    try:
+        return NORMALIZATIONS[name]
+    except KeyError:
+        raise ValueError(f"Unknown normalization '{name}'. "
+                         f"Choose from: {', '.join(NORMALIZATIONS)}")
+
+
+def get_distance(spec):
+    """Return the distance kernel for ``spec``, e.g. "manhattan" or "minkowski:3"."""
+    name, _, param = spec.partition(":")
+    fn = DISTANCES.get(name)
+    if fn is None:
+        raise ValueError(f"Unknown distance '{spec}'. "
+                         f"Choose from: {', '.join(DISTANCES)}")
+    if not fn.parametric:
+        if param:
+            raise ValueError(f"Distance '{name}' takes no parameter.")
+        return fn
+    try:
+        param = float(param)
+    except ValueError:
+        raise ValueError(f"Distance '{name}' needs a numeric parameter, "
+                         f"e.g. '{name}:3'.")
+    return fn(param)
+
+
+# ── Normalisations ─────────────────────────────────────────────────────────────
+
+@register_normalization("vector")
+def vector(sumsq, col_sum, col_min, col_max):
+    return None, np.sqrt(sumsq)
+
+
+@register_normalization("max")
+def max_abs(sumsq, col_sum, col_min, col_max):
+    return None, np.maximum(np.abs(col_min), np.abs(col_max))
+
+
+@register_normalization("sum", needs_sum=True)
+def column_sum(sumsq, col_sum, col_min, col_max):
+    return None, col_sum
+
+
+@register_normalization("minmax")
+def min_max(sumsq, col_sum, col_min, col_max):
+    spread = col_max - col_min
+    # A constant column carries no information; map it to 0, not NaN
+    return col_min, np.where(spread == 0, 1.0, spread)
+
+
+# ── Distances ──────────────────────────────────────────────────────────────────
+
+@register_distance("euclidean")
+def euclidean(diff):
+    np.square(diff, out=diff)
+    dist = diff.sum(axis=1)
+    return np.sqrt(dist, out=dist)
+
+
+@register_distance("manhattan")
+def manhattan(diff):
+    np.abs(diff, out=diff)
+    return diff.sum(axis=1)
+
+
+@register_distance("chebyshev")
+def chebyshev(diff):
+    np.abs(diff, out=diff)
+    return diff.max(axis=1)
+
+
+@register_distance("minkowski", parametric=True)
+def minkowski(p):
+    if not p >= 1:
+        raise ValueError("Minkowski p must be at least 1.")
+    if p == np.inf:
+        return chebyshev
+
+    def kernel(diff):
+        np.abs(diff, out=diff)
+        np.power(diff, p, out=diff)
+        dist = diff.sum(axis=1)
+        return np.power(dist, 1 / p, out=dist)
+    return kernel
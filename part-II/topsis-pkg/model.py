@@ -0,0 +1,280 @@
+"""
+Reusable TOPSIS model that separates fitting from scoring.
+
+Fitting reduces a reference decision matrix to its column norms and the
+weighted ideal best (V+) / ideal worst (V-) points.  That state is a handful
+of length-m vectors, so it is cheap to keep around, serialise and reuse for
+scoring new alternatives without touching the reference data again.
+
+Usage:
+    model = TopsisModel("1,1,2,1", "+,+,-,+").fit(reference_df)
+    model.score(candidates)        # closeness in [0, 1]
+    model.rank(candidates)         # 1 = best
+    state = model.to_dict()        # JSON-serialisable
+    TopsisModel.from_dict(state).score(candidates)
+"""
+
+import sys
+
+import numpy as np
+
+from .kernels import euclidean, get_distance, get_normalization
+from .ranking import ranks
+from .validation import check_divisors, check_finite
+
+
+def as_weights(weights):
+    """Return weights as a float array from a comma string or a sequence."""
+    if isinstance(weights, str):
+        weights = weights.split(",")
+    try:
+        return np.array([float(w) for w in weights], dtype=float)
+    except (TypeError, ValueError):
+        raise ValueError("Weights must be numeric values.")
+
+
+def as_impacts(impacts):
+    """Return impacts as a list of '+' / '-' from a comma string or sequence."""
+    if isinstance(impacts, str):
+        impacts = impacts.split(",")
+    impacts = [str(i).strip() for i in impacts]
+    invalid = [i for i in impacts if i not in ('+', '-')]
+    if invalid:
+        raise ValueError(f"Impacts must be '+' or '-' only. Invalid: {invalid}")
+    return impacts
+
+
+def as_dtype(dtype):
+    """Return the compute dtype: float64 (default) or float32."""
+    dtype = np.dtype(dtype or "float64")
+    if dtype not in (np.float64, np.float32):
+        raise ValueError(f"dtype must be float64 or float32, got {dtype}.")
+    return dtype
+
+
+def as_matrix(data, dtype=float):
+    """
+    Return the criteria of ``data`` as a 2-D float array of ``dtype``.
+
+    DataFrames follow the file layout used everywhere else in the package:
+    the first column holds the alternatives (names or numeric IDs) and is
+    always dropped.  A 1-D input is treated as a single alternative.
+    """
+    # pandas is only imported by callers that have DataFrames
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(data, pd.DataFrame):
+        data = data.iloc[:, 1:].to_numpy()
+    matrix = np.asarray(data, dtype=dtype)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    if matrix.ndim != 2:
+        raise ValueError("Decision matrix must be two-dimensional.")
+    return matrix
+
+
+def vector_normalized(matrix, criteria=None):
+    """
+    Return the vector-normalised ``matrix`` and its column minima and
+    maxima.  Raises MatrixError for an all-zero column, named from
+    ``criteria`` when given.
+    """
+    norm = np.sqrt((matrix ** 2).sum(axis=0))
+    check_divisors(norm, criteria)
+    normalized = matrix / norm
+    return normalized, normalized.min(axis=0), normalized.max(axis=0)
+
+
+class TopsisModel:
+    """
+    TOPSIS fitted on a reference decision matrix.
+
+    Parameters:
+        weights (str | sequence): One weight per criterion e.g. "1,1,2,1"
+        impacts (str | sequence): One '+' / '-' per criterion e.g. "+,+,-,+"
+        dtype   (str):            "float64" (default) or "float32".  In
+                                  float32 the matrix and per-cell work use
+                                  half the memory; column statistics are
+                                  still accumulated in float64 (see
+                                  ``topsis_pkg.precision``)
+        normalization (str):      "vector" (default), "max", "sum" or
+                                  "minmax"
+        distance      (str):      "euclidean" (default), "manhattan",
+                                  "chebyshev" or "minkowski:P" (see
+                                  ``topsis_pkg.kernels``)
+
+    Fitted attributes:
+        norm_        (ndarray): Divisor of each criterion column; the
+                                Euclidean norm for vector normalisation
+        shift_       (ndarray): Value subtracted before dividing, or None
+        ideal_best_  (ndarray): Weighted ideal best point V+
+        ideal_worst_ (ndarray): Weighted ideal worst point V-
+    """
+
+    def __init__(self, weights, impacts, dtype="float64",
+                 normalization="vector", distance="euclidean"):
+        self.weights = as_weights(weights)
+        self.impacts = as_impacts(impacts)
+        self.dtype = as_dtype(dtype)
+        self.normalization = normalization
+        self.distance = distance
+        self._normalize = get_normalization(normalization)
+        self._distance = get_distance(distance)
+        if len(self.weights) != len(self.impacts):
+            raise ValueError(f"Number of weights ({len(self.weights)}) must "
+                             f"equal number of impacts ({len(self.impacts)}).")
+        self.norm_ = None
+        self.shift_ = None
+        self.ideal_best_ = None
+        self.ideal_worst_ = None
+
+    @property
+    def n_criteria(self):
+        return len(self.weights)
+
+    @property
+    def is_fitted(self):
+        return self.norm_ is not None
+
+    @property
+    def needs_sum(self):
+        """Whether fitting needs per-column sums (see ``fit_stats``)."""
+        return self._normalize.needs_sum
+
+    def _check_width(self, matrix):
+        if matrix.shape[1] != self.n_criteria:
+            raise ValueError(f"Expected {self.n_criteria} criteria columns, "
+                             f"got {matrix.shape[1]}.")
+
+    # ── Fitting ────────────────────────────────────────────────────────────
+
+    def fit(self, data, threads=None):
+        """
+        Fit norms and ideal points on a reference matrix; returns self.
+
+        With ``threads``, the column statistics are gathered block by block
+        on that many threads (0 = one per CPU; see ``topsis_pkg.parallel``).
+        """
+        matrix = as_matrix(data, self.dtype)
+        self._check_width(matrix)
+        if len(matrix) == 0:
+            raise ValueError("Decision matrix contains no alternatives.")
+        check_finite(matrix)
+        if threads is not None:
+            from .parallel import column_stats
+            return self.fit_stats(*column_stats(matrix, threads))
+        col_sum = matrix.sum(axis=0, dtype=float) if self.needs_sum else None
+        return self.fit_stats((matrix ** 2).sum(axis=0, dtype=float),
+                              matrix.min(axis=0), matrix.max(axis=0), col_sum)
+
+    def fit_stats(self, sumsq, col_min, col_max, col_sum=None, criteria=None):
+        """
+        Fit from per-column sum of squares, minimum and maximum (and sum,
+        for normalisations with ``needs_sum``).  Raises MatrixError (see
+        ``topsis_pkg.validation``) for a column with a zero divisor, named
+        from ``criteria`` when given.
+
+        These are all TOPSIS needs from the reference matrix, which lets
+        callers accumulate them without holding the matrix (see
+        ``topsis_pkg.streaming``).  Normalising and weighting the raw
+        extremes performs the same floating point operations as taking the
+        extremes of the weighted normalised matrix, so the result is
+        identical.
+        """
+        if self.needs_sum and col_sum is None:
+            raise ValueError(f"'{self.normalization}' normalization needs "
+                             f"per-column sums.")
+        col_min = np.asarray(col_min, dtype=float)
+        col_max = np.asarray(col_max, dtype=float)
+        if col_sum is not None:
+            col_sum = np.asarray(col_sum, dtype=float)
+        shift, norm = self._normalize(np.asarray(sumsq, dtype=float), col_sum,
+                                      col_min, col_max)
+        check_divisors(norm, criteria, self.normalization)
+        if shift is not None:
+            col_min, col_max = col_min - shift, col_max - shift
+        high = col_max / norm * self.weights
+        low  = col_min / norm * self.weights
+        col_best  = np.maximum(high, low)
+        col_worst = np.minimum(high, low)
+
+        benefit = np.array([i == '+' for i in self.impacts])
+        self.norm_ = norm
+        self.shift_ = shift
+        self.ideal_best_  = np.where(benefit, col_best, col_worst)
+        self.ideal_worst_ = np.where(benefit, col_worst, col_best)
+        return self
+
+    # ── Scoring ────────────────────────────────────────────────────────────
+
+    def score(self, data, threads=None):
+        """
+        Return the closeness score of each alternative in ``data``.
+
+        With ``threads``, rows are scored in blocks on that many threads
+        without full-size temporaries (0 = one per CPU; see
+        ``topsis_pkg.parallel``).
+        """
+        if not self.is_fitted:
+            raise ValueError("TopsisModel must be fitted before scoring.")
+        matrix = as_matrix(data, self.dtype)
+        self._check_width(matrix)
+        # Fitted state is float64; cast it so float32 work is not upcast
+        norm, weights, best, worst = (
+            v.astype(self.dtype, copy=False) for v in
+            (self.norm_, self.weights, self.ideal_best_, self.ideal_worst_))
+
+        shift = None if self.shift_ is None else self.shift_.astype(self.dtype)
+
+        if threads is not None or shift is not None or self._distance is not euclidean:
+            # Other kernels always take the fused, blocked path
+            from .parallel import closeness
+            return closeness(matrix, norm, weights, best, worst,
+                             1 if threads is None else threads,
+                             shift=shift, distance=self._distance)
+
+        weighted = matrix / norm * weights
+        d_best  = np.sqrt(((weighted - best)  ** 2).sum(axis=1))
+        d_worst = np.sqrt(((weighted - worst) ** 2).sum(axis=1))
+        return d_worst / (d_best + d_worst)
+
+    def rank(self, data, threads=None, ties="average"):
+        """
+        Return ranks of the alternatives in ``data`` (1 = best); ``ties``
+        is a method of ``topsis_pkg.ranking``.
+        """
+        return ranks(self.score(data, threads), ties)
+
+    # ── Serialisation ──────────────────────────────────────────────────────
+
+    def to_dict(self):
+        """Return the model as plain lists, suitable for JSON."""
+        state = {"weights": self.weights.tolist(), "impacts": list(self.impacts),
+                 "dtype": self.dtype.name, "normalization": self.normalization,
+                 "distance": self.distance}
+        if self.is_fitted:
+            if self.shift_ is not None:
+                state["shift"] = self.shift_.tolist()
+            state.update(norm=self.norm_.tolist(),
+                         ideal_best=self.ideal_best_.tolist(),
+                         ideal_worst=self.ideal_worst_.tolist())
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild a model saved with ``to_dict``."""
+        model = cls(state["weights"], state["impacts"],
+                    state.get("dtype", "float64"),
+                    state.get("normalization", "vector"),
+                    state.get("distance", "euclidean"))
+        if "norm" in state:
+            model.norm_ = np.array(state["norm"], dtype=float)
+            if "shift" in state:
+                model.shift_ = np.array(state["shift"], dtype=float)
+            model.ideal_best_ = np.array(state["ideal_best"], dtype=float)
+            model.ideal_worst_ = np.array(state["ideal_worst"], dtype=float)
+        return model
+
+    def __repr__(self):
+        status = "fitted" if self.is_fitted else "unfitted"
+        return (f"TopsisModel(weights={self.weights.tolist()}, "
+                f"impacts={self.impacts}, {status})")
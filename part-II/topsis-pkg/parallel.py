@@ -0,0 +1,148 @@
+"""
+Multi-threaded, blocked TOPSIS kernels for very large matrices.
+
+The vectorised code in ``TopsisModel`` runs on one core and allocates
+several n x m temporaries (``matrix ** 2``, the weighted matrix, the two
+differences from the ideal points).  These kernels split the rows into
+blocks of about ``BLOCK_CELLS`` elements and process the blocks on a thread
+pool.  Each worker thread allocates two block-sized scratch buffers once
+and every block it processes reuses them through in-place ufuncs
+(``out=``), which release the GIL, so:
+
+    - no full-size intermediate matrix is allocated, only the n-long
+      outputs and two blocks of scratch per thread
+    - blocks run truly in parallel and stay cache-resident
+
+Results equal the serial path up to floating-point summation order (a few
+ulp), so ranks only differ for alternatives whose scores tie to within
+rounding.
+
+Usage:
+    sumsq, col_min, col_max, col_sum = column_stats(matrix, threads=8)
+    scores = closeness(matrix, norm, weights, ideal_best, ideal_worst, threads=8)
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .kernels import euclidean
+
+
+# Elements per block: 2 scratch buffers of 256K float64 (2 MB each) fit
+# comfortably in a per-core L2/L3 slice.
+BLOCK_CELLS = 2 ** 18
+
+
+def resolve_threads(threads):
+    """Return a worker count; 0 or None means one per CPU."""
+    if not threads:
+        return os.cpu_count() or 1
+    if int(threads) != threads or threads < 1:
+        raise ValueError("Number of threads must be a positive integer.")
+    return int(threads)
+
+
+def _blocks(n_rows, n_cols, block_rows=None):
+    if block_rows is None:
+        block_rows = max(1, BLOCK_CELLS // max(1, n_cols))
+    return [(start, min(start + block_rows, n_rows))
+            for start in range(0, n_rows, block_rows)]
+
+
+def _map_blocks(fn, blocks, threads):
+    """Run ``fn(start, stop)`` over ``blocks``; inline for a single thread."""
+    if threads == 1 or len(blocks) == 1:
+        return [fn(start, stop) for start, stop in blocks]
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(lambda b: fn(*b), blocks))
+
+
+def _scratch(local, count, shape, dtype):
+    """``count`` buffers of ``shape``, allocated once per thread of ``local``."""
+    buffers = getattr(local, "buffers", None)
+    if buffers is None:
+        buffers = local.buffers = [np.empty(shape, dtype) for _ in range(count)]
+    return buffers
+
+
+def _as_float(matrix):
+    """float32 matrices are kept as they are; anything else becomes float64."""
+    matrix = np.asarray(matrix)
+    return matrix if matrix.dtype == np.float32 else matrix.astype(float, copy=False)
+
+
+def column_stats(matrix, threads=None, block_rows=None):
+    """
+    Per-column sum of squares, minimum, maximum and sum, computed in blocks.
+
+    These are all that fitting needs (see ``TopsisModel.fit_stats``).  The
+    sums are accumulated in float64 whatever the matrix dtype.
+    """
+    matrix = _as_float(matrix)
+    n_rows, n_cols = matrix.shape
+    if n_rows == 0:
+        raise ValueError("Decision matrix contains no alternatives.")
+    threads = resolve_threads(threads)
+    blocks = _blocks(n_rows, n_cols, block_rows)
+    # The first block is the largest
+    shape = (blocks[0][1] - blocks[0][0], n_cols)
+    local = threading.local()
+
+    def stats(start, stop):
+        block = matrix[start:stop]
+        scratch, = _scratch(local, 1, shape, matrix.dtype)
+        squared = np.square(block, out=scratch[:stop - start])
+        return (squared.sum(axis=0, dtype=float), block.min(axis=0),
+                block.max(axis=0), block.sum(axis=0, dtype=float))
+
+    parts = _map_blocks(stats, blocks, threads)
+    sumsq = np.sum([p[0] for p in parts], axis=0)
+    col_min = np.min([p[1] for p in parts], axis=0)
+    col_max = np.max([p[2] for p in parts], axis=0)
+    col_sum = np.sum([p[3] for p in parts], axis=0)
+    return sumsq, col_min, col_max, col_sum
+
+
+def closeness(matrix, norm, weights, ideal_best, ideal_worst, threads=None,
+              block_rows=None, shift=None, distance=euclidean):
+    """
+    Closeness score of every row, fused per block.
+
+    For each block: weighted = (block - shift) / norm * weights, then the
+    distances to both ideal points and d- / (d+ + d-), all in two scratch
+    buffers.  ``distance`` is a kernel from ``topsis_pkg.kernels``.
+    Work is done in the matrix dtype (float32 or float64); the vectors
+    should already be of that dtype.
+    """
+    matrix = _as_float(matrix)
+    n_rows, n_cols = matrix.shape
+    threads = resolve_threads(threads)
+    scores = np.empty(n_rows, dtype=matrix.dtype)
+    if n_rows == 0:
+        return scores
+    blocks = _blocks(n_rows, n_cols, block_rows)
+    shape = (blocks[0][1] - blocks[0][0], n_cols)
+    local = threading.local()
+
+    def score_block(start, stop):
+        block = matrix[start:stop]
+        weighted, diff = (buf[:stop - start] for buf in
+                          _scratch(local, 2, shape, matrix.dtype))
+        if shift is None:
+            np.divide(block, norm, out=weighted)
+        else:
+            np.subtract(block, shift, out=weighted)
+            np.divide(weighted, norm, out=weighted)
+        np.multiply(weighted, weights, out=weighted)
+        np.subtract(weighted, ideal_best, out=diff)
+        d_best = distance(diff)
+        np.subtract(weighted, ideal_worst, out=diff)
+        d_worst = distance(diff)
+        np.add(d_best, d_worst, out=d_best)
+        np.divide(d_worst, d_best, out=scores[start:stop])
+
+    _map_blocks(score_block, blocks, threads)
+    return scores
@@ -0,0 +1,193 @@
+"""
+Per-stage profiling for the TOPSIS pipeline.
+
+``run_topsis`` wraps each stage (read, validate, normalize, ideal_points,
+distances, rank, write) in ``profiler.stage(name)``.  A ``Profiler`` records
+wall time, CPU time and, with ``track_memory``, the peak bytes allocated
+during the stage (via ``tracemalloc``, which NumPy reports to).  Every
+finished stage is passed to the profiler's sinks:
+
+    LoggingSink       one log line per stage
+    JSONLinesSink     one JSON object per stage, appended to a file
+    PrometheusSink    cumulative counters in the Prometheus text format
+
+tracemalloc is process-wide: it is started when the first memory-tracking
+stage begins and stopped when the last one ends (unless something else had
+started it), and stages running at the same time in other threads share its
+peak, so ``alloc_bytes`` is then an upper bound.
+
+Without a profiler the pipeline uses ``NULL_PROFILER``, whose ``stage``
+returns a shared no-op context manager, so the disabled cost is one method
+call per stage.
+
+Usage:
+    profiler = Profiler(sinks=[JSONLinesSink("stages.jsonl")])
+    run_topsis("data.csv", "1,1,1,2", "+,+,-,+", "out.csv", profiler=profiler)
+    print(profiler.report())
+"""
+
+import contextlib
+import json
+import logging
+import threading
+import time
+import tracemalloc
+
+
+_tracing_lock = threading.Lock()
+_tracing_stages = 0          # memory-tracking stages running now
+_started_tracing = False     # whether those stages started tracemalloc
+
+
+def _begin_tracing():
+    global _tracing_stages, _started_tracing
+    with _tracing_lock:
+        if not _tracing_stages and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_stages += 1
+
+
+def _end_tracing():
+    global _tracing_stages, _started_tracing
+    with _tracing_lock:
+        _tracing_stages -= 1
+        if not _tracing_stages and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+class _NullProfiler:
+    """Profiler stand-in used when profiling is off."""
+
+    _context = contextlib.nullcontext()
+
+    def stage(self, name):
+        return self._context
+
+
+NULL_PROFILER = _NullProfiler()
+
+
+class Profiler:
+    """
+    Record wall time, CPU time and allocations per pipeline stage.
+
+    Parameters:
+        sinks        (list): Objects with an ``emit(record)`` method
+        track_memory (bool): Measure allocations with tracemalloc; this slows
+                             Python-level allocation while a stage runs
+        run          (str):  Label copied into every record
+        cpu_clock    (callable): CPU time source; ``time.thread_time`` when
+                             several pipelines share the process
+    """
+
+    def __init__(self, sinks=(), track_memory=True, run="run_topsis",
+                 cpu_clock=time.process_time):
+        self.sinks = list(sinks)
+        self.track_memory = track_memory
+        self.run = run
+        self.cpu_clock = cpu_clock
+        self.records = []
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        if self.track_memory:
+            _begin_tracing()
+            if hasattr(tracemalloc, "reset_peak"):   # Python 3.9+
+                tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+
+        wall = time.perf_counter()
+        cpu = self.cpu_clock()
+        try:
+            yield
+        finally:
+            record = {
+                "run": self.run,
+                "stage": name,
+                "wall_s": time.perf_counter() - wall,
+                "cpu_s": self.cpu_clock() - cpu,
+                "alloc_bytes": None,
+            }
+            if self.track_memory:
+                record["alloc_bytes"] = max(0, tracemalloc.get_traced_memory()[1] - base)
+                _end_tracing()
+            self.records.append(record)
+            for sink in self.sinks:
+                sink.emit(record)
+
+    def report(self):
+        """Per-stage breakdown as a text table."""
+        total = sum(r["wall_s"] for r in self.records) or 1.0
+        lines = [f"{'Stage':<14}{'Wall (s)':>10}{'CPU (s)':>10}"
+                 f"{'Alloc (MB)':>12}{'Share':>8}"]
+        for r in self.records:
+            alloc = "-" if r["alloc_bytes"] is None else f"{r['alloc_bytes'] / 1e6:.1f}"
+            lines.append(f"{r['stage']:<14}{r['wall_s']:>10.4f}{r['cpu_s']:>10.4f}"
+                         f"{alloc:>12}{r['wall_s'] / total:>8.0%}")
+        return "\n".join(lines)
+
+
+# ── Sinks ──────────────────────────────────────────────────────────────────────
+
+class LoggingSink:
+    """Log one line per stage to ``logger`` (default: ``topsis_pkg``)."""
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger("topsis_pkg")
+        self.level = level
+
+    def emit(self, record):
+        self.logger.log(self.level, "%s %s wall=%.4fs cpu=%.4fs alloc=%s",
+                        record["run"], record["stage"], record["wall_s"],
+                        record["cpu_s"], record["alloc_bytes"])
+
+
+class JSONLinesSink:
+    """Append each stage record as one JSON line to ``path``."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+        line = json.dumps(dict(record, time=time.time()))
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class PrometheusSink:
+    """Cumulative per-stage counters, rendered in the Prometheus text format."""
+
+    METRICS = (
+        ("topsis_stage_runs_total", "Completed stage executions", None),
+        ("topsis_stage_wall_seconds_total", "Wall time spent in stage", "wall_s"),
+        ("topsis_stage_cpu_seconds_total", "CPU time spent in stage", "cpu_s"),
+        ("topsis_stage_alloc_bytes_total", "Peak bytes allocated in stage",
+         "alloc_bytes"),
+    )
+
+    def __init__(self):
+        self._totals = {}          # (run, stage) -> {metric: value}
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+        key = (record["run"], record["stage"])
+        with self._lock:
+            totals = self._totals.setdefault(key, dict.fromkeys(
+                (m for m, _, _ in self.METRICS), 0))
+            for metric, _, field in self.METRICS:
+                totals[metric] += 1 if field is None else (record[field] or 0)
+
+    def render(self):
+        with self._lock:
+            snapshot = {key: dict(v) for key, v in self._totals.items()}
+        lines = []
+        for metric, help_text, _ in self.METRICS:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for (run, stage), totals in sorted(snapshot.items()):
+                lines.append(f'{metric}{{run="{run}",stage="{stage}"}} '
+                             f"{totals[metric]}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,204 @@
+"""
+Ranking and rank selection without pandas.
+
+Ranks used to come from ``pd.Series(scores).rank(ascending=False)
+.astype(int)``, which builds a Series over the whole score vector and
+truncates the average rank of a tie (2.5 became 2), while Part I ranked ties
+with ``method='max'``.  Every entry point now ranks here, with one argsort:
+
+    1. order the scores best first (stable, so equal scores keep input order)
+    2. mark where each run of tied scores begins in that order
+    3. derive every tie method from the run boundaries
+
+Tie methods, for scores 0.9, 0.7, 0.7, 0.5:
+
+    average  1, 2.5, 2.5, 4   mean of the positions a tie covers (default)
+    min      1, 2, 2, 4       best position of the tie
+    max      1, 3, 3, 4       worst position of the tie
+    dense    1, 2, 2, 3       ties count as one place
+    ordinal  1, 2, 3, 4       ties broken by input order
+
+"average" ranks are integers unless a tie covers an even number of
+positions; only then is a float array returned.  Such half ranks are
+intended, and ``written_ranks`` keeps the whole ranks of that array
+written as "3" rather than "3.0".  With ``tol``, scores less
+than ``tol`` apart are tied, so rounding noise does not split a tie;
+neighbouring scores are compared, so a run of close scores forms one tie.
+
+``group_ranks`` ranks within groups (``topsis_pkg.groups``), ``top_k``
+picks the best k alternatives with ``np.partition`` instead of sorting every
+score, with the ranks of the full ranking, and ``insertion_ranks`` ranks new
+scores against a sorted reference ranking by binary search.
+"""
+
+import numpy as np
+
+
+TIE_METHODS = ("average", "min", "max", "dense", "ordinal")
+
+
+def check_method(method):
+    """Raise ValueError unless ``method`` is one of ``TIE_METHODS``."""
+    if method not in TIE_METHODS:
+        raise ValueError(f"Unknown tie method '{method}'. "
+                         f"Choose from: {', '.join(TIE_METHODS)}.")
+
+
+def _sorted_ranks(ordered, new_group, method, tol):
+    """
+    Ranks of ``ordered`` scores, which are sorted best first within
+    contiguous groups; ``new_group`` marks where each group begins.
+    """
+    n = len(ordered)
+    position = np.arange(n)
+    group_start = np.maximum.accumulate(np.where(new_group, position, 0))
+    if method == "ordinal":
+        return position - group_start + 1
+
+    new_tie = new_group.copy()
+    if tol:
+        new_tie[1:] |= (ordered[:-1] - ordered[1:]) >= tol
+    else:
+        new_tie[1:] |= ordered[1:] != ordered[:-1]
+    tie_start = np.maximum.accumulate(np.where(new_tie, position, 0))
+    if method == "min":
+        return tie_start - group_start + 1
+    if method == "dense":
+        count = np.cumsum(new_tie)
+        return count - count[group_start] + 1
+
+    starts = np.flatnonzero(new_tie)
+    tie_stop = np.append(starts[1:], n)[np.cumsum(new_tie) - 1]
+    if method == "max":
+        return tie_stop - group_start
+    # Mean of positions tie_start + 1 .. tie_stop, relative to the group
+    doubled = tie_start + 1 + tie_stop - 2 * group_start
+    if not (doubled & 1).any():
+        return doubled // 2
+    return doubled / 2
+
+
+def _unsort(values, order):
+    result = np.empty_like(values)
+    result[order] = values
+    return result
+
+
+def ranks(scores, method="average", tol=None):
+    """
+    Rank every alternative, 1 = best.
+
+    ``scores`` is one score vector, or a (k x n) array ranked row by row.
+    ``method`` is one of ``TIE_METHODS``; scores less than ``tol`` apart
+    are tied (default: exactly equal).
+    """
+    check_method(method)
+    scores = np.asarray(scores, dtype=float)
+    if scores.ndim == 2:
+        k, n = scores.shape
+        # Rows are the groups: sort each row, then rank the flat array
+        order = np.argsort(-scores, axis=1, kind="stable")
+        ordered = np.take_along_axis(scores, order, axis=1).ravel()
+        new_group = np.zeros(k * n, dtype=bool)
+        new_group[::max(n, 1)] = n > 0
+        flat = order + (np.arange(k) * n)[:, np.newaxis]
+        return _unsort(_sorted_ranks(ordered, new_group, method, tol),
+                       flat.ravel()).reshape(k, n)
+    order = np.argsort(-scores, kind="stable")
+    new_group = np.zeros(len(scores), dtype=bool)
+    new_group[:1] = True
+    return _unsort(_sorted_ranks(scores[order], new_group, method, tol), order)
+
+
+def written_ranks(ranks):
+    """
+    Return ``ranks`` for a text file: unchanged when they are integers,
+    otherwise an object array of integers and half ranks (1, 2.5, 2.5, 4).
+    """
+    ranks = np.asarray(ranks)
+    if ranks.dtype.kind != "f":
+        return ranks
+    written = ranks.astype(object)
+    whole = np.flatnonzero(ranks == np.floor(ranks))
+    written[whole] = ranks[whole].astype(np.int64).tolist()
+    return written
+
+
+def group_ranks(scores, codes, method="average", tol=None):
+    """
+    Rank alternatives within their group, 1 = best in each group.
+
+    ``codes`` holds a group number per alternative; one lexsort orders
+    every group best first.  ``method`` and ``tol`` are those of ``ranks``.
+    """
+    check_method(method)
+    scores = np.asarray(scores, dtype=float)
+    codes = np.asarray(codes)
+    order = np.lexsort((-scores, codes))
+    g = codes[order]
+    new_group = np.empty(len(g), dtype=bool)
+    new_group[:1] = True
+    np.not_equal(g[1:], g[:-1], out=new_group[1:])
+    return _unsort(_sorted_ranks(scores[order], new_group, method, tol), order)
+
+
+def top_k_candidates(scores, k):
+    """
+    Return the positions of every score >= the k-th best score.
+
+    All alternatives tied with the k-th best are kept, so the result may be
+    longer than ``k``.  Keeping the ties is what allows ``top_k`` to compute
+    exact ranks from the candidates alone, and lets callers merge candidates
+    chunk by chunk with a buffer that never holds more than k rows plus ties.
+    NaN scores (0 / 0 when every alternative is identical) rank below every
+    other score, as in ``ranks``, and all of them tie with each other here.
+    """
+    scores = np.asarray(scores)
+    n = len(scores)
+    if k >= n:
+        return np.arange(n)
+    # np.partition puts NaN last and NaN compares False, so rank it as -inf
+    key = np.where(np.isnan(scores), -np.inf, scores)
+    kth = np.partition(key, n - k)[n - k]
+    return np.flatnonzero(key >= kth)
+
+
+def top_k(scores, k, method="average"):
+    """
+    Select the k best alternatives.
+
+    Parameters:
+        scores (ndarray): Closeness scores; must contain every score that ties
+                          with the k-th best (e.g. the output of
+                          ``top_k_candidates``, or the full score vector)
+        k      (int):     Number of alternatives to select
+        method (str):     Tie method of the ranks, see ``ranks``
+
+    Returns:
+        positions (ndarray): Positions into ``scores``, best first; among
+                             equal scores, earlier rows first
+        ranks     (ndarray): Rank of each selected alternative (1 = best),
+                             as in the full ranking
+    """
+    scores = np.asarray(scores, dtype=float)
+    candidates = top_k_candidates(scores, k)
+    # Every better score is a candidate, so ranks among them are global
+    order = np.argsort(-scores[candidates], kind="stable")[:k]
+    return candidates[order], ranks(scores[candidates], method)[order]
+
+
+def insertion_ranks(ordered, scores):
+    """
+    Return the rank each of ``scores`` would take among the reference
+    scores ``ordered`` (sorted ascending, e.g. with ``np.sort``), 1 = best.
+
+    A new score ranks just behind the reference scores that beat it, so it
+    takes the best position of a tie; a NaN score ranks after every
+    reference score, as in ``ranks``.
+    """
+    ordered = np.asarray(ordered, dtype=float)
+    scores = np.asarray(scores, dtype=float)
+    # np.sort puts NaN last; only the scores before it can beat anything
+    valid = np.searchsorted(ordered, np.nan)
+    better = valid - np.searchsorted(ordered[:valid], scores, side="right")
+    return np.where(np.isnan(scores), len(ordered) + 1, better + 1)
@@ -0,0 +1,199 @@
+"""
+Batched multi-scenario TOPSIS: score many weight vectors in one pass.
+
+Sensitivity sweeps evaluate the same decision matrix under hundreds or
+thousands of weight vectors.  Normalisation does not depend on the weights,
+so it is computed once and shared; the ideal points of every scenario follow
+from the per-column extrema of the normalised matrix; and the separation
+measures for a block of scenarios are one broadcast (k x n x m) computation.
+Scenarios are processed in blocks so that the broadcast temporaries stay
+below ``max_cells`` elements.
+
+Usage:
+    scores, ranks = score_scenarios(matrix, [[1, 1, 2], [2, 1, 1]], "+,-,+")
+    scores.shape   # (2, n_alternatives)
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from .formats import write_table
+from .model import as_impacts, as_matrix, vector_normalized
+from .ranking import ranks
+from .topsis import load_decision_matrix
+
+
+# Elements per broadcast temporary (~128 MB of float64).
+DEFAULT_MAX_CELLS = 2 ** 24
+
+
+def _as_weight_matrix(weights):
+    """Return weights as a (k x m) float array."""
+    if isinstance(weights, pd.DataFrame):
+        weights = weights.to_numpy()
+    try:
+        weights = np.asarray(weights, dtype=float)
+    except (TypeError, ValueError):
+        raise ValueError("Weights must be numeric values.")
+    if weights.ndim == 1:
+        weights = weights.reshape(1, -1)
+    if weights.ndim != 2:
+        raise ValueError("Weights must be a (scenarios x criteria) matrix.")
+    return weights
+
+
+def _as_benefit_matrix(impacts, n_scenarios, n_criteria):
+    """
+    Return a (k x m) boolean array, True where the criterion is a benefit.
+
+    ``impacts`` is either one impact set shared by every scenario
+    ("+,-,+" or ['+', '-', '+']) or one impact set per scenario.
+    """
+    if isinstance(impacts, str) or all(isinstance(i, str) and len(i.strip()) == 1
+                                       for i in impacts):
+        sets = [as_impacts(impacts)]
+    else:
+        sets = [as_impacts(i) for i in impacts]
+        if len(sets) != n_scenarios:
+            raise ValueError(f"Number of impact sets ({len(sets)}) must equal "
+                             f"number of weight vectors ({n_scenarios}).")
+    for imp in sets:
+        if len(imp) != n_criteria:
+            raise ValueError(f"Number of impacts ({len(imp)}) must equal "
+                             f"number of criteria columns ({n_criteria}).")
+    benefit = np.array([[i == '+' for i in imp] for imp in sets])
+    return np.broadcast_to(benefit, (n_scenarios, n_criteria))
+
+
+def score_scenarios(data, weights, impacts, max_cells=DEFAULT_MAX_CELLS,
+                    criteria=None):
+    """
+    Score every alternative under every weight scenario.
+
+    Parameters:
+        data      (ndarray | DataFrame): Decision matrix (n x m); as
+                                         everywhere, the first DataFrame
+                                         column (the alternatives) is dropped
+        weights   (array-like): Weight matrix (k x m), one scenario per row
+        impacts   (str | sequence): Shared impact set, or one set per scenario
+        max_cells (int): Upper bound on elements per broadcast temporary
+        criteria  (list): Column names for error messages; by default those
+                          of a DataFrame
+
+    Returns:
+        scores (ndarray): (k x n) closeness scores
+        ranks  (ndarray): (k x n) ranks, 1 = best within each scenario
+    """
+    matrix = as_matrix(data)
+    weights = _as_weight_matrix(weights)
+    n_rows, n_criteria = matrix.shape
+    if criteria is None and hasattr(data, "columns"):
+        criteria = list(data.columns[1:])
+    n_scenarios = len(weights)
+    if weights.shape[1] != n_criteria:
+        raise ValueError(f"Number of weights ({weights.shape[1]}) must equal "
+                         f"number of criteria columns ({n_criteria}).")
+    benefit = _as_benefit_matrix(impacts, n_scenarios, n_criteria)
+
+    # Shared across all scenarios
+    normalized, col_min, col_max = vector_normalized(matrix, criteria)
+
+    scores = np.empty((n_scenarios, n_rows))
+    block = max(1, int(max_cells) // max(1, n_rows * n_criteria))
+
+    for start in range(0, n_scenarios, block):
+        stop = min(start + block, n_scenarios)
+        w = weights[start:stop]
+
+        # Ideal points from the extrema: (block x m)
+        high = col_max * w
+        low  = col_min * w
+        col_best  = np.maximum(high, low)
+        col_worst = np.minimum(high, low)
+        ideal_best  = np.where(benefit[start:stop], col_best, col_worst)
+        ideal_worst = np.where(benefit[start:stop], col_worst, col_best)
+
+        # Separation measures: (block x n x m) broadcast, reused in place
+        weighted = normalized[np.newaxis, :, :] * w[:, np.newaxis, :]
+        diff = np.subtract(weighted, ideal_best[:, np.newaxis, :])
+        np.square(diff, out=diff)
+        d_best = np.sqrt(diff.sum(axis=2))
+        np.subtract(weighted, ideal_worst[:, np.newaxis, :], out=diff)
+        np.square(diff, out=diff)
+        d_worst = np.sqrt(diff.sum(axis=2))
+
+        scores[start:stop] = d_worst / (d_best + d_worst)
+
+    return scores, ranks(scores)
+
+
+def read_weight_scenarios(weights_file):
+    """Read a CSV with one weight vector per line and no header."""
+    if not os.path.isfile(weights_file):
+        print(f"Error: File '{weights_file}' not found.")
+        sys.exit(1)
+    try:
+        return pd.read_csv(weights_file, header=None).to_numpy(dtype=float)
+    except (ValueError, TypeError):
+        print("Error: Weights file must contain numeric values only.")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        sys.exit(1)
+
+
+def read_impact_scenarios(impacts):
+    """
+    Return the impact argument of the CLI.
+
+    A path to an existing file is read as one impact set per line; anything
+    else is a single comma-separated impact set shared by every scenario.
+    """
+    if not os.path.isfile(impacts):
+        return impacts
+    with open(impacts, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def run_topsis_scenarios(input_file, weights_file, impacts, output_file,
+                         max_cells=DEFAULT_MAX_CELLS):
+    """
+    Run TOPSIS for every weight vector in ``weights_file``.
+
+    Parameters:
+        input_file   (str): Path to input file (CSV, NPY, Parquet or Arrow)
+        weights_file (str): CSV with one weight vector per line, no header
+        impacts      (str): Comma-separated impacts shared by all scenarios,
+                            or a file with one impact set per line
+        output_file  (str): Path to save the result, one row per scenario and
+                            alternative: Scenario, <alternative>, Topsis
+                            Score, Rank
+        max_cells    (int): Upper bound on elements per broadcast temporary
+    """
+    df, matrix = load_decision_matrix(input_file)
+    weights = read_weight_scenarios(weights_file)
+    impacts = read_impact_scenarios(impacts)
+
+    try:
+        scores, ranks = score_scenarios(matrix, weights, impacts, max_cells,
+                                        criteria=list(df.columns[1:]))
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    n_scenarios, n_rows = scores.shape
+    alt_col = df.columns[0]
+    result_df = pd.DataFrame({
+        'Scenario': np.repeat(np.arange(1, n_scenarios + 1), n_rows),
+        alt_col: np.tile(df[alt_col].to_numpy(), n_scenarios),
+        'Topsis Score': np.round(scores.ravel(), 4),
+        'Rank': ranks.ravel(),
+    })
+    write_table(result_df, output_file)
+
+    print(f"✅ TOPSIS scenario analysis complete!")
+    print(f"   Results saved to: {output_file}")
+    print(f"   Scenarios: {n_scenarios}   Alternatives: {n_rows}")
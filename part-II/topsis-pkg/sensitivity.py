@@ -0,0 +1,448 @@
+"""
+Rank stability under weight uncertainty (Monte Carlo).
+
+Checking how robust a ranking is used to mean calling ``run_topsis`` once
+per trial weight vector, reading and normalising the file every time.  Here
+the decision matrix is loaded and normalised once, and weight vectors are
+sampled and scored in blocks of matrix products, so the cost is
+samples x n x m multiply-adds with no per-sample Python overhead.  Sampled
+weights are never negative, so the ideal points of weight vector w are
+w * best and w * worst, with best / worst the per-criterion extremes of the
+normalised matrix V, and
+
+    d_best^2 = sum_j w_j^2 (V_ij - best_j)^2 = (w^2) @ ((V - best)^2).T
+
+is one BLAS matrix product per block for all samples and alternatives.
+Only running totals are kept per block (rank counts, rank sums, best and
+worst rank), never the (samples x n) scores.
+
+Weights are sampled either
+
+    - "dirichlet": from a Dirichlet distribution.  Without a concentration
+      every weight vector is equally likely (no preference information, as
+      in SMAA); with one, samples are centred on the given weights and
+      spread less the larger it is (alpha = concentration x weights)
+    - "bounds": each weight uniformly within +/- ``spread`` (relative) of
+      the given weight, then renormalised
+
+Blocks use their own seeds spawned from ``seed``, so the result does not
+depend on ``workers``; with ``workers`` they run on a process pool.
+
+``critical_weights`` answers the complementary question: by how much must
+one criterion's weight change (the others rescaled to keep the sum) before
+the best alternative changes?
+
+Usage:
+    summary, acceptability = rank_sensitivity(df, "1,1,2", "+,-,+",
+                                              samples=10000, seed=1)
+    acceptability[i, r]     # share of samples where i ranks r + 1
+    thresholds = critical_weights(df, "1,1,2", "+,-,+")
+
+Like weight scenarios, both use vector normalisation and Euclidean distance;
+weights must not be negative.
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .formats import write_table
+from .model import as_impacts, as_matrix, as_weights, vector_normalized
+from .ranking import ranks as rank_scores
+from .scenarios import DEFAULT_MAX_CELLS
+from .topsis import load_decision_matrix
+
+
+# Samples per block, so that blocks can be spread over workers.
+MAX_BLOCK_SAMPLES = 1000
+
+# Weight changes tried per criterion and direction before bisection.
+THRESHOLD_GRID = 64
+THRESHOLD_STEPS = 40
+
+METHODS = ("dirichlet", "bounds")
+
+
+def _unit_weights(weights):
+    """Weights scaled to sum 1; they must not be negative."""
+    weights = as_weights(weights)
+    if (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError("Weights must be non-negative and not all 0.")
+    return weights / weights.sum()
+
+
+def sample_weights(weights, n_samples, method="dirichlet", concentration=None,
+                   spread=0.1, rng=None):
+    """
+    Return ``n_samples`` weight vectors (n_samples x m), each summing to 1.
+
+    See the module docstring for ``method``, ``concentration`` and
+    ``spread``.  ``rng`` is a ``np.random.Generator`` or a seed.
+    """
+    weights = _unit_weights(weights)
+    rng = np.random.default_rng(rng)
+    if method == "dirichlet":
+        if concentration is None:
+            alpha = np.ones(len(weights))
+        else:
+            if concentration <= 0:
+                raise ValueError("Concentration must be positive.")
+            alpha = concentration * weights
+        return rng.dirichlet(alpha, n_samples)
+    if method == "bounds":
+        if not 0 <= spread < 1:
+            raise ValueError("Spread must be at least 0 and below 1.")
+        factors = rng.uniform(1 - spread, 1 + spread, (n_samples, len(weights)))
+        samples = weights * factors
+        return samples / samples.sum(axis=1, keepdims=True)
+    raise ValueError(f"Unknown sampling method '{method}'. "
+                     f"Choose from: {', '.join(METHODS)}.")
+
+
+def _labels(data, criteria, labels):
+    """Criteria names and alternative labels, by default from a DataFrame."""
+    if isinstance(data, pd.DataFrame):
+        if criteria is None:
+            criteria = list(data.columns[1:])
+        if labels is None:
+            labels = data.iloc[:, 0]
+    return criteria, labels
+
+
+def _prepare(matrix, impacts, names=None):
+    """Squared gaps of the normalised matrix to the best and worst values."""
+    normalized, col_min, col_max = vector_normalized(matrix, names)
+    benefit = np.array([i == '+' for i in impacts])
+    best = np.where(benefit, col_max, col_min)
+    worst = np.where(benefit, col_min, col_max)
+    # (m x n), laid out for the (k x m) @ (m x n) products
+    return dict(gap_best=np.square(normalized - best).T.copy(),
+                gap_worst=np.square(normalized - worst).T.copy())
+
+
+def _scores(shared, weights):
+    """(k x n) closeness of every alternative under (k x m) ``weights``."""
+    squared = np.square(weights)
+    d_best = np.sqrt(squared @ shared["gap_best"])
+    d_worst = np.sqrt(squared @ shared["gap_worst"])
+    np.add(d_best, d_worst, out=d_best)
+    # All-zero weights leave no distance at all; such a sample scores NaN
+    with np.errstate(invalid="ignore"):
+        return np.divide(d_worst, d_best, out=d_worst)
+
+
+# ── Monte Carlo ───────────────────────────────────────────────────────────
+
+# Set in each worker process by _init_worker, so the prepared matrix is
+# sent to a worker once rather than with every block.
+_shared = None
+
+
+def _init_worker(shared):
+    global _shared
+    _shared = shared
+
+
+def _run_block(n_samples, seed, shared=None):
+    """Sample and score one block; returns its running totals."""
+    shared = shared or _shared
+    samples = sample_weights(shared["weights"], n_samples, rng=seed,
+                             **shared["sampling"])
+    # Tied alternatives share the best rank, so ranks stay whole numbers
+    ranks = rank_scores(_scores(shared, samples), "min")
+    n_rows = ranks.shape[1]
+    max_rank = shared["max_rank"]
+
+    # Rank counts: one bincount over (alternative, rank) cells
+    alternative = np.broadcast_to(np.arange(n_rows), ranks.shape)
+    kept = ranks <= max_rank
+    cells = alternative[kept] * max_rank + ranks[kept] - 1
+    counts = np.bincount(cells, minlength=n_rows * max_rank)
+    return (counts.reshape(n_rows, max_rank), ranks.sum(axis=0),
+            np.square(ranks, dtype=float).sum(axis=0),
+            ranks.min(axis=0), ranks.max(axis=0))
+
+
+def rank_sensitivity(data, weights, impacts, samples=10000,
+                     method="dirichlet", concentration=None, spread=0.1,
+                     seed=None, workers=None, max_rank=None,
+                     max_cells=DEFAULT_MAX_CELLS, criteria=None, labels=None):
+    """
+    Rank distribution of every alternative over sampled weight vectors.
+
+    Parameters:
+        data     (ndarray | DataFrame): Decision matrix (n x m); as
+                          everywhere, the first DataFrame column (the
+                          alternatives) is dropped
+        weights, impacts: As for ``TopsisModel``; weights are the centre
+                          of the "bounds" and concentrated Dirichlet samples
+        samples  (int):   Number of weight vectors
+        method, concentration, spread: See ``sample_weights``
+        seed     (int):   Makes the result reproducible
+        workers  (int):   Score blocks on this many processes, 0 = one per
+                          CPU; default in this process
+        max_rank (int):   Count acceptability for ranks 1..max_rank only
+                          (default all n ranks; n x n counts)
+        max_cells (int):  Upper bound on elements per block of scores
+        criteria (list):  Column names for error messages
+        labels   (array-like): Alternative of each row, put first in the
+                          summary (named after its ``name``, if any)
+        By default ``criteria`` and ``labels`` come from a DataFrame.
+
+    Returns:
+        summary (DataFrame): Per alternative: Base Rank (at ``weights``),
+                             Mean Rank, Std Rank, Best Rank, Worst Rank
+        acceptability (ndarray): (n x max_rank) share of samples in which
+                             alternative i has rank r + 1 (the rank
+                             acceptability index)
+    """
+    matrix = as_matrix(data)
+    base = _unit_weights(weights)
+    impacts = as_impacts(impacts)
+    n_rows, n_criteria = matrix.shape
+    if len(base) != n_criteria or len(impacts) != n_criteria:
+        raise ValueError(f"Expected {n_criteria} weights and impacts, got "
+                         f"{len(base)} and {len(impacts)}.")
+    if int(samples) != samples or samples < 1:
+        raise ValueError("Number of samples must be a positive integer.")
+    if method not in METHODS:
+        raise ValueError(f"Unknown sampling method '{method}'. "
+                         f"Choose from: {', '.join(METHODS)}.")
+    max_rank = n_rows if max_rank is None else min(int(max_rank), n_rows)
+    if max_rank < 1:
+        raise ValueError("max-rank must be a positive integer.")
+
+    criteria, labels = _labels(data, criteria, labels)
+    shared = _prepare(matrix, impacts, criteria)
+    shared.update(weights=base, max_rank=max_rank,
+                  sampling=dict(method=method, concentration=concentration,
+                                spread=spread))
+    base_ranks = rank_scores(_scores(shared, base), "min")
+
+    # Fixed block sizes and per-block seeds: the same result on any pool
+    block = max(1, min(MAX_BLOCK_SAMPLES, int(max_cells) // n_rows))
+    sizes = [min(block, samples - start) for start in range(0, samples, block)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers is None or len(sizes) == 1:
+        totals = [_run_block(size, s, shared) for size, s in zip(sizes, seeds)]
+    else:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shared,)) as pool:
+            totals = list(pool.map(_run_block, sizes, seeds))
+
+    counts = sum(t[0] for t in totals)
+    rank_sum = sum(t[1] for t in totals)
+    rank_sumsq = sum(t[2] for t in totals)
+    mean = rank_sum / samples
+    std = np.sqrt(np.maximum(rank_sumsq / samples - mean ** 2, 0))
+
+    summary = pd.DataFrame({
+        'Base Rank': base_ranks,
+        'Mean Rank': mean,
+        'Std Rank': std,
+        'Best Rank': np.min([t[3] for t in totals], axis=0),
+        'Worst Rank': np.max([t[4] for t in totals], axis=0),
+    })
+    if labels is not None:
+        summary.insert(0, getattr(labels, "name", None) or "Alternative",
+                       np.asarray(labels))
+    return summary, counts / samples
+
+
+# ── Critical weight changes ───────────────────────────────────────────────
+
+def _winners(shared, trial_weights):
+    """Index of the best alternative under each trial weight vector."""
+    winners = np.empty(len(trial_weights), dtype=int)
+    block = max(1, shared["max_cells"] // shared["gap_best"].shape[1])
+    for start in range(0, len(trial_weights), block):
+        scores = _scores(shared, trial_weights[start:start + block])
+        # A NaN score (all-zero weights) never wins
+        winners[start:start + block] = np.argmax(
+            np.nan_to_num(scores, nan=-np.inf), axis=1)
+    return winners
+
+
+def _shifted(base, criteria, targets):
+    """
+    Weight vectors with criterion ``criteria[i]`` set to ``targets[i]`` and
+    the other criteria rescaled so every vector still sums to 1.
+    """
+    rest = 1 - base[criteria]
+    scale = np.divide(1 - targets, rest, out=np.zeros_like(rest), where=rest > 0)
+    trial = base[np.newaxis, :] * scale[:, np.newaxis]
+    trial[np.arange(len(criteria)), criteria] = targets
+    return trial
+
+
+def critical_weights(data, weights, impacts, grid=THRESHOLD_GRID,
+                     steps=THRESHOLD_STEPS, max_cells=DEFAULT_MAX_CELLS,
+                     criteria=None, labels=None):
+    """
+    Smallest change of each criterion's weight that changes the best
+    alternative.
+
+    Weights are normalised to sum 1; when one weight changes, the others
+    are rescaled in proportion.  Each criterion is moved up towards 1 and
+    down towards 0 on a grid of ``grid`` steps, and the first step where
+    the winner changes is refined by ``steps`` rounds of bisection.  All
+    criteria and directions are scored together in each round.
+
+    Returns a DataFrame with one row per criterion: Weight, Decrease and
+    Increase (the weight change needed, NaN if the winner never changes in
+    that direction), Decrease % and Increase % (relative to the weight),
+    and the alternative that then comes first (New Best Down / Up).
+    ``data``, ``criteria`` and ``labels`` are as for ``rank_sensitivity``;
+    without labels, alternatives are numbered from 1.
+    """
+    matrix = as_matrix(data)
+    base = _unit_weights(weights)
+    impacts = as_impacts(impacts)
+    n_rows, n_criteria = matrix.shape
+    if len(base) != n_criteria or len(impacts) != n_criteria:
+        raise ValueError(f"Expected {n_criteria} weights and impacts, got "
+                         f"{len(base)} and {len(impacts)}.")
+    names, labels = _labels(data, criteria, labels)
+    shared = _prepare(matrix, impacts, names)
+    shared["max_cells"] = int(max_cells)
+    best = _winners(shared, base[np.newaxis])[0]
+
+    # Every (criterion, direction) pair: weight moves from base to `end`
+    criteria = np.tile(np.arange(n_criteria), 2)
+    end = np.repeat([0.0, 1.0], n_criteria)
+    start = base[criteria]
+
+    # Grid search: the first fraction of the way to `end` with a new winner
+    fractions = np.arange(1, grid + 1) / grid
+    targets = start[:, np.newaxis] + (end - start)[:, np.newaxis] * fractions
+    winners = _winners(shared, _shifted(base, np.repeat(criteria, grid),
+                                        targets.ravel())).reshape(-1, grid)
+    changed = winners != best
+    found = changed.any(axis=1)
+    first = np.argmax(changed, axis=1)
+
+    # Bisection between the last unchanged and the first changed step
+    low = np.where(first > 0, fractions[first - 1], 0.0)
+    high = fractions[first]
+    for _ in range(steps):
+        mid = (low + high) / 2
+        moved = _winners(shared, _shifted(base, criteria,
+                                          start + (end - start) * mid)) != best
+        high = np.where(moved, mid, high)
+        low = np.where(moved, low, mid)
+    new_best = _winners(shared, _shifted(base, criteria,
+                                         start + (end - start) * high))
+
+    change = np.where(found, np.abs(end - start) * high, np.nan)
+    percent = np.divide(change, start, out=np.full_like(change, np.nan),
+                        where=start > 0) * 100
+    labels = (np.arange(1, n_rows + 1) if labels is None
+              else np.asarray(labels))
+    new_best = np.where(found, labels[new_best], None)
+
+    result = pd.DataFrame({
+        'Criterion': names if names is not None else np.arange(1, n_criteria + 1),
+        'Weight': base,
+        'Decrease': change[:n_criteria],
+        'Decrease %': percent[:n_criteria],
+        'New Best Down': new_best[:n_criteria],
+        'Increase': change[n_criteria:],
+        'Increase %': percent[n_criteria:],
+        'New Best Up': new_best[n_criteria:],
+    })
+    return result
+
+
+# ── Command line ──────────────────────────────────────────────────────────
+
+def run_sensitivity(input_file, weights, impacts, output_file, samples=10000,
+                    method="dirichlet", concentration=None, spread=0.1,
+                    seed=None, workers=None, max_rank=10):
+    """
+    Write the rank distribution of every alternative to ``output_file`` and
+    print the critical weight change of every criterion.
+
+    The output has the alternatives column, the ``rank_sensitivity``
+    summary and one "Rank r %" column per rank up to ``max_rank``.
+    """
+    from .topsis import parse_impacts, parse_weights
+
+    df, matrix = load_decision_matrix(input_file)
+    w = parse_weights(weights)
+    imp = parse_impacts(impacts)
+    criteria = list(df.columns[1:])
+    labels = df.iloc[:, 0]
+
+    try:
+        summary, acceptability = rank_sensitivity(
+            matrix, w, imp, samples=samples, method=method,
+            concentration=concentration, spread=spread, seed=seed,
+            workers=workers, max_rank=max_rank, criteria=criteria,
+            labels=labels)
+        thresholds = critical_weights(matrix, w, imp, criteria=criteria,
+                                      labels=labels)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    for r in range(acceptability.shape[1]):
+        summary[f'Rank {r + 1} %'] = np.round(acceptability[:, r] * 100, 2)
+    summary['Mean Rank'] = summary['Mean Rank'].round(4)
+    summary['Std Rank'] = summary['Std Rank'].round(4)
+    write_table(summary, output_file)
+
+    print(f"✅ TOPSIS sensitivity analysis complete!")
+    print(f"   Results saved to: {output_file}")
+    print(f"   Samples: {samples} ({method})   Alternatives: {len(df)}   "
+          f"Criteria: {len(criteria)}")
+    print("\nCritical weight changes (best alternative changes):")
+    print(thresholds.round(4).to_string(index=False))
+
+
+def print_sensitivity_usage():
+    """Print the usage banner of the sensitivity subcommand."""
+    print("=" * 55)
+    print("  TOPSIS — Weight Sensitivity")
+    print("=" * 55)
+    print("\nUsage:")
+    print("  topsis sensitivity <InputFile> <Weights> <Impacts> <OutputFile>")
+    print("                     [options]")
+    print("\nExample:")
+    print('  topsis sensitivity data.csv "1,1,1,2" "+,+,-,+" ranks.csv \\')
+    print("      --samples 20000 --method bounds --spread 0.2 --seed 1")
+    print("\nOptions:")
+    print("  --samples N       - Weight vectors to sample (default 10000)")
+    print("  --method M        - dirichlet (default) or bounds")
+    print("  --concentration C - Centre Dirichlet samples on the weights;")
+    print("                      larger = closer (default: uniform)")
+    print("  --spread F        - Relative +/- range of bounds (default 0.1)")
+    print("  --seed S          - Make the samples reproducible")
+    print("  --workers N       - Worker processes, 0 = one per CPU")
+    print("                      (default: this process)")
+    print("  --max-rank K      - Acceptability columns for ranks 1..K")
+    print("                      (default 10)")
+    print("=" * 55)
+
+
+def main(argv):
+    """Entry point of ``topsis sensitivity``."""
+    from .cli import split_args
+
+    spec = {"--samples": int, "--method": str, "--concentration": float,
+            "--spread": float, "--seed": int, "--workers": int,
+            "--max-rank": int}
+    positional, options = split_args(argv, spec, flags=())
+    if len(positional) != 4:
+        print_sensitivity_usage()
+        print("\nError: Incorrect number of parameters.")
+        sys.exit(1)
+    workers = options.get("workers")
+    if workers is not None and workers < 0:
+        print("Error: Number of workers must be 0 (one per CPU) or a "
+              "positive integer.")
+        sys.exit(1)
+    run_sensitivity(*positional, **options)
@@ -0,0 +1,242 @@
+"""
+TOPSIS on sparse and incomplete decision matrices.
+
+Wide criteria tables are often mostly empty: thousands of optional criteria
+of which each alternative has a few.  Everywhere else the matrix must be
+dense and complete, and a missing cell is rejected.  Here only the present
+cells are kept, as (row, column, value) triplets ordered by column, so
+memory and work grow with the number of present values, not with n x m:
+
+    1. column sum of squares, sum, minimum and maximum over the present
+       values (``np.bincount`` and ``np.minimum.reduceat`` per column)
+    2. divisors and ideal points with ``TopsisModel.fit_stats``, so every
+       normalisation kernel applies
+    3. each present cell adds ``|v - ideal|^p`` to its row's distances
+    4. every missing cell of a column adds the same constant (below), so
+       the missing cells of a row are all columns' constants minus those of
+       its present cells, again one ``np.bincount``
+
+What counts as missing depends on the input:
+
+    scipy.sparse matrix    cells that are not stored (a stored 0 is present)
+    NumPy masked array     masked cells
+    ndarray / DataFrame    NaN cells (blank in a CSV file)
+
+Missing-value policies, applied to the distances only; column statistics
+and ideal points always come from the present values:
+
+    skip      a missing cell adds nothing to either distance, so the
+              alternative is judged on the criteria it has (default)
+    impute    a missing cell takes the mean of the present values of its
+              column
+    penalize  a missing cell takes the worst value of its column: the full
+              gap to the ideal best, none to the ideal worst
+
+The per-column constant needs a distance that is a sum over criteria, so
+"euclidean", "manhattan" and "minkowski:P" are supported; "chebyshev" is
+not.  A column without any present value does not take part.  An
+alternative without present values scores 0 under "skip"; one that equals
+both ideal points scores 1, as in ``topsis_pkg.groups``.  On a complete
+matrix every policy gives the scores of ``TopsisModel``.
+
+Usage:
+    scores, ranks = score_sparse(csr_matrix, weights, impacts, "penalize")
+    run_topsis("wide.csv", w, imp, "out.csv", missing="skip")
+"""
+
+import numpy as np
+
+from .kernels import get_distance
+from .model import TopsisModel, as_impacts, as_matrix, as_weights
+from .ranking import ranks as rank_scores
+from .validation import MatrixError, describe_rows
+
+
+MISSING_POLICIES = ("skip", "impute", "penalize")
+
+
+def check_policy(missing):
+    """Raise ValueError unless ``missing`` is one of ``MISSING_POLICIES``."""
+    if missing not in MISSING_POLICIES:
+        raise ValueError(f"Unknown missing-value policy '{missing}'. "
+                         f"Choose from: {', '.join(MISSING_POLICIES)}.")
+
+
+def distance_power(distance):
+    """Return the exponent P of an additive distance ``sum |d|^P``."""
+    get_distance(distance)
+    name, _, param = distance.partition(":")
+    power = {"euclidean": 2.0, "manhattan": 1.0}.get(name)
+    if name == "minkowski":
+        power = float(param)
+    if power is None or power == np.inf:
+        raise ValueError(f"Distance '{distance}' is not a sum over criteria "
+                         f"and cannot score missing values; use euclidean, "
+                         f"manhattan or minkowski:P.")
+    return power
+
+
+def _is_sparse(data):
+    # Duck-typed, so scipy is only needed by callers that have its matrices
+    return hasattr(data, "tocsc") and hasattr(data, "nnz")
+
+
+def present_entries(data):
+    """
+    Return ``(rows, cols, values, shape)``: the present cells of ``data``,
+    ordered by column, and the shape of the full matrix.
+    """
+    if _is_sparse(data):
+        csc = data.tocsc()
+        if not csc.has_canonical_format:
+            # Sum duplicate entries without touching the caller's matrix
+            csc = csc.copy()
+            csc.sum_duplicates()
+        shape = csc.shape
+        rows = csc.indices
+        cols = np.repeat(np.arange(shape[1]), np.diff(csc.indptr))
+        values = np.asarray(csc.data, dtype=float)
+        stored = ~np.isnan(values)
+        if not stored.all():
+            rows, cols, values = rows[stored], cols[stored], values[stored]
+        return rows, cols, values, shape
+
+    matrix = as_matrix(np.ma.getdata(data) if np.ma.isMaskedArray(data)
+                       else data)
+    present = ~np.isnan(matrix)
+    if np.ma.isMaskedArray(data):
+        present &= ~np.ma.getmaskarray(data).reshape(matrix.shape)
+    # Transposed, so the cells come out ordered by column
+    cols, rows = np.nonzero(present.T)
+    return rows, cols, matrix[rows, cols], matrix.shape
+
+
+def _check_values(rows, cols, values, criteria):
+    """Raise MatrixError naming the infinite present cells."""
+    bad = np.isinf(values)
+    if not bad.any():
+        return
+    problems = []
+    for j in np.unique(cols[bad]):
+        name = f"'{criteria[j]}'" if criteria is not None else str(j + 1)
+        positions = np.sort(rows[bad & (cols == j)])
+        problems.append(f"Column {name} has infinite values "
+                        f"({describe_rows(positions)}).")
+    raise MatrixError(" ".join(problems))
+
+
+def _column_stats(cols, values, n_criteria):
+    """Count, sum of squares, sum, minimum and maximum of every column."""
+    count = np.bincount(cols, minlength=n_criteria)
+    sumsq = np.bincount(cols, np.square(values), minlength=n_criteria)
+    col_sum = np.bincount(cols, values, minlength=n_criteria)
+    col_min = np.zeros(n_criteria)
+    col_max = np.zeros(n_criteria)
+    filled = np.flatnonzero(count)
+    if len(filled):
+        # Empty columns are zero-length segments, so the filled starts suffice
+        starts = (np.cumsum(count) - count)[filled]
+        col_min[filled] = np.minimum.reduceat(values, starts)
+        col_max[filled] = np.maximum.reduceat(values, starts)
+    return count, sumsq, col_sum, col_min, col_max
+
+
+def _powered(diff, power):
+    """``|diff| ** power`` in place."""
+    np.abs(diff, out=diff)
+    if power == 2:
+        return np.square(diff, out=diff)
+    if power != 1:
+        np.power(diff, power, out=diff)
+    return diff
+
+
+def score_sparse(data, weights, impacts, missing="skip",
+                 normalization="vector", distance="euclidean",
+                 criteria=None, ties="average", tie_tol=None):
+    """
+    Score and rank alternatives of a matrix with missing cells.
+
+    Parameters:
+        data     (sparse matrix | masked array | ndarray | DataFrame):
+                          Decision matrix (n x m); see the module docstring
+                          for what is missing.  As everywhere, the first
+                          DataFrame column (the alternatives) is dropped
+        weights, impacts: As for ``TopsisModel``
+        missing  (str):   "skip" (default), "impute" or "penalize"
+        normalization, distance (str): Kernels, see ``topsis_pkg.kernels``;
+                          the distance must be a sum over criteria
+        criteria (list):  Column names for error messages
+        ties, tie_tol:    Tie handling, see ``topsis_pkg.ranking``
+
+    Returns:
+        scores (ndarray): Closeness of each alternative
+        ranks  (ndarray): Rank of each alternative, 1 = best
+    """
+    check_policy(missing)
+    power = distance_power(distance)
+    weights = as_weights(weights)
+    impacts = as_impacts(impacts)
+    rows, cols, values, (n_rows, n_criteria) = present_entries(data)
+    if len(weights) != n_criteria or len(impacts) != n_criteria:
+        raise ValueError(f"Expected {n_criteria} weights and impacts, got "
+                         f"{len(weights)} and {len(impacts)}.")
+    if n_rows == 0:
+        raise ValueError("Decision matrix contains no alternatives.")
+    _check_values(rows, cols, values, criteria)
+
+    # ── 1. Column statistics over the present values ───────────────────────
+    count, sumsq, col_sum, col_min, col_max = _column_stats(cols, values,
+                                                            n_criteria)
+    if not count.any():
+        raise ValueError("Decision matrix has no present values.")
+
+    # ── 2. Fit; columns without values get statistics of [0, 1] ────────────
+    empty = count == 0
+    sumsq[empty] = col_sum[empty] = col_max[empty] = 1.0
+    model = TopsisModel(weights, impacts, normalization=normalization)
+    model.fit_stats(sumsq, col_min, col_max, col_sum, criteria=criteria)
+    norm = model.norm_
+    shift = np.zeros(n_criteria) if model.shift_ is None else model.shift_
+    # ... and take no part in the distances
+    best = np.where(empty, 0.0, model.ideal_best_)
+    worst = np.where(empty, 0.0, model.ideal_worst_)
+
+    # ── 3. Present cells ───────────────────────────────────────────────────
+    weighted = values - shift[cols]
+    weighted /= norm[cols]
+    weighted *= weights[cols]
+    diff = _powered(weighted - best[cols], power)
+    d_best = np.bincount(rows, diff, minlength=n_rows)
+    np.subtract(weighted, worst[cols], out=diff)
+    d_worst = np.bincount(rows, _powered(diff, power), minlength=n_rows)
+
+    # ── 4. Missing cells: one constant per column ──────────────────────────
+    if missing == "skip":
+        constants = ()
+    elif missing == "impute":
+        mean = col_sum / np.maximum(count, 1)
+        fill = (mean - shift) / norm * weights
+        constants = ((d_best, _powered(fill - best, power)),
+                     (d_worst, _powered(fill - worst, power)))
+    else:
+        constants = ((d_best, _powered(best - worst, power)),)
+    for distances, constant in constants:
+        constant[empty] = 0
+        distances += constant.sum()
+        distances -= np.bincount(rows, constant[cols], minlength=n_rows)
+        # Cancellation must not leave a tiny negative sum
+        np.maximum(distances, 0, out=distances)
+
+    if power == 2:
+        np.sqrt(d_best, out=d_best)
+        np.sqrt(d_worst, out=d_worst)
+    elif power != 1:
+        np.power(d_best, 1 / power, out=d_best)
+        np.power(d_worst, 1 / power, out=d_worst)
+    total = d_best + d_worst
+    scores = np.ones(n_rows)
+    np.divide(d_worst, total, out=scores, where=total > 0)
+    if missing == "skip":
+        scores[np.bincount(rows, minlength=n_rows) == 0] = 0.0
+    return scores, rank_scores(scores, ties, tie_tol)
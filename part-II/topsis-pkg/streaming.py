@@ -0,0 +1,230 @@
+"""
+Out-of-core TOPSIS for decision matrices that do not fit in memory.
+
+The in-memory path in ``topsis.py`` holds the full matrix plus several
+n x m temporaries.  Vector normalisation only needs the per-column sum of
+squares, and the ideal points only need the per-column minimum and maximum,
+so both can be accumulated while streaming the CSV chunk by chunk:
+
+    Pass 1: accumulate sum of squares, sum, min and max of every criterion
+    Pass 2: score each chunk against the fitted norms and ideal points
+    Pass 3: re-read each chunk and append score and rank to the output
+
+Peak memory is bounded by ``chunksize x m`` plus one float per alternative
+for the score vector, which ranking needs as a whole.  Scores match the
+in-memory path.
+
+With ``top_k`` the score vector is not kept: pass 2 merges each chunk into
+a bounded buffer of the best candidates, and pass 3 writes only the
+selected rows, so memory is bounded by ``chunksize x m`` plus k rows.
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from .kernels import get_normalization
+from .model import TopsisModel
+from .profiling import NULL_PROFILER
+from .ranking import (ranks as rank_scores, top_k_candidates,
+                      top_k as select_top_k, written_ranks)
+from .topsis import check_top_k, parse_weights, parse_impacts, check_criteria_counts
+from .validation import MatrixError, criteria_matrix
+
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def _read_chunks(input_file, chunksize):
+    """Yield chunks of the input CSV, exiting cleanly on read errors."""
+    try:
+        for chunk in pd.read_csv(input_file, chunksize=chunksize):
+            yield chunk
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        sys.exit(1)
+
+
+def _numeric_block(chunk, start):
+    """
+    Return the criteria columns of ``chunk`` as a float matrix; ``start``
+    is the position of its first row in the file, for error messages.
+    """
+    try:
+        return criteria_matrix(chunk, first_row=start + 1)
+    except MatrixError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+def accumulate_column_stats(input_file, chunksize=DEFAULT_CHUNKSIZE,
+                            with_sum=False):
+    """
+    Stream the CSV once and collect the statistics TOPSIS depends on.
+
+    Returns:
+        columns (list):      All column names, alternatives column first
+        n_rows  (int):       Number of alternatives
+        sumsq   (ndarray):   Per-criterion sum of squares
+        col_min (ndarray):   Per-criterion minimum
+        col_max (ndarray):   Per-criterion maximum
+        col_sum (ndarray):   Per-criterion sum, or None unless ``with_sum``
+    """
+    columns = None
+    n_rows = 0
+    sumsq = col_min = col_max = col_sum = None
+
+    for chunk in _read_chunks(input_file, chunksize):
+        if columns is None:
+            columns = list(chunk.columns)
+            if len(columns) < 3:
+                print("Error: Input file must contain three or more columns.")
+                sys.exit(1)
+            n_criteria = len(columns) - 1
+            sumsq   = np.zeros(n_criteria)
+            col_min = np.full(n_criteria, np.inf)
+            col_max = np.full(n_criteria, -np.inf)
+            if with_sum:
+                col_sum = np.zeros(n_criteria)
+
+        block = _numeric_block(chunk, n_rows)
+        if len(block) == 0:
+            continue
+        sumsq += (block ** 2).sum(axis=0)
+        np.minimum(col_min, block.min(axis=0), out=col_min)
+        np.maximum(col_max, block.max(axis=0), out=col_max)
+        if with_sum:
+            col_sum += block.sum(axis=0)
+        n_rows += len(block)
+
+    if columns is None or n_rows == 0:
+        print("Error: Input file contains no alternatives.")
+        sys.exit(1)
+
+    return columns, n_rows, sumsq, col_min, col_max, col_sum
+
+
+def _stream_top_k(input_file, chunksize, model, top_k, ties):
+    """Pass 2 for top-k mode: return (global positions, scores, ranks)."""
+    buf_pos = np.empty(0, dtype=np.int64)
+    buf_scores = np.empty(0)
+    start = 0
+    for chunk in _read_chunks(input_file, chunksize):
+        stop = start + len(chunk)
+        buf_pos = np.concatenate([buf_pos, np.arange(start, stop)])
+        buf_scores = np.concatenate([buf_scores,
+                                     model.score(_numeric_block(chunk, start))])
+        keep = top_k_candidates(buf_scores, top_k)
+        buf_pos, buf_scores = buf_pos[keep], buf_scores[keep]
+        start = stop
+
+    order, ranks = select_top_k(buf_scores, top_k, ties)
+    return buf_pos[order], buf_scores[order], ranks
+
+
+def _write_top_k(input_file, chunksize, output_file,
+                 positions, scores, ranks):
+    """Pass 3 for top-k mode: collect the selected rows and write them."""
+    wanted = np.sort(positions)
+    selected = []
+    start = 0
+    for chunk in _read_chunks(input_file, chunksize):
+        stop = start + len(chunk)
+        lo, hi = np.searchsorted(wanted, [start, stop])
+        if hi > lo:
+            rows = chunk.iloc[wanted[lo:hi] - start]
+            rows.index = wanted[lo:hi]
+            selected.append(rows)
+        start = stop
+
+    result_df = pd.concat(selected).loc[positions]
+    result_df['Topsis Score'] = np.round(scores, 4)
+    result_df['Rank'] = written_ranks(ranks)
+    result_df.to_csv(output_file, index=False)
+
+
+def run_topsis_streaming(input_file, weights, impacts, output_file,
+                         chunksize=DEFAULT_CHUNKSIZE, top_k=None,
+                         profiler=NULL_PROFILER, normalization="vector",
+                         distance="euclidean", ties="average", tie_tol=None):
+    """
+    Run TOPSIS without loading the whole input into memory.
+
+    Parameters:
+        input_file  (str): Path to input CSV file
+        weights     (str): Comma-separated weights e.g. "1,1,2,1"
+        impacts     (str): Comma-separated impacts e.g. "+,+,-,+"
+        output_file (str): Path to save result CSV
+        chunksize   (int): Rows read per chunk
+        top_k       (int): If given, write only the best ``top_k``
+                           alternatives, best first
+        profiler (Profiler): Records each pass; reading is interleaved
+                           with the math, so stages are per pass
+        normalization, distance (str): Kernels, see ``topsis_pkg.kernels``
+        ties, tie_tol: Tie handling, see ``topsis_pkg.ranking``
+    """
+    if chunksize is None or int(chunksize) < 1:
+        print("Error: Chunk size must be a positive integer.")
+        sys.exit(1)
+    chunksize = int(chunksize)
+    check_top_k(top_k)
+
+    w = parse_weights(weights)
+    imp = parse_impacts(impacts)
+
+    # ── Pass 1: column statistics ──────────────────────────────────────────
+    with profiler.stage("stats_pass"):
+        columns, n_rows, sumsq, col_min, col_max, col_sum = \
+            accumulate_column_stats(input_file, chunksize,
+                                    get_normalization(normalization).needs_sum)
+    check_criteria_counts(w, imp, len(columns) - 1)
+
+    with profiler.stage("ideal_points"):
+        model = TopsisModel(w, imp, normalization=normalization,
+                            distance=distance)
+        try:
+            model.fit_stats(sumsq, col_min, col_max, col_sum,
+                            criteria=columns[1:])
+        except MatrixError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    if top_k is not None:
+        with profiler.stage("score_pass"):
+            positions, scores, ranks = \
+                _stream_top_k(input_file, chunksize, model, top_k, ties)
+        with profiler.stage("write_pass"):
+            _write_top_k(input_file, chunksize, output_file,
+                         positions, scores, ranks)
+        print(f"✅ TOPSIS analysis complete!")
+        print(f"   Results saved to: {output_file}")
+        print(f"   Top {len(positions)} of {n_rows} alternatives written")
+        return
+
+    # ── Pass 2: scores ─────────────────────────────────────────────────────
+    with profiler.stage("score_pass"):
+        scores = np.empty(n_rows)
+        start = 0
+        for chunk in _read_chunks(input_file, chunksize):
+            stop = start + len(chunk)
+            scores[start:stop] = model.score(_numeric_block(chunk, start))
+            start = stop
+
+    with profiler.stage("rank"):
+        ranks = rank_scores(scores, ties, tie_tol)
+
+    # ── Pass 3: write output incrementally ─────────────────────────────────
+    with profiler.stage("write_pass"):
+        start = 0
+        for i, chunk in enumerate(_read_chunks(input_file, chunksize)):
+            stop = start + len(chunk)
+            chunk['Topsis Score'] = np.round(scores[start:stop], 4)
+            chunk['Rank'] = written_ranks(ranks[start:stop])
+            chunk.to_csv(output_file, mode='w' if i == 0 else 'a',
+                         header=(i == 0), index=False)
+            start = stop
+
+    print(f"✅ TOPSIS analysis complete!")
+    print(f"   Results saved to: {output_file}")
+    print(f"   Alternatives ranked: {n_rows}")
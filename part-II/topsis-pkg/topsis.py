@@ -1,114 +1,448 @@
-import pandas as pd
-import numpy as np
 import sys
 import os
 
+from .formats import file_format, read_table, write_table
+from .profiling import NULL_PROFILER
 
-def run_topsis(input_file, weights, impacts, output_file):
+# pandas and NumPy are imported inside the functions that use them, so the
+# CLI can print usage errors or take the fast path (see ``fastpath``)
+# without loading pandas.
+
+
+def parse_weights(weights):
+    """Parse a comma-separated weights string into a list of floats."""
+    try:
+        return [float(x.strip()) for x in weights.split(",")]
+    except ValueError:
+        print("Error: Weights must be numeric values separated by commas.")
+        sys.exit(1)
+
+
+def parse_impacts(impacts):
+    """Parse a comma-separated impacts string into a list of '+' / '-'."""
+    imp = [x.strip() for x in impacts.split(",")]
+    invalid = [i for i in imp if i not in ['+', '-']]
+    if invalid:
+        print(f"Error: Impacts must be '+' or '-' only. Invalid: {invalid}")
+        sys.exit(1)
+    return imp
+
+
+def check_criteria_counts(w, imp, n_criteria):
+    """Exit with an error unless weights and impacts match the criteria."""
+    if len(w) != n_criteria:
+        print(f"Error: Number of weights ({len(w)}) must equal "
+              f"number of criteria columns ({n_criteria}).")
+        sys.exit(1)
+
+    if len(imp) != n_criteria:
+        print(f"Error: Number of impacts ({len(imp)}) must equal "
+              f"number of criteria columns ({n_criteria}).")
+        sys.exit(1)
+
+
+def load_decision_matrix(input_file, columns=None, profiler=NULL_PROFILER,
+                         dtype=None, group_by=None, allow_missing=False):
     """
-    Run TOPSIS analysis.
+    Read and validate a decision matrix file.
 
-    Parameters:
-        input_file  (str): Path to input CSV file
-        weights     (str): Comma-separated weights e.g. "1,1,2,1"
-        impacts     (str): Comma-separated impacts e.g. "+,+,-,+"
-        output_file (str): Path to save result CSV
+    Exits with an error message unless the file exists, has an alternatives
+    column plus at least two criteria, and every criterion cell is a finite
+    number (see ``topsis_pkg.validation``).  Returns ``(df, matrix)``: the
+    DataFrame with criteria converted to numbers, and the criteria as one
+    ``dtype`` array (float64 by default), converted once.  CSV, NPY,
+    Parquet and Arrow files are accepted (see ``topsis_pkg.formats``);
+    ``columns`` restricts the criteria that are read, and ``dtype`` (e.g.
+    "float32") the type they are stored in.  ``group_by`` names a column of
+    group labels that is kept in ``df`` but is not a criterion.  With
+    ``allow_missing``, blank cells are kept as NaN (see
+    ``topsis_pkg.sparse``).  The read and validate stages are recorded on
+    ``profiler``.
     """
+    from .validation import MatrixError, criteria_matrix
 
     # ── Validate file exists ───────────────────────────────────────────────
     if not os.path.isfile(input_file):
         print(f"Error: File '{input_file}' not found.")
         sys.exit(1)
 
-    # ── Read CSV ───────────────────────────────────────────────────────────
+    # ── Read file ──────────────────────────────────────────────────────────
     try:
-        df = pd.read_csv(input_file)
+        with profiler.stage("read"):
+            if columns is not None and group_by is not None:
+                columns = list(columns) + [group_by]
+            df = read_table(input_file, columns, dtype)
     except Exception as e:
         print(f"Error reading file: {e}")
         sys.exit(1)
 
+    # ── Separate the group column from the criteria ────────────────────────
+    frame = df
+    if group_by is not None:
+        if group_by not in df.columns:
+            print(f"Error: Group column '{group_by}' not found.")
+            sys.exit(1)
+        if df.columns[0] == group_by:
+            print("Error: The group column cannot be the alternatives column.")
+            sys.exit(1)
+        frame = df.drop(columns=group_by)
+
     # ── Check minimum 3 columns ────────────────────────────────────────────
-    if df.shape[1] < 3:
+    if frame.shape[1] < 3:
         print("Error: Input file must contain three or more columns.")
         sys.exit(1)
 
-    # ── Parse weights ──────────────────────────────────────────────────────
+    # ── Validate numeric columns (2nd to last) ─────────────────────────────
+    with profiler.stage("validate"):
+        try:
+            # A view when the criteria already have the compute dtype
+            matrix = criteria_matrix(frame, dtype,
+                                     allow_missing=allow_missing)
+        except MatrixError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        # Criteria read as text (e.g. quoted numbers) are written as numbers
+        criteria = frame.columns[1:]
+        text = frame[criteria].select_dtypes(exclude=["number", "bool"]).columns
+        if len(text):
+            df[text] = matrix[:, criteria.get_indexer(text)]
+
+    return df, matrix
+
+
+def check_top_k(top_k):
+    """Exit with an error unless ``top_k`` is None or a positive integer."""
+    if top_k is not None and (int(top_k) != top_k or top_k < 1):
+        print("Error: top-k must be a positive integer.")
+        sys.exit(1)
+
+
+def check_dtype(dtype):
+    """Exit with an error unless ``dtype`` is None, float64 or float32."""
+    if dtype is not None and dtype not in ("float64", "float32"):
+        print("Error: dtype must be 'float64' or 'float32'.")
+        sys.exit(1)
+
+
+def check_threads(threads):
+    """Exit with an error unless ``threads`` is None or a count >= 0."""
+    if threads is not None and (int(threads) != threads or threads < 0):
+        print("Error: threads must be a non-negative integer (0 = all CPUs).")
+        sys.exit(1)
+
+
+def check_kernels(normalization, distance):
+    """Exit with an error unless both kernels are registered."""
+    from .kernels import get_distance, get_normalization
     try:
-        w = [float(x.strip()) for x in weights.split(",")]
-    except ValueError:
-        print("Error: Weights must be numeric values separated by commas.")
+        get_normalization(normalization)
+        get_distance(distance)
+    except ValueError as e:
+        print(f"Error: {e}")
         sys.exit(1)
 
-    # ── Parse impacts ──────────────────────────────────────────────────────
-    imp = [x.strip() for x in impacts.split(",")]
-    invalid = [i for i in imp if i not in ['+', '-']]
-    if invalid:
-        print(f"Error: Impacts must be '+' or '-' only. Invalid: {invalid}")
+
+def check_ties(ties, tie_tol, top_k):
+    """Exit with an error unless the tie method and tolerance are valid."""
+    from .ranking import check_method
+    try:
+        check_method(ties)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if tie_tol is not None and not tie_tol >= 0:
+        print("Error: tie-tol must be a non-negative number.")
+        sys.exit(1)
+    if tie_tol and top_k is not None:
+        print("Error: tie-tol cannot be combined with top-k.")
         sys.exit(1)
 
-    # ── Validate numeric columns (2nd to last) ─────────────────────────────
-    for col in df.columns[1:]:
-        try:
-            df[col] = pd.to_numeric(df[col])
-        except (ValueError, TypeError):
-            print(f"Error: Column '{col}' must contain numeric values only.")
+
+def check_missing(missing, distance):
+    """Exit with an error unless the missing-value policy can be used."""
+    from .sparse import check_policy, distance_power
+    try:
+        check_policy(missing)
+        distance_power(distance)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+def run_topsis(input_file, weights, impacts, output_file, chunksize=None,
+               top_k=None, columns=None, profiler=None, threads=None,
+               dtype=None, normalization="vector", distance="euclidean",
+               group_by=None, ties="average", tie_tol=None, missing=None):
+    """
+    Run TOPSIS analysis.
+
+    Parameters:
+        input_file  (str): Path to input file (.csv, .npy, .parquet,
+                           .arrow / .feather)
+        weights     (str): Comma-separated weights e.g. "1,1,2,1"
+        impacts     (str): Comma-separated impacts e.g. "+,+,-,+"
+        output_file (str): Path to save the result, in the format given by
+                           its extension
+        chunksize   (int): If given, stream the input in chunks of this many
+                           rows instead of loading it whole (see
+                           ``topsis_pkg.streaming``); CSV only
+        top_k       (int): If given, write only the best ``top_k``
+                           alternatives, best first
+        columns    (list): If given, only these criteria are read
+        profiler (Profiler): If given, records each stage (see
+                           ``topsis_pkg.profiling``)
+        threads     (int): If given, normalise and score in row blocks on
+                           this many threads, 0 = one per CPU (see
+                           ``topsis_pkg.parallel``); for large in-memory
+                           inputs
+        dtype       (str): "float32" halves the memory of the criteria and
+                           of the scoring work; the default is "float64".
+                           See ``topsis_pkg.precision`` for how ranks
+                           compare
+        normalization (str): "vector" (default), "max", "sum" or "minmax"
+        distance    (str): "euclidean" (default), "manhattan", "chebyshev"
+                           or "minkowski:P" (see ``topsis_pkg.kernels``)
+        group_by    (str): If given, the column of group labels; every
+                           alternative is ranked within its group (see
+                           ``topsis_pkg.groups``)
+        ties        (str): How tied scores are ranked: "average"
+                           (default), "min", "max", "dense" or "ordinal"
+                           (see ``topsis_pkg.ranking``)
+        tie_tol   (float): If given, scores less than this apart are tied
+        missing     (str): If given, blank cells are allowed and handled
+                           by this policy: "skip", "impute" or "penalize"
+                           (see ``topsis_pkg.sparse``); also required for
+                           sparse .npz input
+    """
+    profiler = profiler or NULL_PROFILER
+
+    # ── Validate file exists ───────────────────────────────────────────────
+    if not os.path.isfile(input_file):
+        print(f"Error: File '{input_file}' not found.")
+        sys.exit(1)
+
+    check_top_k(top_k)
+    check_threads(threads)
+    check_dtype(dtype)
+    check_kernels(normalization, distance)
+    check_ties(ties, tie_tol, top_k)
+    kernels = dict(normalization=normalization, distance=distance)
+    tie_options = dict(ties=ties, tie_tol=tie_tol)
+
+    if group_by is not None:
+        if (chunksize is not None or top_k is not None or dtype is not None
+                or missing is not None):
+            print("Error: Grouped ranking cannot be combined with chunked "
+                  "mode, top-k, dtype or missing values.")
+            sys.exit(1)
+        return _run_grouped(input_file, weights, impacts, output_file,
+                            group_by, columns, profiler, threads,
+                            **kernels, **tie_options)
+
+    if missing is not None:
+        check_missing(missing, distance)
+        if (chunksize is not None or threads is not None
+                or dtype is not None):
+            print("Error: Missing-value scoring cannot be combined with "
+                  "chunked mode, threads or dtype.")
             sys.exit(1)
+        return _run_missing(input_file, weights, impacts, output_file,
+                            missing, top_k, columns, profiler, **kernels,
+                            **tie_options)
+
+    if (chunksize is None and columns is None and threads is None
+            and dtype is None and file_format(input_file) == "csv"
+            and file_format(output_file) == "csv"):
+        from .fastpath import run_topsis_fast
+        if run_topsis_fast(input_file, weights, impacts, output_file, top_k,
+                           profiler=profiler, **kernels, **tie_options):
+            return
+
+    if chunksize is not None:
+        if file_format(input_file) != "csv" or file_format(output_file) != "csv":
+            print("Error: Chunked mode reads and writes CSV only; binary "
+                  "formats are loaded without parsing.")
+            sys.exit(1)
+        if columns is not None:
+            print("Error: Column selection cannot be combined with chunked mode.")
+            sys.exit(1)
+        if threads is not None:
+            print("Error: Threaded scoring cannot be combined with chunked mode.")
+            sys.exit(1)
+        if dtype is not None:
+            print("Error: dtype cannot be combined with chunked mode.")
+            sys.exit(1)
+        from .streaming import run_topsis_streaming
+        return run_topsis_streaming(input_file, weights, impacts,
+                                    output_file, chunksize=chunksize,
+                                    top_k=top_k, profiler=profiler,
+                                    **kernels, **tie_options)
+
+    import numpy as np
+
+    from .model import TopsisModel
+    from .ranking import ranks as rank_scores, top_k as select_top_k
+
+    df, matrix = load_decision_matrix(input_file, columns, profiler, dtype)
+
+    # ── Parse weights and impacts ──────────────────────────────────────────
+    w = parse_weights(weights)
+    imp = parse_impacts(impacts)
 
     n_criteria = df.shape[1] - 1  # excluding first (alternatives) column
 
     # ── Check counts match ─────────────────────────────────────────────────
-    if len(w) != n_criteria:
-        print(f"Error: Number of weights ({len(w)}) must equal "
-              f"number of criteria columns ({n_criteria}).")
-        sys.exit(1)
-
-    if len(imp) != n_criteria:
-        print(f"Error: Number of impacts ({len(imp)}) must equal "
-              f"number of criteria columns ({n_criteria}).")
-        sys.exit(1)
+    check_criteria_counts(w, imp, n_criteria)
 
     # ═══════════════════════════════════════════════════════════════════════
     # TOPSIS ALGORITHM
     # ═══════════════════════════════════════════════════════════════════════
 
-    matrix = df.iloc[:, 1:].values.astype(float)
+    # Steps 1-5 (normalise, weight, ideal points, separation, closeness)
+    # live in TopsisModel so every entry point shares one implementation;
+    # fit() is split here so the stages can be timed separately.
+    with profiler.stage("normalize"):
+        model = TopsisModel(w, imp, dtype, **kernels)
+        col_sum = None
+        if threads is None:
+            sumsq = (matrix ** 2).sum(axis=0, dtype=float)
+            if model.needs_sum:
+                col_sum = matrix.sum(axis=0, dtype=float)
+        else:
+            # The blocked pass finds the extremes along with the norms
+            from .parallel import column_stats
+            sumsq, col_min, col_max, col_sum = column_stats(matrix, threads)
+    with profiler.stage("ideal_points"):
+        if threads is None:
+            col_min, col_max = matrix.min(axis=0), matrix.max(axis=0)
+        try:
+            model.fit_stats(sumsq, col_min, col_max, col_sum,
+                            criteria=list(df.columns[1:]))
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    with profiler.stage("distances"):
+        scores = model.score(matrix, threads=threads)
 
-    # Step 1: Normalize the decision matrix
-    norm = np.sqrt((matrix ** 2).sum(axis=0))
-    normalized = matrix / norm
+    # Step 6: Rank alternatives (highest score = rank 1)
+    with profiler.stage("rank"):
+        if top_k is None:
+            ranks = rank_scores(scores, ties, tie_tol)
+            # df was loaded for this run; append to it instead of cloning it
+            result_df = df
+        else:
+            # Select without sorting everything; only the winners are written
+            positions, ranks = select_top_k(scores, top_k, ties)
+            result_df = df.iloc[positions].copy()
+            scores = scores[positions]
 
-    # Step 2: Weighted normalized matrix
-    weights_arr = np.array(w, dtype=float)
-    weighted = normalized * weights_arr
+    # ── Write output ───────────────────────────────────────────────────────
+    with profiler.stage("write"):
+        # float64 so float32 scores are written as the same 4-decimal text
+        result_df['Topsis Score'] = np.round(scores.astype(float, copy=False), 4)
+        result_df['Rank'] = ranks
+        write_table(result_df, output_file)
 
-    # Step 3: Determine ideal best (V+) and ideal worst (V-)
-    ideal_best  = np.zeros(n_criteria)
-    ideal_worst = np.zeros(n_criteria)
+    print(f"✅ TOPSIS analysis complete!")
+    print(f"   Results saved to: {output_file}")
+    if top_k is None:
+        print(f"   Alternatives ranked: {len(df)}")
+    else:
+        print(f"   Top {len(result_df)} of {len(df)} alternatives written")
 
-    for j, impact in enumerate(imp):
-        if impact == '+':
-            ideal_best[j]  = weighted[:, j].max()
-            ideal_worst[j] = weighted[:, j].min()
-        else:
-            ideal_best[j]  = weighted[:, j].min()
-            ideal_worst[j] = weighted[:, j].max()
 
-    # Step 4: Euclidean separation measures
-    d_best  = np.sqrt(((weighted - ideal_best)  ** 2).sum(axis=1))
-    d_worst = np.sqrt(((weighted - ideal_worst) ** 2).sum(axis=1))
+def _run_grouped(input_file, weights, impacts, output_file, group_by,
+                 columns, profiler, threads, normalization, distance, ties,
+                 tie_tol):
+    """``run_topsis`` with ``group_by``: rank within each group."""
+    import numpy as np
 
-    # Step 5: Performance score (closeness to ideal)
-    scores = d_worst / (d_best + d_worst)
+    from .groups import score_groups
 
-    # Step 6: Rank alternatives (highest score = rank 1)
-    ranks = pd.Series(scores).rank(ascending=False).astype(int).values
+    df, matrix = load_decision_matrix(input_file, columns, profiler,
+                                      group_by=group_by)
+    w = parse_weights(weights)
+    imp = parse_impacts(impacts)
+    check_criteria_counts(w, imp, matrix.shape[1])
 
-    # ── Write output ───────────────────────────────────────────────────────
-    result_df = df.copy()
-    result_df['Topsis Score'] = np.round(scores, 4)
-    result_df['Rank'] = ranks
-    result_df.to_csv(output_file, index=False)
+    criteria = [c for c in df.columns[1:] if c != group_by]
+    with profiler.stage("distances"):
+        try:
+            scores, ranks = score_groups(matrix, df[group_by], w, imp,
+                                         normalization, distance, threads,
+                                         criteria=criteria, ties=ties,
+                                         tie_tol=tie_tol)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    with profiler.stage("write"):
+        df['Topsis Score'] = np.round(scores, 4)
+        df['Rank'] = ranks
+        write_table(df, output_file)
+
+    print(f"✅ TOPSIS analysis complete!")
+    print(f"   Results saved to: {output_file}")
+    print(f"   Alternatives ranked: {len(df)} in "
+          f"{df[group_by].nunique()} groups")
+
+
+def _run_missing(input_file, weights, impacts, output_file, missing, top_k,
+                 columns, profiler, normalization, distance, ties, tie_tol):
+    """``run_topsis`` with ``missing``: score over the present cells."""
+    import numpy as np
+    import pandas as pd
+
+    from .ranking import top_k as select_top_k
+    from .sparse import score_sparse
+
+    if file_format(input_file) == "npz":
+        from .formats import read_sparse
+        try:
+            with profiler.stage("read"):
+                matrix, criteria = read_sparse(input_file, columns)
+        except Exception as e:
+            print(f"Error reading file: {e}")
+            sys.exit(1)
+        # Only the results are written; the criteria are never densified
+        df = pd.DataFrame({"Alternative": [f"A{i + 1}"
+                                           for i in range(matrix.shape[0])]})
+        n_present = matrix.nnz
+    else:
+        df, matrix = load_decision_matrix(input_file, columns, profiler,
+                                          allow_missing=True)
+        criteria = list(df.columns[1:])
+        n_present = int(np.count_nonzero(~np.isnan(matrix)))
+
+    w = parse_weights(weights)
+    imp = parse_impacts(impacts)
+    check_criteria_counts(w, imp, matrix.shape[1])
+
+    with profiler.stage("distances"):
+        try:
+            scores, ranks = score_sparse(matrix, w, imp, missing,
+                                         normalization, distance,
+                                         criteria=criteria, ties=ties,
+                                         tie_tol=tie_tol)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    n_rows = len(df)
+    if top_k is not None:
+        with profiler.stage("rank"):
+            positions, ranks = select_top_k(scores, top_k, ties)
+            df = df.iloc[positions].copy()
+            scores = scores[positions]
+
+    with profiler.stage("write"):
+        df['Topsis Score'] = np.round(scores, 4)
+        df['Rank'] = ranks
+        write_table(df, output_file)
 
+    n_missing = n_rows * matrix.shape[1] - n_present
     print(f"✅ TOPSIS analysis complete!")
     print(f"   Results saved to: {output_file}")
-    print(f"   Alternatives ranked: {len(result_df)}")
+    written = (f"Alternatives ranked: {n_rows}" if top_k is None else
+               f"Top {len(df)} of {n_rows} alternatives written")
+    print(f"   {written} ({n_missing} missing cells, policy '{missing}')")
@@ -0,0 +1,112 @@
+"""
+Single-pass validation of the decision matrix.
+
+Criteria used to be checked one column at a time with ``pd.to_numeric`` and
+then converted again with ``astype(float)``.  ``criteria_matrix`` converts
+all criteria to one float array in a single call; the per-column work that
+names offending cells only runs once the conversion has failed.
+
+It also rejects what used to turn into NaN scores without a word: missing
+or infinite cells, and (``check_divisors``, called when fitting) columns
+whose normalisation divisor is zero, such as an all-zero column under
+vector normalisation.  Missing cells are accepted only for missing-value
+scoring (``allow_missing``, see ``topsis_pkg.sparse``).
+
+Rows in messages are numbered from 1 for the first alternative, so row 1
+is the line after the CSV header.
+
+Usage:
+    matrix = criteria_matrix(df)            # raises MatrixError
+"""
+
+import numpy as np
+
+
+# Offending rows listed per column before the rest are summarised
+MAX_REPORTED_ROWS = 5
+
+
+class MatrixError(ValueError):
+    """The decision matrix cannot be scored; the message names the cells."""
+
+
+def describe_rows(positions, first_row=1):
+    rows = [str(first_row + int(p)) for p in positions[:MAX_REPORTED_ROWS]]
+    more = len(positions) - len(rows)
+    label = "row" if len(positions) == 1 else "rows"
+    return f"{label} {', '.join(rows)}" + (f" and {more} more" if more else "")
+
+
+def _column_label(names, j):
+    # Without names, criteria are numbered from 1
+    return f"'{names[j]}'" if names is not None else str(j + 1)
+
+
+def _non_numeric(criteria, first_row):
+    """Messages for the cells of ``criteria`` that are not numbers."""
+    import pandas as pd
+
+    problems = []
+    for col in criteria.columns:
+        values = criteria[col]
+        if pd.api.types.is_numeric_dtype(values):
+            continue
+        bad = pd.to_numeric(values, errors="coerce").isna() & values.notna()
+        positions = np.flatnonzero(bad.to_numpy())
+        if len(positions) == 0:
+            # Unconvertible as a whole, e.g. a datetime column
+            problems.append(f"Column '{col}' must contain numeric values only.")
+        else:
+            problems.append(f"Column '{col}' must contain numeric values only "
+                            f"({describe_rows(positions, first_row)}).")
+    return problems
+
+
+def check_finite(matrix, names=None, first_row=1, allow_missing=False):
+    """
+    Raise MatrixError naming the missing (NaN) or infinite cells; with
+    ``allow_missing``, only the infinite ones.
+    """
+    bad = np.isinf(matrix) if allow_missing else ~np.isfinite(matrix)
+    if not bad.any():
+        return
+    kind = "infinite" if allow_missing else "missing or infinite"
+    problems = []
+    for j in np.flatnonzero(bad.any(axis=0)):
+        positions = np.flatnonzero(bad[:, j])
+        problems.append(f"Column {_column_label(names, j)} has {kind} values "
+                        f"({describe_rows(positions, first_row)}).")
+    raise MatrixError(" ".join(problems))
+
+
+def criteria_matrix(df, dtype=None, first_row=1, allow_missing=False):
+    """
+    Return the criteria of ``df`` (all columns but the first) as one array.
+
+    The array is ``dtype`` (float64 by default) and is a view when the
+    columns already have that type.  Raises MatrixError naming the columns
+    and rows that hold text, blanks, NaN or infinities.  ``first_row`` is
+    the row number of the first row of ``df``, for chunks of a larger file.
+    With ``allow_missing``, blank and NaN cells are kept as NaN.
+    """
+    criteria = df.iloc[:, 1:]
+    try:
+        matrix = criteria.to_numpy(dtype=dtype or float)
+    except (ValueError, TypeError):
+        problems = _non_numeric(criteria, first_row)
+        raise MatrixError(" ".join(problems) or
+                          "Criteria must contain numeric values only.")
+    check_finite(matrix, list(criteria.columns), first_row, allow_missing)
+    return matrix
+
+
+def check_divisors(divisor, names=None, normalization="vector"):
+    """Raise MatrixError for columns whose normalisation divisor is zero."""
+    zero = np.flatnonzero(np.asarray(divisor) == 0)
+    if len(zero) == 0:
+        return
+    noun = "Column" if len(zero) == 1 else "Columns"
+    labels = ", ".join(_column_label(names, j) for j in zero)
+    raise MatrixError(f"{noun} {labels} cannot be normalised: the "
+                      f"'{normalization}' divisor is zero (e.g. every value "
+                      f"is 0).")